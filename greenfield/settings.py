@@ -93,6 +93,55 @@ DATABASES = {
     }
 }
 
+# Lahman reference database, read through the pool in greenfield/utils/lahman_db.py
+LAHMAN_DATABASE = {
+    "NAME": env('LAHMAN_DATABASE_NAME', default='lahman'),
+    "USER": env('LAHMAN_DATABASE_USER', default='kershaw'),
+    "PASSWORD": env('LAHMAN_DATABASE_PASSWORD', default='24champions'),
+    "HOST": env('LAHMAN_DATABASE_HOST', default='localhost'),
+    "PORT": env('LAHMAN_DATABASE_PORT', default='5432'),
+    "MIN_CONNECTIONS": env.int('LAHMAN_POOL_MIN', default=1),
+    "MAX_CONNECTIONS": env.int('LAHMAN_POOL_MAX', default=10),
+    "WAIT_TIMEOUT": env.float('LAHMAN_POOL_WAIT_TIMEOUT', default=30.0),
+}
+
+# 'postgres' queries the database above; 'snapshot' answers the lookups in
+# lahman_db from the local copy written by manage.py export_lahman_snapshot
+LAHMAN_BACKEND = env('LAHMAN_BACKEND', default='postgres')
+LAHMAN_SNAPSHOT_DIR = env('LAHMAN_SNAPSHOT_DIR', default=str(BASE_DIR / 'lahman_snapshot'))
+
+# Rendered team card PDFs, competition standings and final box scores live
+# on disk so every worker shares them, and sees the others' invalidations
+# (greenfield/utils/team_cards.py, standings.py, boxscore.py)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "team_cards": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": env('TEAM_CARD_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'team_cards')),
+        "OPTIONS": {"MAX_ENTRIES": 2000},
+    },
+    "standings": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": env('STANDINGS_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'standings')),
+        "TIMEOUT": None,
+    },
+    "boxscores": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": env('BOXSCORE_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'boxscores')),
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+TEAM_CARD_CACHE_TIMEOUT = env.int('TEAM_CARD_CACHE_TIMEOUT', default=60 * 60 * 24 * 30)
+
+# League leaders (greenfield/utils/leaders.py): rate stats need this many
+# plate appearances / innings per game the player's team has played
+LEADERS_TOP_N = env.int('LEADERS_TOP_N', default=10)
+LEADERS_PA_PER_TEAM_GAME = env.float('LEADERS_PA_PER_TEAM_GAME', default=3.1)
+LEADERS_IP_PER_TEAM_GAME = env.float('LEADERS_IP_PER_TEAM_GAME', default=1.0)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,144 @@
+# greenfield/utils/boxscore.py
+#
+# Everything the box score page shows for one game, read in four queries
+# (stat lines, lineups, substitutions, inning scores) with the totals and
+# the doubles/triples/HR/SB/CS notes worked out in a single pass. Nothing
+# is written. A finalized game's box score is cached until the game is
+# saved again.
+
+from django.core.cache import caches
+from stats.models import PlayerStatLine, LineupEntry, Substitution, InningScore
+
+REGULATION_INNINGS = 9
+NOTES = ('doubles', 'triples', 'hr', 'sb', 'cs')
+
+
+def _linescore(game):
+    runs = {game.away_team_id: {}, game.home_team_id: {}}
+    for team_id, inning, inning_runs in (
+        InningScore.objects.filter(game=game).values_list('team_id', 'inning', 'runs')
+    ):
+        runs.setdefault(team_id, {})[inning] = inning_runs
+
+    # innings that were never entered show as 0, out to the longest side
+    innings = max([REGULATION_INNINGS, *runs[game.away_team_id], *runs[game.home_team_id]])
+    return [
+        [{'inning': inning, 'runs': runs[team_id].get(inning, 0)} for inning in range(1, innings + 1)]
+        for team_id in (game.away_team_id, game.home_team_id)
+    ]
+
+
+def _note(last_name, count):
+    return f"{last_name}({count})" if count > 1 else last_name
+
+
+def build_boxscore(game):
+    """Template context for game_boxscore.html. game needs its teams loaded."""
+    away_id, home_id = game.away_team_id, game.home_team_id
+
+    statlines = list(PlayerStatLine.objects.filter(game=game).select_related('player'))
+    lineup = list(
+        LineupEntry.objects.filter(game=game)
+        .order_by('batting_order')
+        .values_list('team_id', 'player_id')
+    )
+    subs = list(
+        Substitution.objects.filter(game=game)
+        .select_related('team', 'player_in', 'player_out')
+        .order_by('inning')
+    )
+    away_scores, home_scores = _linescore(game)
+
+    hits = {away_id: 0, home_id: 0}
+    errors = {away_id: 0, home_id: 0}
+    batters, pitchers = {}, {}
+    for sl in statlines:
+        hits[sl.team_id] = hits.get(sl.team_id, 0) + sl.h
+        errors[sl.team_id] = errors.get(sl.team_id, 0) + sl.e
+        sl.subs = []
+
+        if sl.ab + sl.bb > 0:
+            sl.avg = sl.h / sl.ab if sl.ab else 0
+            denom = sl.ab + sl.bb + sl.hbp + sl.sf
+            sl.obp = (sl.h + sl.bb + sl.hbp) / denom if denom else 0
+            singles = sl.h - sl.doubles - sl.triples - sl.hr
+            sl.slg = (singles + 2 * sl.doubles + 3 * sl.triples + 4 * sl.hr) / sl.ab if sl.ab else 0
+            batters[sl.player_id] = sl
+
+        if sl.ip_outs > 0:
+            sl.innings_pitched = sl.ip_outs / 3.0
+            sl.era = sl.er * 9.0 / sl.innings_pitched
+            sl.whip = (sl.h_allowed + sl.bb_allowed) / sl.innings_pitched
+            pitchers.setdefault(sl.team_id, []).append(sl)
+
+    # batters in batting order, with their notes gathered on the way
+    order = {away_id: [], home_id: []}
+    notes = {team_id: {stat: [] for stat in NOTES} for team_id in order}
+    for team_id, player_id in lineup:
+        sl = batters.get(player_id)
+        if sl is None or team_id not in order:
+            continue
+        order[team_id].append(sl)
+        for stat in NOTES:
+            count = getattr(sl, stat)
+            if count > 0:
+                notes[team_id][stat].append(_note(sl.player.last_name, count))
+
+    # position subs hang off the player they replaced; pitching changes
+    # give the order pitchers appeared in
+    relievers = {away_id: [], home_id: []}
+    for sub in subs:
+        if sub.position == 'P':
+            relievers.setdefault(sub.team_id, []).append(sub.player_in_id)
+        elif sub.player_out_id in batters and batters[sub.player_out_id].team_id == sub.team_id:
+            batters[sub.player_out_id].subs.append(sub)
+
+    def order_pitchers(team_id):
+        roster = pitchers.get(team_id, [])
+        by_player = {sl.player_id: sl for sl in roster}
+        came_in = set(relievers[team_id])
+        # starting pitcher = one who didn't come in as a reliever
+        ordered = [sl for sl in roster if sl.player_id not in came_in][:1]
+        ordered += [by_player[pid] for pid in relievers[team_id] if pid in by_player]
+        return ordered
+
+    context = {
+        'game':             game,
+        'away_scores':      away_scores,
+        'home_scores':      home_scores,
+        'away_total_runs':  sum(sc['runs'] for sc in away_scores),
+        'home_total_runs':  sum(sc['runs'] for sc in home_scores),
+        'away_total_hits':  hits[away_id],
+        'home_total_hits':  hits[home_id],
+        'away_total_errs':  errors[away_id],
+        'home_total_errs':  errors[home_id],
+        'away_batters':     order[away_id],
+        'home_batters':     order[home_id],
+        'away_pitchers':    order_pitchers(away_id),
+        'home_pitchers':    order_pitchers(home_id),
+    }
+    for side, team_id in (('away', away_id), ('home', home_id)):
+        for stat in NOTES:
+            context[f'{side}_{stat}'] = notes[team_id][stat]
+    return context
+
+
+def _cache_key(game_id):
+    return f'boxscore:{game_id}'
+
+
+def get_boxscore(game):
+    """build_boxscore, cached for finalized games."""
+    if game.status != 'final':
+        return build_boxscore(game)
+
+    cache = caches['boxscores']
+    context = cache.get(_cache_key(game.pk))
+    if context is None:
+        context = build_boxscore(game)
+        cache.set(_cache_key(game.pk), context)
+    return context
+
+
+def invalidate_boxscore(game_id):
+    caches['boxscores'].delete(_cache_key(game_id))
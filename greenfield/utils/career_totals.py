@@ -0,0 +1,217 @@
+# greenfield/utils/career_totals.py
+
+from collections import defaultdict
+from django.db import transaction
+from psycopg2.extras import RealDictCursor
+from greenfield.utils.lahman_db import (
+    get_lahman_connection, get_player_career_stats, use_snapshot
+)
+from greenfield.utils import lahman_snapshot
+from players.models import CareerTotals
+
+PEOPLE_QUERY = """
+    SELECT playerID, nameFirst, nameLast, nameGiven,
+        EXTRACT(YEAR FROM debut) AS debut_year, bats, throws
+    FROM People
+"""
+
+BATTING_QUERY = """
+    SELECT playerID,
+        SUM(H) AS h, SUM(AB) AS ab, SUM(HR) AS hr, SUM("3B") AS triples,
+        SUM(BB) AS bb, SUM(HBP) AS hbp, SUM(SB) AS sb, SUM("2B") AS doubles,
+        SUM(RBI) AS rbi, SUM(SO) AS so, SUM(G) AS g, SUM(SF) AS sf,
+        SUM(SH) AS sh
+    FROM Batting
+    GROUP BY playerID
+"""
+
+PITCHING_QUERY = """
+    SELECT playerID,
+        SUM(BFP) AS bfp, SUM(H) AS h, SUM(BB) AS bb, SUM(HBP) AS hbp,
+        SUM(SH) AS sh, SUM(SF) AS sf, SUM(G) AS g, SUM(IPouts) AS ipouts,
+        SUM(SO) AS so, SUM(HR) AS hr, SUM(WP) AS wp,
+        COUNT(DISTINCT yearID) AS seasons
+    FROM Pitching
+    GROUP BY playerID
+"""
+
+FIELDING_QUERY = """
+    SELECT playerID, POS,
+        SUM(PO) AS po, SUM(A) AS a, SUM(E) AS e, SUM(G) AS g,
+        SUM(SB) AS sb, SUM(CS) AS cs
+    FROM Fielding
+    GROUP BY playerID, POS
+"""
+
+OF_SPLIT_QUERY = """
+    SELECT playerID, POS,
+        SUM(PO) AS po, SUM(A) AS a, SUM(E) AS e, SUM(G) AS g
+    FROM FieldingOFsplit
+    GROUP BY playerID, POS
+"""
+
+APPEARANCES_QUERY = """
+    SELECT playerID, teamID, yearID, SUM(G) AS g
+    FROM (
+        SELECT playerID, teamID, yearID, G FROM Batting
+        UNION ALL
+        SELECT playerID, teamID, yearID, G FROM Pitching
+        UNION ALL
+        SELECT playerID, teamID, yearID, G FROM Fielding
+    ) AS appearances
+    GROUP BY playerID, teamID, yearID
+"""
+
+TEAMS_QUERY = """
+    SELECT yearID, teamID, franchID, name
+    FROM Teams
+"""
+
+# column order of the tuples rate_player_career works with
+BATTING_COLUMNS = (
+    'h', 'ab', 'hr', 'triples', 'bb', 'hbp', 'sb', 'doubles', 'rbi', 'so', 'g', 'sf', 'sh'
+)
+PITCHING_COLUMNS = (
+    'bfp', 'h', 'bb', 'hbp', 'sh', 'sf', 'g', 'ipouts', 'so', 'hr', 'wp', 'seasons'
+)
+
+
+def _query_career_rows():
+    with get_lahman_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            rows = {}
+            for name, query in (
+                ('people', PEOPLE_QUERY),
+                ('batting', BATTING_QUERY),
+                ('pitching', PITCHING_QUERY),
+                ('fielding', FIELDING_QUERY),
+                ('of_splits', OF_SPLIT_QUERY),
+                ('appearances', APPEARANCES_QUERY),
+                ('teams', TEAMS_QUERY),
+            ):
+                cur.execute(query)
+                rows[name] = cur.fetchall()
+    return rows
+
+
+def _most(games):
+    return max(games, key=games.get) if games else None
+
+
+def career_fielding(by_pos, of_splits):
+    """
+    Positions rated on a career card: 6+ games, with OF replaced by the
+    LF/CF/RF splits (15+ games) when there are any. Most games first.
+    """
+    rows = [row for row in by_pos if (row['g'] or 0) >= 6]
+    of_stats = [row for row in rows if row['pos'] == 'OF']
+    splits = [row for row in of_splits if (row['g'] or 0) >= 15] if of_stats else []
+
+    rows = [row for row in rows if row['pos'] != 'OF'] + (splits or of_stats)
+    rows.sort(key=lambda row: row['g'], reverse=True)
+    return [[row['pos'], row['po'], row['a'], row['e'], row['g']] for row in rows]
+
+
+def build_career_totals(rows):
+    """Unsaved CareerTotals for every player with a batting, pitching or fielding line."""
+    franchises = {(t['teamid'], int(t['yearid'])): t['franchid'] for t in rows['teams']}
+    team_names = {}
+    for t in sorted(rows['teams'], key=lambda t: t['yearid']):
+        team_names[t['teamid']] = t['name']  # latest name wins
+
+    batting = {row['playerid']: row for row in rows['batting']}
+    pitching = {row['playerid']: row for row in rows['pitching']}
+
+    fielding = defaultdict(list)
+    for row in rows['fielding']:
+        fielding[row['playerid']].append(row)
+    of_splits = defaultdict(list)
+    for row in rows['of_splits']:
+        of_splits[row['playerid']].append(row)
+
+    years = defaultdict(set)
+    team_games = defaultdict(lambda: defaultdict(int))
+    franchise_games = defaultdict(lambda: defaultdict(int))
+    for row in rows['appearances']:
+        player_id, year = row['playerid'], int(row['yearid'])
+        years[player_id].add(year)
+        g = row['g'] or 0
+        team_games[player_id][row['teamid']] += g
+        franch_id = franchises.get((row['teamid'], year))
+        if franch_id is not None:
+            franchise_games[player_id][franch_id] += g
+
+    totals = []
+    for person in rows['people']:
+        player_id = person['playerid']
+        if player_id not in years:
+            continue
+
+        bat = batting.get(player_id, {})
+        pitch = pitching.get(player_id, {})
+        positions = fielding.get(player_id, [])
+        catching = [row for row in positions if row['pos'] == 'C']
+        primary_team = _most(team_games[player_id])
+
+        totals.append(CareerTotals(
+            player_id=player_id,
+            name_first=person['namefirst'],
+            name_last=person['namelast'],
+            name_given=person['namegiven'],
+            debut_year=int(person['debut_year']) if person['debut_year'] is not None else None,
+            bats=person['bats'],
+            throws=person['throws'],
+            first_year=min(years[player_id]),
+            last_year=max(years[player_id]),
+            games=bat.get('g') or pitch.get('g') or 0,
+            primary_team=team_names.get(primary_team),
+            primary_franchise=_most(franchise_games[player_id]),
+            primary_position=_most({row['pos']: row['g'] or 0 for row in positions}),
+            batting=[bat.get(column) for column in BATTING_COLUMNS],
+            pitching=[pitch.get(column, 0 if column == 'seasons' else None)
+                      for column in PITCHING_COLUMNS],
+            fielding=career_fielding(positions, of_splits.get(player_id, [])),
+            catcher_sb=sum(row['sb'] or 0 for row in catching),
+            catcher_cs=sum(row['cs'] or 0 for row in catching),
+        ))
+    return totals
+
+
+def refresh_career_totals():
+    """Rebuild the CareerTotals table from Lahman. Returns the row count."""
+    if use_snapshot():
+        rows = lahman_snapshot.get_career_rows()
+    else:
+        rows = _query_career_rows()
+    totals = build_career_totals(rows)
+
+    with transaction.atomic():
+        CareerTotals.objects.all().delete()
+        CareerTotals.objects.bulk_create(totals, batch_size=2000)
+    return len(totals)
+
+
+def get_career_stats(player_id):
+    """
+    get_player_career_stats, served from CareerTotals. Falls back to the
+    live Lahman lookup for players the table doesn't have yet.
+    """
+    try:
+        career = CareerTotals.objects.get(player_id=player_id)
+    except CareerTotals.DoesNotExist:
+        return get_player_career_stats(player_id)
+
+    return {
+        'name_first': career.name_first,
+        'name_last': career.name_last,
+        'name_given': career.name_given,
+        'debut_year': career.debut_year,
+        'bats': career.bats,
+        'throws': career.throws,
+        'batting': tuple(career.batting),
+        'pitching': tuple(career.pitching),
+        'fielding': [tuple(row) for row in career.fielding],
+        'sb': career.catcher_sb,
+        'cs': career.catcher_cs,
+        'franchise_id': career.primary_franchise,
+    }
@@ -0,0 +1,78 @@
+# greenfield/utils/game_setup.py
+#
+# Setting a game up for stat entry: the starting lineups go in with one
+# bulk insert, and every player in a lineup or substitution gets a blank
+# PlayerStatLine up front, so the stats overview never has to write.
+
+from django.db import transaction
+from django.db.models import F
+
+
+def _models():
+    from stats.models import LineupEntry, Substitution, PlayerStatLine
+    return LineupEntry, Substitution, PlayerStatLine
+
+
+def starting_lineup(game, team, data):
+    """Unsaved LineupEntry rows from a LineupEntryForm's cleaned_data."""
+    LineupEntry = _models()[0]
+    entries = [
+        LineupEntry(
+            game=game,
+            team=team,
+            player=data[f'player_{i}'],
+            batting_order=i,
+            fielding_position=data[f'position_{i}'],
+            is_starting=True,
+        )
+        for i in range(1, 10)
+    ]
+    # the starting pitcher has no batting order
+    entries.append(LineupEntry(
+        game=game,
+        team=team,
+        player=data['starting_pitcher'],
+        batting_order=None,
+        fielding_position='P',
+        is_starting=True,
+    ))
+    return entries
+
+
+def create_lineups(game, entries):
+    """Save both teams' lineup entries and seed their stat lines, all or nothing."""
+    LineupEntry = _models()[0]
+    with transaction.atomic():
+        LineupEntry.objects.bulk_create(entries)
+        seed_statlines(game.pk)
+
+
+def seed_statlines(game_id):
+    """
+    Blank stat lines for everyone in the game's lineups and substitutions.
+    Players who already have one are left alone. Lineup positions win over
+    substitution positions.
+    """
+    LineupEntry, Substitution, PlayerStatLine = _models()
+
+    # lineup first, in batting order, so the lines come out in page order
+    positions = {}
+    for team_id, player_id, position in (
+        LineupEntry.objects.filter(game_id=game_id)
+        .order_by('team_id', F('batting_order').asc(nulls_last=True))
+        .values_list('team_id', 'player_id', 'fielding_position')
+    ):
+        positions.setdefault((team_id, player_id), position)
+    for team_id, player_id, position in (
+        Substitution.objects.filter(game_id=game_id).order_by('inning')
+        .values_list('team_id', 'player_in_id', 'position')
+    ):
+        positions.setdefault((team_id, player_id), position)
+
+    PlayerStatLine.objects.bulk_create(
+        [
+            PlayerStatLine(game_id=game_id, team_id=team_id, player_id=player_id, position=position)
+            for (team_id, player_id), position in positions.items()
+        ],
+        ignore_conflicts=True,
+    )
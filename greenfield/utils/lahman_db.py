@@ -1,20 +1,116 @@
 # greenfield/utils/lahman_db.py
 
-import psycopg2
+import os
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from psycopg2.pool import ThreadedConnectionPool
 from psycopg2.extras import RealDictCursor
+from greenfield.utils import lahman_snapshot
 from players.models import Players, PlayerPositionRating, Position
 from teams.models import Teams
 
+# One pool per process, created on first use. The semaphore makes callers
+# wait for a free connection instead of ThreadedConnectionPool raising
+# PoolError when every connection is checked out.
+_pool = None
+_pool_pid = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+_pool_stats = {
+    'checkouts': 0,
+    'in_use': 0,
+    'peak_in_use': 0,
+    'total_wait': 0.0,
+    'max_wait': 0.0,
+    'timeouts': 0,
+}
+
+
+def _get_pool():
+    global _pool, _pool_pid, _pool_slots
+    with _pool_lock:
+        # a forked worker must not share its parent's sockets
+        if _pool is None or _pool_pid != os.getpid():
+            config = settings.LAHMAN_DATABASE
+            _pool = ThreadedConnectionPool(
+                config['MIN_CONNECTIONS'],
+                config['MAX_CONNECTIONS'],
+                dbname=config['NAME'],
+                user=config['USER'],
+                password=config['PASSWORD'],
+                host=config['HOST'],
+                port=config['PORT'],
+            )
+            _pool_pid = os.getpid()
+            _pool_slots = threading.BoundedSemaphore(config['MAX_CONNECTIONS'])
+        return _pool, _pool_slots
+
+
+@contextmanager
 def get_lahman_connection():
-    return psycopg2.connect(
-        dbname="lahman",
-        user="kershaw",
-        password="24champions",
-        host="localhost",
-        port="5432"
+    """
+    Borrow a connection from the Lahman pool. Commits on a clean exit,
+    rolls back on error, and always hands the connection back.
+    """
+    pool, slots = _get_pool()
+
+    start = time.perf_counter()
+    if not slots.acquire(timeout=settings.LAHMAN_DATABASE['WAIT_TIMEOUT']):
+        with _pool_lock:
+            _pool_stats['timeouts'] += 1
+        raise TimeoutError("No Lahman database connection available")
+    waited = time.perf_counter() - start
+
+    try:
+        conn = pool.getconn()
+    except Exception:
+        slots.release()
+        raise
+
+    with _pool_lock:
+        _pool_stats['checkouts'] += 1
+        _pool_stats['in_use'] += 1
+        _pool_stats['peak_in_use'] = max(_pool_stats['peak_in_use'], _pool_stats['in_use'])
+        _pool_stats['total_wait'] += waited
+        _pool_stats['max_wait'] = max(_pool_stats['max_wait'], waited)
+
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+        slots.release()
+        with _pool_lock:
+            _pool_stats['in_use'] -= 1
+
+
+def lahman_pool_stats():
+    """Snapshot of pool size and wait times for this process."""
+    config = settings.LAHMAN_DATABASE
+    with _pool_lock:
+        stats = dict(_pool_stats)
+    stats['min_connections'] = config['MIN_CONNECTIONS']
+    stats['max_connections'] = config['MAX_CONNECTIONS']
+    stats['open_connections'] = (
+        len(_pool._pool) + len(_pool._used) if _pool is not None and _pool_pid == os.getpid() else 0
     )
+    stats['avg_wait'] = stats['total_wait'] / stats['checkouts'] if stats['checkouts'] else 0.0
+    return stats
+
+def use_snapshot():
+    """True when settings.LAHMAN_BACKEND points the lookups below at the local snapshot."""
+    return settings.LAHMAN_BACKEND == 'snapshot'
 
 def get_players_by_team_and_year(year, team_name):
+    if use_snapshot():
+        return lahman_snapshot.get_players_by_team_and_year(year, team_name)
+
     query = """
         SELECT p.playerID, p.nameFirst, p.nameLast, SUM(b.G) as games_played
         FROM people p
@@ -30,6 +126,9 @@ def get_players_by_team_and_year(year, team_name):
             return cur.fetchall()
 
 def get_teamID_from_name(year, team_name):
+    if use_snapshot():
+        return lahman_snapshot.get_teamID_from_name(year, team_name)
+
     query = """
         SELECT teamID
         FROM teams
@@ -74,69 +173,201 @@ def get_rated_player_status(year, team_name, lahman_players):
     return status_lookup
 
 def get_player_season_stats(player_id, year):
-    stats = {
-        'batting': defaultdict(int),
-        'pitching': defaultdict(int),
-        'fielding': defaultdict(lambda: defaultdict(int)),  # stats per position
-    }
+    """
+    One season's totals for rate_player: bats/throws, the batting and
+    pitching sums as tuples, fielding by position (OF split out where the
+    splits cover it) and catcher SB/CS.
+    """
+    if use_snapshot():
+        return lahman_snapshot.get_player_season_stats(player_id, year)
 
     with get_lahman_connection() as conn:
-        with conn.cursor() as cur:
-            # --- Batting ---
-            cur.execute("""
-                SELECT 
-                    COALESCE(SUM(AB), 0), COALESCE(SUM(H), 0), COALESCE(SUM(HR), 0),
-                    COALESCE(SUM("3B"), 0), COALESCE(SUM(BB), 0), COALESCE(SUM(HBP), 0),
-                    COALESCE(SUM(SB), 0), COALESCE(SUM("2B"), 0), COALESCE(SUM(RBI), 0), 
-                    COALESCE(SUM(SO), 0)
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT bats, throws
+                FROM People
+                WHERE playerID = %s
+            """, (player_id,))
+            bats, throws = cursor.fetchone() or (None, None)
+
+            cursor.execute("""
+                SELECT
+                    SUM(H), SUM(AB), SUM(HR), SUM("3B"), SUM(BB), SUM(HBP),
+                    SUM(SB), SUM("2B"), SUM(RBI), SUM(SO), SUM(G), SUM(SF),
+                    SUM(SH)
                 FROM Batting
                 WHERE playerID = %s AND yearID = %s
             """, (player_id, year))
-            row = cur.fetchone()
-            (
-                stats['batting']['AB'], stats['batting']['H'], stats['batting']['HR'],
-                stats['batting']['3B'], stats['batting']['BB'], stats['batting']['HBP'],
-                stats['batting']['SB'], stats['batting']['2B'], stats['batting']['RBI'],
-                stats['batting']['SO']
-            ) = row
-
-            # --- Pitching ---
-            cur.execute("""
-                SELECT 
-                    COALESCE(SUM(BFP), 0), COALESCE(SUM(H), 0), COALESCE(SUM(BB), 0),
-                    COALESCE(SUM(HBP), 0), COALESCE(SUM(BAOpp), 0), COALESCE(SUM(G), 0),
-                    COALESCE(SUM(IPouts), 0), COALESCE(SUM(SO), 0), COALESCE(SUM(HR), 0)
+            batting = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT
+                    SUM(BFP), SUM(H), SUM(BB), SUM(HBP), SUM(BAOpp),
+                    SUM(G), SUM(IPouts), SUM(SO), SUM(HR), SUM(WP)
                 FROM Pitching
                 WHERE playerID = %s AND yearID = %s
             """, (player_id, year))
-            row = cur.fetchone()
-            (
-                stats['pitching']['BFP'], stats['pitching']['H'], stats['pitching']['BB'],
-                stats['pitching']['HBP'], stats['pitching']['BAOpp'], stats['pitching']['G'],
-                stats['pitching']['IPouts'], stats['pitching']['SO'], stats['pitching']['HR']
-            ) = row
-
-            # --- Fielding ---
-            cur.execute("""
-                SELECT POS, SUM(G) as games, 
-                       COALESCE(SUM(PO), 0), COALESCE(SUM(A), 0), COALESCE(SUM(E), 0),
-                       COALESCE(SUM(SB), 0), COALESCE(SUM(CS), 0)
+            pitching = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT POS, SUM(PO), SUM(A), SUM(E), SUM(G)
                 FROM Fielding
                 WHERE playerID = %s AND yearID = %s
                 GROUP BY POS
+                HAVING SUM(G) >= 1
+                ORDER BY SUM(G) DESC
             """, (player_id, year))
-            for pos, games, po, a, e, sb, cs in cur.fetchall():
-                if games >= 15:
-                    stats['fielding'][pos] = {
-                        'PO': po,
-                        'A': a,
-                        'E': e,
-                        'SB': sb,
-                        'CS': cs,
-                        'Games': games,
-                    }
+            fielding = cursor.fetchall()
 
-    return stats
+            cursor.execute("""
+                SELECT SUM(SB), SUM(CS)
+                FROM Fielding
+                WHERE playerID = %s AND yearID = %s AND POS = 'C'
+            """, (player_id, year))
+            sb_cs = cursor.fetchone()
+
+            of_stats = [row for row in fielding if row[0] == 'OF']
+            of_splits = []
+            if of_stats:
+                cursor.execute("""
+                    SELECT POS, SUM(PO), SUM(A), SUM(E), SUM(G)
+                    FROM FieldingOFsplit
+                    WHERE playerID = %s AND yearID = %s
+                    GROUP BY POS
+                    HAVING SUM(G) >= 5
+                    ORDER BY SUM(G) DESC
+                """, (player_id, year))
+                of_splits = cursor.fetchall()
+
+            fielding = [row for row in fielding if row[0] != 'OF'] + (of_splits or of_stats)
+            fielding.sort(key=lambda row: row[4], reverse=True)
+
+    return {
+        'bats': bats,
+        'throws': throws,
+        'batting': batting,
+        'pitching': pitching,
+        'fielding': fielding,
+        'sb': sb_cs[0] or 0,
+        'cs': sb_cs[1] or 0,
+    }
+
+def get_player_career_stats(player_id):
+    """
+    Career totals for rate_player_career: names, bats/throws, batting and
+    pitching sums, fielding by position (OF split out where the splits
+    cover it), catcher SB/CS and the franchise with the most games.
+    """
+    if use_snapshot():
+        return lahman_snapshot.get_player_career_stats(player_id)
+
+    with get_lahman_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT nameFirst, nameLast, nameGiven,
+                EXTRACT(YEAR FROM debut), bats, throws
+                FROM People
+                WHERE playerID = %s
+            """, (player_id,))
+            name_first, name_last, name_given, debut, bats, throws = (
+                cursor.fetchone() or (None,) * 6
+            )
+
+            cursor.execute("""
+                SELECT
+                    SUM(H), SUM(AB), SUM(HR), SUM("3B"), SUM(BB), SUM(HBP),
+                    SUM(SB), SUM("2B"), SUM(RBI), SUM(SO), SUM(G), SUM(SF),
+                    SUM(SH)
+                FROM Batting
+                WHERE playerID = %s
+            """, (player_id,))
+            batting = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT
+                    SUM(BFP), SUM(H), SUM(BB), SUM(HBP), SUM(SH), SUM(SF),
+                    SUM(G), SUM(IPouts), SUM(SO), SUM(HR), SUM(WP),
+                    COUNT(DISTINCT yearID) AS seasons
+                FROM Pitching
+                WHERE playerID = %s
+            """, (player_id,))
+            pitching = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT POS, SUM(PO), SUM(A), SUM(E), SUM(G)
+                FROM Fielding
+                WHERE playerID = %s
+                GROUP BY POS
+                HAVING SUM(G) >= 6
+                ORDER BY SUM(G) DESC
+            """, (player_id,))
+            fielding = cursor.fetchall()
+
+            cursor.execute("""
+                SELECT SUM(SB), SUM(CS)
+                FROM Fielding
+                WHERE playerID = %s AND POS = 'C'
+            """, (player_id,))
+            sb_cs = cursor.fetchone()
+
+            of_stats = [row for row in fielding if row[0] == 'OF']
+            of_splits = []
+            if of_stats:
+                cursor.execute("""
+                    SELECT POS, SUM(PO), SUM(A), SUM(E), SUM(G)
+                    FROM FieldingOFsplit
+                    WHERE playerID = %s
+                    GROUP BY POS
+                    HAVING SUM(G) >= 15
+                    ORDER BY SUM(G) DESC
+                """, (player_id,))
+                of_splits = cursor.fetchall()
+
+            fielding = [row for row in fielding if row[0] != 'OF'] + (of_splits or of_stats)
+            fielding.sort(key=lambda row: row[4], reverse=True)
+
+            cursor.execute("""
+                SELECT franchID, SUM(games) as total_games
+                FROM (
+                    SELECT t.franchID, b.G AS games
+                    FROM Batting b
+                    JOIN Teams t ON b.teamID = t.teamID AND b.yearID = t.yearID
+                    WHERE b.playerID = %s
+
+                    UNION ALL
+
+                    SELECT t.franchID, p.G AS games
+                    FROM Pitching p
+                    JOIN Teams t ON p.teamID = t.teamID AND p.yearID = t.yearID
+                    WHERE p.playerID = %s
+
+                    UNION ALL
+
+                    SELECT t.franchID, f.G AS games
+                    FROM Fielding f
+                    JOIN Teams t ON f.teamID = t.teamID AND f.yearID = t.yearID
+                    WHERE f.playerID = %s
+                ) AS combined
+                GROUP BY franchID
+                ORDER BY total_games DESC
+                LIMIT 1
+            """, (player_id, player_id, player_id))
+            top_team = cursor.fetchone()
+
+    return {
+        'name_first': name_first,
+        'name_last': name_last,
+        'name_given': name_given,
+        'debut_year': int(debut) if debut is not None else None,
+        'bats': bats,
+        'throws': throws,
+        'batting': batting,
+        'pitching': pitching,
+        'fielding': fielding,
+        'sb': sb_cs[0] or 0,
+        'cs': sb_cs[1] or 0,
+        'franchise_id': top_team[0] if top_team else None,
+    }
 
 # You can add more queries here later...
 # def get_team_stats(year, team_id): ...
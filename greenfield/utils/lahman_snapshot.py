@@ -0,0 +1,467 @@
+# greenfield/utils/lahman_snapshot.py
+#
+# Local, read-only copy of the Lahman tables we rate from. Each table is a
+# directory of .npy files, one per column, opened memory-mapped so nothing
+# is read until a column is touched. Numeric columns are float64 with NaN
+# for NULL, text columns are fixed-width unicode with '' for NULL.
+#
+# Stat tables are sorted by playerID then yearID, so one player's rows are a
+# contiguous slice found with searchsorted. Written by the
+# export_lahman_snapshot command; read when LAHMAN_BACKEND = 'snapshot'.
+
+import datetime
+import decimal
+import shutil
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+# table -> columns the exported rows are sorted by
+TABLES = {
+    'people': ('playerid',),
+    'batting': ('playerid', 'yearid', 'stint'),
+    'pitching': ('playerid', 'yearid', 'stint'),
+    'fielding': ('playerid', 'yearid', 'stint', 'pos'),
+    'fieldingofsplit': ('playerid', 'yearid', 'stint', 'pos'),
+    'teams': ('yearid', 'teamid'),
+}
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def _column_array(values):
+    sample = next((v for v in values if v is not None), None)
+    # an all-NULL column is taken as numeric, so sums over it come out None
+    if sample is None or (
+        isinstance(sample, (int, float, decimal.Decimal)) and not isinstance(sample, bool)
+    ):
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+    if isinstance(sample, (datetime.date, datetime.datetime)):
+        values = [None if v is None else v.isoformat() for v in values]
+    return np.array(['' if v is None else str(v) for v in values], dtype=str)
+
+
+def export_snapshot(conn, path):
+    """
+    Copy every table in TABLES from a Lahman connection into path, replacing
+    any snapshot already there. Returns {table: row count}.
+    """
+    path = Path(path)
+    staging = path.with_name(path.name + '.tmp')
+    if staging.exists():
+        shutil.rmtree(staging)
+
+    counts = {}
+    with conn.cursor() as cur:
+        for table, order in TABLES.items():
+            cur.execute(f"SELECT * FROM {table}")
+            columns = [desc[0].lower() for desc in cur.description]
+            rows = cur.fetchall()
+            arrays = {
+                column: _column_array([row[i] for row in rows])
+                for i, column in enumerate(columns)
+            }
+
+            # sort here rather than in SQL: searchsorted needs NumPy's
+            # code-point order, not the database collation
+            rank = np.lexsort([arrays[column] for column in reversed(order)])
+
+            table_dir = staging / table
+            table_dir.mkdir(parents=True)
+            for column, values in arrays.items():
+                np.save(table_dir / f"{column}.npy", values[rank])
+            counts[table] = len(rows)
+
+    if path.exists():
+        shutil.rmtree(path)
+    staging.rename(path)
+    return counts
+
+
+class LahmanSnapshot:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._tables = {}
+        self._team_franchises = None
+
+    def table(self, name):
+        """{column: memory-mapped array} for one table, opened on first use."""
+        if name not in self._tables:
+            table_dir = self.path / name
+            if not table_dir.is_dir():
+                raise FileNotFoundError(
+                    f"No Lahman snapshot for {name} in {self.path}; "
+                    "run manage.py export_lahman_snapshot"
+                )
+            self._tables[name] = {
+                f.stem: np.load(f, mmap_mode='r') for f in table_dir.glob('*.npy')
+            }
+        return self._tables[name]
+
+    def player_rows(self, name, player_id):
+        """The same table restricted to one player's (contiguous) rows."""
+        cols = self.table(name)
+        ids = cols['playerid']
+        start = np.searchsorted(ids, player_id, side='left')
+        stop = np.searchsorted(ids, player_id, side='right')
+        return {column: values[start:stop] for column, values in cols.items()}
+
+    def team_franchises(self):
+        """(teamID, yearID) -> franchID"""
+        if self._team_franchises is None:
+            teams = self.table('teams')
+            self._team_franchises = dict(zip(
+                zip(teams['teamid'].tolist(), teams['yearid'].astype(int).tolist()),
+                teams['franchid'].tolist(),
+            ))
+        return self._team_franchises
+
+
+def get_snapshot():
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = LahmanSnapshot(settings.LAHMAN_SNAPSHOT_DIR)
+        return _snapshot
+
+
+def _number(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def _python(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def group_sums(cols, mask, keys, fields):
+    """
+    SELECT keys, SUM(field)... GROUP BY keys over the rows where mask is
+    true. As in SQL, a sum over nothing but NULLs is None.
+    """
+    rows = np.flatnonzero(mask)
+    if not len(rows):
+        return []
+
+    codes = np.zeros(len(rows), dtype=np.int64)
+    for key in keys:
+        uniques, inverse = np.unique(cols[key][rows], return_inverse=True)
+        codes = codes * len(uniques) + inverse
+    groups, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+
+    totals = {}
+    for field in fields:
+        values = np.asarray(cols[field][rows], dtype=float)
+        present = ~np.isnan(values)
+        totals[field] = (
+            np.bincount(inverse, weights=np.where(present, values, 0), minlength=len(groups)),
+            np.bincount(inverse, weights=present, minlength=len(groups)),
+        )
+
+    result = []
+    for g in range(len(groups)):
+        row = {key: _python(cols[key][rows[first[g]]]) for key in keys}
+        for field in fields:
+            total, count = totals[field]
+            row[field] = _number(total[g]) if count[g] else None
+        result.append(row)
+    return result
+
+
+def _int_keys(rows, *keys):
+    # yearID comes back as a float from the numeric columns
+    for row in rows:
+        for key in keys:
+            if row.get(key) is not None:
+                row[key] = int(row[key])
+    return rows
+
+
+def _person(snap, player_id):
+    person = snap.player_rows('people', player_id)
+    if not len(person['playerid']):
+        return None
+    return {column: _python(values[0]) for column, values in person.items()}
+
+
+def get_players_by_team_and_year(year, team_id):
+    snap = get_snapshot()
+    batting = snap.table('batting')
+    mask = (batting['yearid'] == int(year)) & (batting['teamid'] == team_id)
+
+    players = []
+    for row in group_sums(batting, mask, ['playerid'], ['g']):
+        if (row['g'] or 0) < 10:
+            continue
+        person = _person(snap, row['playerid']) or {}
+        players.append({
+            'playerid': row['playerid'],
+            'namefirst': person.get('namefirst') or None,
+            'namelast': person.get('namelast') or None,
+            'games_played': row['g'],
+        })
+    players.sort(key=lambda p: p['games_played'], reverse=True)
+    return players
+
+
+def get_teamID_from_name(year, team_name):
+    teams = get_snapshot().table('teams')
+    names = np.char.lower(np.asarray(teams['name']))
+    mask = (teams['yearid'] == int(year)) & (np.char.find(names, team_name.lower()) >= 0)
+    matches = np.flatnonzero(mask)
+    return str(teams['teamid'][matches[0]]) if len(matches) else None
+
+
+def _sums(cols, mask, fields):
+    rows = group_sums(cols, mask, [], fields)
+    return rows[0] if rows else dict.fromkeys(fields)
+
+
+def get_player_season_stats(player_id, year):
+    snap = get_snapshot()
+    year = int(year)
+    person = _person(snap, player_id) or {}
+
+    batting = snap.player_rows('batting', player_id)
+    totals = _sums(batting, batting['yearid'] == year, [
+        'h', 'ab', 'hr', '3b', 'bb', 'hbp', 'sb', '2b', 'rbi', 'so', 'g', 'sf', 'sh'
+    ])
+    batting_row = tuple(totals.values())
+
+    pitching = snap.player_rows('pitching', player_id)
+    totals = _sums(pitching, pitching['yearid'] == year, [
+        'bfp', 'h', 'bb', 'hbp', 'baopp', 'g', 'ipouts', 'so', 'hr', 'wp'
+    ])
+    pitching_row = tuple(totals.values())
+
+    fielding = snap.player_rows('fielding', player_id)
+    season = fielding['yearid'] == year
+    by_pos = [
+        (row['pos'], row['po'], row['a'], row['e'], row['g'])
+        for row in group_sums(fielding, season, ['pos'], ['po', 'a', 'e', 'g'])
+        if (row['g'] or 0) >= 1
+    ]
+    catching = _sums(fielding, season & (fielding['pos'] == 'C'), ['sb', 'cs'])
+
+    of_stats = [row for row in by_pos if row[0] == 'OF']
+    of_splits = []
+    if of_stats:
+        splits = snap.player_rows('fieldingofsplit', player_id)
+        of_splits = [
+            (row['pos'], row['po'], row['a'], row['e'], row['g'])
+            for row in group_sums(splits, splits['yearid'] == year, ['pos'], ['po', 'a', 'e', 'g'])
+            if (row['g'] or 0) >= 5
+        ]
+    fielding_rows = [row for row in by_pos if row[0] != 'OF'] + (of_splits or of_stats)
+    fielding_rows.sort(key=lambda row: row[4], reverse=True)
+
+    return {
+        'bats': person.get('bats') or None,
+        'throws': person.get('throws') or None,
+        'batting': batting_row,
+        'pitching': pitching_row,
+        'fielding': fielding_rows,
+        'sb': catching['sb'] or 0,
+        'cs': catching['cs'] or 0,
+    }
+
+
+def get_player_career_stats(player_id):
+    snap = get_snapshot()
+    person = _person(snap, player_id) or {}
+    debut = person.get('debut') or ''
+
+    batting = snap.player_rows('batting', player_id)
+    everything = np.ones(len(batting['playerid']), dtype=bool)
+    totals = _sums(batting, everything, [
+        'h', 'ab', 'hr', '3b', 'bb', 'hbp', 'sb', '2b', 'rbi', 'so', 'g', 'sf', 'sh'
+    ])
+    batting_row = tuple(totals.values())
+
+    pitching = snap.player_rows('pitching', player_id)
+    everything = np.ones(len(pitching['playerid']), dtype=bool)
+    totals = _sums(pitching, everything, [
+        'bfp', 'h', 'bb', 'hbp', 'sh', 'sf', 'g', 'ipouts', 'so', 'hr', 'wp'
+    ])
+    seasons = len(np.unique(pitching['yearid']))
+    pitching_row = tuple(totals.values()) + (seasons,)
+
+    fielding = snap.player_rows('fielding', player_id)
+    everything = np.ones(len(fielding['playerid']), dtype=bool)
+    by_pos = [
+        (row['pos'], row['po'], row['a'], row['e'], row['g'])
+        for row in group_sums(fielding, everything, ['pos'], ['po', 'a', 'e', 'g'])
+        if (row['g'] or 0) >= 6
+    ]
+    catching = _sums(fielding, fielding['pos'] == 'C', ['sb', 'cs'])
+
+    of_stats = [row for row in by_pos if row[0] == 'OF']
+    of_splits = []
+    if of_stats:
+        splits = snap.player_rows('fieldingofsplit', player_id)
+        everything = np.ones(len(splits['playerid']), dtype=bool)
+        of_splits = [
+            (row['pos'], row['po'], row['a'], row['e'], row['g'])
+            for row in group_sums(splits, everything, ['pos'], ['po', 'a', 'e', 'g'])
+            if (row['g'] or 0) >= 15
+        ]
+    fielding_rows = [row for row in by_pos if row[0] != 'OF'] + (of_splits or of_stats)
+    fielding_rows.sort(key=lambda row: row[4], reverse=True)
+
+    # franchise with the most combined batting, pitching and fielding games
+    franchises = snap.team_franchises()
+    games = {}
+    for name in ('batting', 'pitching', 'fielding'):
+        rows = snap.player_rows(name, player_id)
+        for team_id, year, g in zip(rows['teamid'].tolist(), rows['yearid'].tolist(), rows['g'].tolist()):
+            franch_id = franchises.get((team_id, int(year)))
+            if franch_id is not None and not np.isnan(g):
+                games[franch_id] = games.get(franch_id, 0) + int(g)
+
+    return {
+        'name_first': person.get('namefirst') or None,
+        'name_last': person.get('namelast') or None,
+        'name_given': person.get('namegiven') or None,
+        'debut_year': int(debut[:4]) if debut else None,
+        'bats': person.get('bats') or None,
+        'throws': person.get('throws') or None,
+        'batting': batting_row,
+        'pitching': pitching_row,
+        'fielding': fielding_rows,
+        'sb': catching['sb'] or 0,
+        'cs': catching['cs'] or 0,
+        'franchise_id': max(games, key=games.get) if games else None,
+    }
+
+
+def get_season_rows(year_from, year_to, min_games):
+    """
+    The rows season_import's grouped Lahman queries return, as lists of
+    dicts with the same lower-case keys.
+    """
+    snap = get_snapshot()
+
+    batting = snap.table('batting')
+    years = (batting['yearid'] >= year_from) & (batting['yearid'] <= year_to)
+    batting_rows = []
+    for row in group_sums(batting, years, ['playerid', 'yearid', 'teamid'], [
+        'g', 'ab', 'h', '2b', '3b', 'hr', 'rbi', 'sb', 'bb', 'so', 'hbp', 'sf', 'sh'
+    ]):
+        if row['g'] is None or row['g'] < min_games:
+            continue
+        person = _person(snap, row['playerid']) or {}
+        for field in list(row):
+            if field not in ('playerid', 'yearid', 'teamid'):
+                row[field] = row[field] or 0
+        row['doubles'], row['triples'] = row.pop('2b'), row.pop('3b')
+        for field in ('namefirst', 'namelast', 'bats', 'throws'):
+            row[field] = person.get(field) or None
+        batting_rows.append(row)
+
+    pitching = snap.table('pitching')
+    years = (pitching['yearid'] >= year_from) & (pitching['yearid'] <= year_to)
+    pitching_rows = group_sums(pitching, years, ['playerid', 'yearid', 'teamid'], [
+        'bfp', 'h', 'bb', 'hbp', 'baopp', 'g', 'ipouts', 'so', 'hr', 'wp'
+    ])
+    for row in pitching_rows:
+        for field in ('bfp', 'h', 'bb', 'hbp', 'g', 'ipouts', 'so', 'hr', 'wp'):
+            row[field] = row[field] or 0
+
+    def fielding_rows(name, fields, min_g):
+        cols = snap.table(name)
+        years = (cols['yearid'] >= year_from) & (cols['yearid'] <= year_to)
+        rows = []
+        for row in group_sums(cols, years, ['playerid', 'yearid', 'teamid', 'pos'], fields):
+            if row['g'] is None or row['g'] < min_g:
+                continue
+            for field in fields:
+                row[field] = row[field] or 0
+            rows.append(row)
+        return rows
+
+    teams = snap.table('teams')
+    years = np.flatnonzero((teams['yearid'] >= year_from) & (teams['yearid'] <= year_to))
+    team_rows = [
+        {'yearid': int(teams['yearid'][i]), 'teamid': str(teams['teamid'][i]),
+         'franchid': str(teams['franchid'][i]), 'name': str(teams['name'][i])}
+        for i in years
+    ]
+
+    return {
+        'batting': _int_keys(batting_rows, 'yearid'),
+        'pitching': _int_keys(pitching_rows, 'yearid'),
+        'fielding': _int_keys(fielding_rows('fielding', ['po', 'a', 'e', 'g', 'sb', 'cs'], 1), 'yearid'),
+        'of_splits': _int_keys(fielding_rows('fieldingofsplit', ['po', 'a', 'e', 'g'], 5), 'yearid'),
+        'teams': team_rows,
+    }
+
+
+def get_career_rows():
+    """The rows career_totals' whole-table Lahman queries return."""
+    snap = get_snapshot()
+
+    people = snap.table('people')
+    people_rows = [
+        {
+            'playerid': player_id,
+            'namefirst': first or None, 'namelast': last or None, 'namegiven': given or None,
+            'debut_year': int(debut[:4]) if debut else None,
+            'bats': bats or None, 'throws': throws or None,
+        }
+        for player_id, first, last, given, debut, bats, throws in zip(*(
+            people[column].tolist() for column in (
+                'playerid', 'namefirst', 'namelast', 'namegiven', 'debut', 'bats', 'throws'
+            )
+        ))
+    ]
+
+    def everything(cols):
+        return np.ones(len(cols['playerid']), dtype=bool)
+
+    batting = snap.table('batting')
+    batting_rows = group_sums(batting, everything(batting), ['playerid'], [
+        'h', 'ab', 'hr', '3b', 'bb', 'hbp', 'sb', '2b', 'rbi', 'so', 'g', 'sf', 'sh'
+    ])
+    for row in batting_rows:
+        row['doubles'], row['triples'] = row.pop('2b'), row.pop('3b')
+
+    pitching = snap.table('pitching')
+    pitching_rows = group_sums(pitching, everything(pitching), ['playerid'], [
+        'bfp', 'h', 'bb', 'hbp', 'sh', 'sf', 'g', 'ipouts', 'so', 'hr', 'wp'
+    ])
+    seasons = defaultdict(int)
+    for row in group_sums(pitching, everything(pitching), ['playerid', 'yearid'], []):
+        seasons[row['playerid']] += 1
+    for row in pitching_rows:
+        row['seasons'] = seasons[row['playerid']]
+
+    fielding = snap.table('fielding')
+    of_splits = snap.table('fieldingofsplit')
+
+    appearances = []
+    for cols in (batting, pitching, fielding):
+        appearances += group_sums(cols, everything(cols), ['playerid', 'teamid', 'yearid'], ['g'])
+
+    teams = snap.table('teams')
+    team_rows = [
+        {'yearid': int(year), 'teamid': team_id, 'franchid': franch_id, 'name': name}
+        for year, team_id, franch_id, name in zip(*(
+            teams[column].tolist() for column in ('yearid', 'teamid', 'franchid', 'name')
+        ))
+    ]
+
+    return {
+        'people': people_rows,
+        'batting': batting_rows,
+        'pitching': pitching_rows,
+        'fielding': group_sums(fielding, everything(fielding), ['playerid', 'pos'],
+                               ['po', 'a', 'e', 'g', 'sb', 'cs']),
+        'of_splits': group_sums(of_splits, everything(of_splits), ['playerid', 'pos'],
+                                ['po', 'a', 'e', 'g']),
+        'appearances': _int_keys(appearances, 'yearid'),
+        'teams': team_rows,
+    }
@@ -0,0 +1,134 @@
+# greenfield/utils/leaders.py
+#
+# League leaders for one or more competitions. Every category is ranked in
+# memory from a per-player summary built off the season aggregates (two
+# queries in all), instead of a scan of PlayerStatLine per leaderboard.
+# Rate stats only rank players who reach a qualifier scaled to the games
+# their team has played, like the 3.1 PA / 1 IP per game rules.
+
+from collections import defaultdict
+from django.conf import settings
+from stats.models import PlayerSeasonAggregate, TeamSeasonAggregate
+
+SUMMED = (
+    'ab', 'h', 'doubles', 'triples', 'hr', 'rbi', 'bb', 'hbp', 'sf', 'sb',
+    'ip_outs', 'er', 'h_allowed', 'bb_allowed', 'k_thrown', 'wins', 'saves',
+)
+
+
+def _div(num, den):
+    return num / den if den else None
+
+
+def _obp(p):
+    return _div(p['h'] + p['bb'] + p['hbp'], p['ab'] + p['bb'] + p['hbp'] + p['sf'])
+
+
+def _slg(p):
+    return _div(p['h'] + p['doubles'] + 2 * p['triples'] + 3 * p['hr'], p['ab'])
+
+
+def _ops(p):
+    obp, slg = _obp(p), _slg(p)
+    return None if obp is None or slg is None else obp + slg
+
+
+# key, label, value from a player summary, lowest first?, qualifier, decimals
+CATEGORIES = (
+    ('avg', 'Batting Average', lambda p: _div(p['h'], p['ab']), False, 'pa', 3),
+    ('hr', 'Home Runs', lambda p: p['hr'], False, None, 0),
+    ('rbi', 'Runs Batted In', lambda p: p['rbi'], False, None, 0),
+    ('sb', 'Stolen Bases', lambda p: p['sb'], False, None, 0),
+    ('obp', 'On-Base Percentage', _obp, False, 'pa', 3),
+    ('slg', 'Slugging Percentage', _slg, False, 'pa', 3),
+    ('ops', 'OPS', _ops, False, 'pa', 3),
+    ('era', 'ERA', lambda p: _div(p['er'] * 27, p['ip_outs']), True, 'ip', 2),
+    ('whip', 'WHIP', lambda p: _div((p['bb_allowed'] + p['h_allowed']) * 3, p['ip_outs']), True, 'ip', 2),
+    ('k', 'Strikeouts', lambda p: p['k_thrown'], False, None, 0),
+    ('w', 'Wins', lambda p: p['wins'], False, None, 0),
+    ('sv', 'Saves', lambda p: p['saves'], False, None, 0),
+)
+
+
+def player_summaries(competitions):
+    """
+    One dict per player with their summed stats across the competitions,
+    plus 'team_games': for each competition, the most games any of their
+    teams there has played, added up.
+    """
+    team_games = {
+        (row['competition_id'], row['team_id']): row['games']
+        for row in TeamSeasonAggregate.objects.filter(competition__in=competitions)
+                                              .values('competition_id', 'team_id', 'games')
+    }
+
+    players = {}
+    most_games = defaultdict(int)
+    for row in (
+        PlayerSeasonAggregate.objects.filter(competition__in=competitions)
+        .values('competition_id', 'team_id', 'player_id',
+                'player__first_name', 'player__last_name', *SUMMED)
+    ):
+        player = players.get(row['player_id'])
+        if player is None:
+            player = players[row['player_id']] = {
+                'player_id': row['player_id'],
+                'name': f"{row['player__first_name']} {row['player__last_name']}",
+                **{field: 0 for field in SUMMED},
+            }
+        for field in SUMMED:
+            player[field] += row[field]
+
+        key = (row['player_id'], row['competition_id'])
+        most_games[key] = max(most_games[key], team_games.get((row['competition_id'], row['team_id']), 0))
+
+    for (player_id, _), games in most_games.items():
+        players[player_id]['team_games'] = players[player_id].get('team_games', 0) + games
+    return list(players.values())
+
+
+def _qualifies(player, qualifier):
+    if qualifier == 'pa':
+        pa = player['ab'] + player['bb'] + player['hbp'] + player['sf']
+        return pa > 0 and pa >= settings.LEADERS_PA_PER_TEAM_GAME * player['team_games']
+    if qualifier == 'ip':
+        return player['ip_outs'] > 0 and player['ip_outs'] >= 3 * settings.LEADERS_IP_PER_TEAM_GAME * player['team_games']
+    return True
+
+
+def leaderboard(players, value, lowest_first, qualifier, top_n):
+    """
+    The top_n players by value, ranked like SQL RANK(): equal values share
+    a rank, and players tied for the last place shown are all kept.
+    """
+    scored = []
+    for player in players:
+        v = value(player)
+        # a zero count isn't leading anything
+        if v is None or (not qualifier and not v) or not _qualifies(player, qualifier):
+            continue
+        scored.append((v, player))
+    scored.sort(key=lambda item: (item[0] if lowest_first else -item[0], item[1]['name']))
+
+    rows = []
+    for i, (v, player) in enumerate(scored):
+        rank = rows[-1]['rank'] if rows and rows[-1]['value'] == v else i + 1
+        if rank > top_n:
+            break
+        rows.append({'rank': rank, 'name': player['name'], 'player_id': player['player_id'], 'value': v})
+    return rows
+
+
+def competition_leaders(competitions, categories=CATEGORIES, top_n=None):
+    """[{'key', 'label', 'decimals', 'rows'}] for every category."""
+    top_n = top_n or settings.LEADERS_TOP_N
+    players = player_summaries(competitions)
+    return [
+        {
+            'key': key,
+            'label': label,
+            'decimals': decimals,
+            'rows': leaderboard(players, value, lowest_first, qualifier, top_n),
+        }
+        for key, label, value, lowest_first, qualifier, decimals in categories
+    ]
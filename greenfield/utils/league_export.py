@@ -0,0 +1,109 @@
+# greenfield/utils/league_export.py
+#
+# Every team in a competition as one ZIP of card files. Each team's files
+# go into the archive as soon as they're rendered, with the bytes handed
+# on right away, so the ZIP streams out without ever being held whole in
+# memory. The export_league_cards command renders teams in a process
+# pool; the download view renders them in its own process (workers=1).
+
+import io
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import django
+from django.db import connections
+from stats.models import TeamEntry
+from teams.models import Teams
+from greenfield.utils.roster import load_roster
+from greenfield.utils.team_cards import (
+    roster_digest, get_team_pdf, render_full_pdf, render_batters_csv, render_pitchers_csv
+)
+
+
+def safe_filename(name):
+    return re.sub(r'[^\w.-]+', '_', str(name)).strip('_') or 'team'
+
+
+def competition_team_serials(competition):
+    return list(
+        TeamEntry.objects.filter(competition=competition)
+        .values_list('team_id', flat=True).distinct().order_by('team_id')
+    )
+
+
+def team_export_files(team_serial):
+    """
+    [(filename, bytes)] for one team: the full card PDF (through the card
+    cache) plus the batters and pitchers CSVs. Runs in the pool workers.
+    """
+    team = Teams.objects.get(pk=team_serial)
+    batters, pitchers = load_roster(team_serial)
+    players = batters + pitchers
+    base = f"{safe_filename(team.team_name)}_{team.first_name}"
+
+    digest = roster_digest(team, players, 'full')
+    pdf = get_team_pdf(team, 'full', digest, lambda: render_full_pdf(team, players))
+
+    return [
+        (f"{base}_full.pdf", pdf),
+        (f"{base}_batters.csv", render_batters_csv(team, batters).encode()),
+        (f"{base}_pitchers.csv", render_pitchers_csv(team, pitchers).encode()),
+    ]
+
+
+def _init_worker():
+    # a no-op under fork; spawn/forkserver children need the app registry
+    django.setup()
+
+
+class _Chunks(io.RawIOBase):
+    """Write-only sink that holds what ZipFile wrote until it's drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _results(team_serials, workers):
+    if workers == 1:
+        for serial in team_serials:
+            yield team_export_files(serial)
+        return
+
+    # children must open their own database connections, not share ours
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(team_export_files, serial) for serial in team_serials]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def iter_league_zip(team_serials, workers=None):
+    """Yield the bytes of a ZIP holding every team's card files, team by team."""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(team_serials)))
+    stream = _Chunks()
+    used = set()
+
+    with zipfile.ZipFile(stream, 'w') as archive:
+        for files in _results(team_serials, workers):
+            for name, data in files:
+                while name in used:
+                    name = f"_{name}"
+                used.add(name)
+                # PDFs are compressed already
+                compression = zipfile.ZIP_STORED if name.endswith('.pdf') else zipfile.ZIP_DEFLATED
+                archive.writestr(name, data, compress_type=compression)
+            yield stream.drain()
+    yield stream.drain()
@@ -0,0 +1,218 @@
+# greenfield/utils/lineup_optimizer.py
+#
+# Picks a team's vs-R and vs-L lineups from its roster. Who plays where is
+# an assignment problem: each batter's run value (what nine of him would
+# score against the league's pitchers of that hand) plus a rough value
+# for his glove at the position. It is maximized over PlayerPositionRating
+# eligibility with a DP over the set of players used so far. The batting
+# order is then annealed over slot swaps. Each step scores every swap in
+# one batched outcome_model call, so a team takes a second or two rather
+# than scoring all 8! (or 9!) orders.
+
+from random import Random
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from players.models import Players
+from teams.models import Teams, Lineups
+from greenfield.utils.roster import load_roster
+from greenfield.utils.simulator import (
+    WEAK_BATTER, WEAK_PITCHER, INFIELD, FIELD_ORDER, LINEUP_SLOTS, fielding
+)
+from greenfield.utils.outcome_model import (
+    pitching_cards, roster_cards, rate_stats, expected_runs
+)
+
+OUTFIELD = ('LF', 'CF', 'RF')
+LINEUP_FIELDS = (
+    'common_lineup_serial', 'vs_r_lineup_serial', 'vs_l_lineup_serial',
+    'lineup3_serial', 'lineup4_serial', 'lineup5_serial',
+)
+
+# rough runs a game from a fielder's ratings, going by what the simulator
+# does with them: fewer errors, more double plays, fewer steals
+SUPERIOR_RUNS = .05
+ARM_RUNS = .05           # a 9 arm in the infield
+THROW_RUNS = .01         # a point of catcher arm
+OUT_OF_POSITION = -.5    # nobody on the roster is rated there
+
+ANNEAL_STEPS = 30
+ANNEAL_START = .02       # runs a game
+
+
+def league_pitching():
+    """{'R': card, 'L': card}: the average pitching card of every rated pitcher by hand."""
+    pitchers = list(
+        Players.objects.filter(pitch_grade__isnull=False, pitch_prob_hit__isnull=False).only(
+            'pitch_grade', 'gopher', 'pitch_walk_top', 'pitch_strikeout_top', 'pitch_hbp_top',
+            'pitch_prob_hit', 'throws',
+        )
+    )
+    if not pitchers:
+        return {'R': np.array(WEAK_PITCHER), 'L': np.array(WEAK_PITCHER)}
+
+    cards = pitching_cards(pitchers)
+    lefty = np.array([(player.throws or '').startswith('L') for player in pitchers])
+    everyone = cards.mean(axis=0)
+    return {
+        'R': cards[~lefty].mean(axis=0) if (~lefty).any() else everyone,
+        'L': cards[lefty].mean(axis=0) if lefty.any() else everyone,
+    }
+
+
+def _glove(rating, position):
+    superior, arm, _, throw = fielding(rating)
+    value = SUPERIOR_RUNS * superior
+    if position in INFIELD and arm == 9:
+        value += ARM_RUNS
+    if position == 'C':
+        value += THROW_RUNS * throw
+    return value
+
+
+def eligibility(player):
+    """{position: glove value} for a player from load_roster; an OF rating covers LF, CF and RF."""
+    ratings = {rating.position.name: rating for rating in player.ratings if rating.position}
+    eligible = {}
+    for position in FIELD_ORDER:
+        rating = ratings.get(position)
+        if rating is None and position in OUTFIELD:
+            rating = ratings.get('OF')
+        if rating is not None:
+            eligible[position] = _glove(rating, position)
+    eligible['DH'] = 0
+    return eligible
+
+
+def assign_positions(values, eligible, positions):
+    """
+    Indexes of the players to put at each of positions: one each, most
+    total run value (values[i] plus his eligible[i][position]). A position
+    nobody is rated for goes to the best bat left, at OUT_OF_POSITION.
+    """
+    best = {0: (0.0, ())}
+    for position in positions:
+        rated = [i for i in range(len(values)) if position in eligible[i]]
+        candidates = rated or range(len(values))
+        step = {}
+        for used, (total, picks) in best.items():
+            for i in candidates:
+                if used >> i & 1:
+                    continue
+                value = total + values[i] + eligible[i].get(position, OUT_OF_POSITION)
+                key = used | 1 << i
+                if key not in step or value > step[key][0]:
+                    step[key] = (value, picks + (i,))
+        if not step:
+            raise ValueError(f"not enough batters to fill {len(positions)} positions")
+        best = step
+    return list(max(best.values())[1])
+
+
+def _swaps(size):
+    return [(i, j) for i in range(size) for j in range(i + 1, size)]
+
+
+def best_order(probs, tail=None, seed=None, steps=ANNEAL_STEPS):
+    """
+    Batting order (indexes into probs, (k, 8) outcome vectors) with the
+    most expected runs, ahead of fixed tail slots (the pitcher's). Starts
+    from on-base order, anneals over slot swaps, then climbs to the top.
+    Returns (order, expected runs).
+    """
+    probs = np.asarray(probs)
+    tail = np.zeros((0, probs.shape[1])) if tail is None else np.asarray(tail)
+    swaps = _swaps(len(probs))
+    rng = Random(seed)
+
+    def score(orders):
+        lineups = probs[orders]
+        lineups = np.concatenate([lineups, np.broadcast_to(tail, (len(orders),) + tail.shape)], axis=1)
+        return expected_runs(lineups)
+
+    def neighbours(order):
+        moved = np.repeat(order[None, :], len(swaps), axis=0)
+        for row, (i, j) in enumerate(swaps):
+            moved[row, [i, j]] = moved[row, [j, i]]
+        return moved
+
+    current = np.argsort(-rate_stats(probs)['obp'], kind='stable')
+    best, best_runs = current, score(current[None, :])[0]
+    for step in range(steps):
+        candidates = neighbours(current)
+        runs = score(candidates)
+        temperature = ANNEAL_START * (1 - step / steps) + 1e-4
+        weights = np.exp((runs - runs.max()) / temperature)
+        pick = rng.choices(range(len(candidates)), weights=weights)[0]
+        current = candidates[pick]
+        if runs[pick] > best_runs:
+            best, best_runs = current, runs[pick]
+
+    while True:
+        candidates = neighbours(best)
+        runs = score(candidates)
+        if runs.max() <= best_runs + 1e-12:
+            return [int(i) for i in best], float(best_runs)
+        best, best_runs = candidates[runs.argmax()], runs.max()
+
+
+def optimize_lineups(team_serial, dh=False, seed=None, pitching=None):
+    """
+    {'R': (slots, runs), 'L': (slots, runs)}: the best lineup against each
+    hand, as [(Players or None for the pitcher, position)] in batting order
+    and its expected runs a game. pitching is league_pitching(), passed in
+    when doing many teams.
+    """
+    batters, _ = load_roster(team_serial)
+    if not batters:
+        raise ValueError(f"team {team_serial} has no position players")
+    pitching = pitching or league_pitching()
+    batting, _ = roster_cards(batters)
+    eligible = [eligibility(player) for player in batters]
+    positions = FIELD_ORDER + (('DH',) if dh else ())
+    pitcher_batting = np.array(WEAK_BATTER)
+
+    lineups = {}
+    for hand in ('R', 'L'):
+        probs = (batting + pitching[hand]) / 2
+        # each batter's run value: what a lineup of nine of him would score, per slot
+        values = expected_runs(np.repeat(probs[:, None, :], 9, axis=1)) / 9
+        picks = assign_positions(list(values), eligible, positions)
+
+        tail = None if dh else ((pitcher_batting + pitching[hand]) / 2)[None, :]
+        order, runs = best_order(probs[picks], tail, seed)
+        slots = [(batters[picks[i]], positions[i]) for i in order]
+        if not dh:
+            slots.append((None, 'P'))
+        lineups[hand] = (slots, runs)
+    return lineups
+
+
+def _lineup_users(lineup):
+    """How many team lineup slots point at this Lineups row."""
+    query = Q()
+    for field in LINEUP_FIELDS:
+        query |= Q(**{field: lineup})
+    rows = Teams.objects.filter(query).values_list(*[f'{field}_id' for field in LINEUP_FIELDS])
+    return sum(value == lineup.serial for row in rows for value in row)
+
+
+@transaction.atomic
+def save_lineup(team, field, slots):
+    """
+    Write slots into the team's lineup for field ('vs_r_lineup_serial' or
+    'vs_l_lineup_serial'). The existing row is reused unless it is shared
+    with another slot.
+    """
+    lineup = getattr(team, field)
+    if lineup is None or _lineup_users(lineup) > 1:
+        lineup = Lineups()
+    for name, (player, position) in zip(LINEUP_SLOTS, slots):
+        setattr(lineup, name, player)
+        setattr(lineup, f'{name}_pos', position)
+    lineup.save()
+
+    if getattr(team, f'{field}_id') != lineup.serial:
+        setattr(team, field, lineup)
+        team.save(update_fields=[field])
+    return lineup
@@ -0,0 +1,79 @@
+# greenfield/utils/name_index.py
+#
+# In-process trigram index over CareerTotals names for the career search
+# and autocomplete. Rows are kept in career-games order, so every posting
+# list is already ranked and the top N matches are the first N survivors.
+# Built on first use in each process and rebuilt when refresh_career_totals
+# has replaced the table (new rows mean a new max id).
+
+import threading
+import numpy as np
+from django.db.models import Max
+from players.models import CareerTotals
+
+FIELDS = (
+    'player_id', 'name_first', 'name_last', 'name_given',
+    'first_year', 'last_year', 'primary_team', 'primary_position', 'games',
+)
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    def __init__(self, rows, version):
+        self.version = version
+        self.rows = rows
+        self.first = np.array([(row['name_first'] or '').lower() for row in rows], dtype=str)
+        self.last = np.array([(row['name_last'] or '').lower() for row in rows], dtype=str)
+        self.full = np.char.add(np.char.add(self.first, ' '), self.last)
+
+        postings = {}
+        for i, name in enumerate(self.full.tolist()):
+            for gram in _trigrams(name):
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def _candidates(self, tokens):
+        ids = None
+        for token in tokens:
+            for gram in _trigrams(token):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    return np.array([], dtype=np.int32)
+                ids = posting if ids is None else np.intersect1d(ids, posting, assume_unique=True)
+        # nothing three letters long to narrow on: check every name
+        return np.arange(len(self.rows), dtype=np.int32) if ids is None else ids
+
+    def search(self, first_name='', last_name='', query='', limit=None):
+        """
+        Rows whose first/last name contain first_name/last_name and whose
+        full name contains every word of query, most career games first.
+        """
+        checks = [(self.first, first_name.lower()), (self.last, last_name.lower())]
+        checks += [(self.full, word) for word in query.lower().split()]
+        checks = [(names, text) for names, text in checks if text]
+
+        ids = self._candidates([text for _, text in checks])
+        for names, text in checks:
+            if not len(ids):
+                break
+            ids = ids[np.char.find(names[ids], text) >= 0]
+
+        if limit is not None:
+            ids = ids[:limit]
+        return [self.rows[i] for i in ids]
+
+
+def get_name_index():
+    global _index
+    version = CareerTotals.objects.aggregate(version=Max('id'))['version']
+    with _index_lock:
+        if _index is None or _index.version != version:
+            rows = list(CareerTotals.objects.order_by('-games', 'player_id').values(*FIELDS))
+            _index = NameIndex(rows, version)
+        return _index
@@ -0,0 +1,266 @@
+# greenfield/utils/outcome_model.py
+#
+# Exact outcome probabilities from the Sher-Co ratings, and what they add
+# up to, without playing any games. The cards are the simulator's (shares
+# of the 36 dice results), built for a whole roster at once in NumPy.
+# Expected runs come from the base-out Markov chain under the simulator's
+# base-running rules. Every outcome's transitions are worked out once, so
+# any batter's 25x25 transition matrix is one einsum over his card.
+#
+# The chain leaves out what the cards don't drive (steals, wild pitches,
+# the speed and defense nudges), so it runs a little under the simulator.
+
+import numpy as np
+from greenfield.utils.simulator import (
+    UP, DOWN, WEAK_BATTER, WEAK_PITCHER,
+    DOUBLE_SHARE, TRIPLE_SHARE, GOPHER_SHARE, GROUND_BALL, DOUBLE_PLAY,
+    SCORE_ON_GROUNDER, TAG_UP, ERROR,
+    SINGLE, DOUBLE, TRIPLE, HOMER, WALK, HBP, STRIKEOUT, OUT,
+)
+
+OUTCOMES = 8
+STATES = 25          # outs * 8 + bases (1st = 1, 2nd = 2, 3rd = 4); 24 is three out
+THREE_OUT = 24
+
+# the simulator's base running with no speed stars
+SCORE_FROM_SECOND = .55    # on a single
+FIRST_TO_THIRD = .25       # on a single, with third open
+SCORE_FROM_FIRST = .35     # on a double
+
+
+def _lookup(values, table):
+    """Dice numbers (None for none) -> table index, -1 for none."""
+    return np.array([table.get(v, -1) if v is not None else -1 for v in values], dtype=int)
+
+
+def _column(players, name, table=UP):
+    return _lookup([getattr(player, name) for player in players], table)
+
+
+def _cards(hits, homers, triples, doubles, walks, hbp, strikeouts):
+    """_card from the simulator, for arrays of players."""
+    hits = np.clip(hits, 0, 36 - walks - hbp - strikeouts)
+    homers = hits * np.minimum(homers, 1)
+    triples = np.minimum(hits * triples, hits - homers)
+    doubles = np.minimum(hits * doubles, hits - homers - triples)
+    singles = hits - homers - triples - doubles
+    outs = 36 - hits - walks - hbp - strikeouts
+    return np.stack([singles, doubles, triples, homers, walks, hbp, strikeouts, outs], axis=-1) / 36
+
+
+def _hit_results(prob_hits):
+    index = _lookup(prob_hits, DOWN)
+    return np.where((index >= 0) & (index < 35), index + 1, 0)
+
+
+def offense_cards(players):
+    """(n, 8) batting cards from the parsed offense columns of a list of Players."""
+    walk, k, hbp = _column(players, 'walk_top'), _column(players, 'strikeout_top'), _column(players, 'hbp_top')
+    hr, triple = _column(players, 'hr_number'), _column(players, 'triple_number')
+    walk_end = np.where(walk >= 0, walk + 1, 0)
+    k_end = np.maximum(k + 1, walk_end)
+    hbp_end = np.where(hbp >= 0, np.maximum(hbp + 1, k_end), k_end)
+    triples = np.where(triple >= 0, np.maximum(triple - np.maximum(hr, 0), 0) / 36, 0)
+
+    prob_hits = [player.bat_prob_hit for player in players]
+    cards = _cards(
+        _hit_results(prob_hits), (hr + 1) / 36, triples, DOUBLE_SHARE,
+        walk_end, hbp_end - k_end, k_end - walk_end,
+    )
+    rated = np.array([
+        player.hit_grade is not None and player.bat_prob_hit is not None for player in players
+    ], dtype=bool)
+    return np.where(rated[:, None], cards, WEAK_BATTER)
+
+
+def pitching_cards(players):
+    """(n, 8) pitching cards from the parsed pitching columns of a list of Players."""
+    walk, k = _column(players, 'pitch_walk_top'), _column(players, 'pitch_strikeout_top')
+    hbp = _column(players, 'pitch_hbp_top')
+    walk_end = np.maximum(walk, 0)
+    k_end = np.where(k >= 0, np.maximum(k, walk_end), walk_end)
+    hbp_end = np.where(hbp >= 0, np.maximum(hbp, k_end), k_end)
+    gopher = np.array([GOPHER_SHARE.get(player.gopher, GOPHER_SHARE[0]) for player in players])
+
+    cards = _cards(
+        _hit_results([player.pitch_prob_hit for player in players]), gopher, TRIPLE_SHARE, DOUBLE_SHARE,
+        walk_end, hbp_end - k_end, k_end - walk_end,
+    )
+    rated = np.array([
+        player.pitch_grade is not None and player.pitch_prob_hit is not None for player in players
+    ], dtype=bool)
+    return np.where(rated[:, None], cards, WEAK_PITCHER)
+
+
+def roster_cards(players):
+    """(batting, pitching) cards, (n, 8) each, for a list of Players."""
+    return offense_cards(players), pitching_cards(players)
+
+
+def matchups(batting, pitching):
+    """(n, m, 8) outcome probabilities for every batter against every pitcher: half each card."""
+    return (np.asarray(batting)[:, None, :] + np.asarray(pitching)[None, :, :]) / 2
+
+
+def rate_stats(probs):
+    """Expected AVG, OBP, SLG and OPS per plate appearance for outcome vectors (..., 8)."""
+    probs = np.asarray(probs)
+    hits = probs[..., :4].sum(-1)
+    at_bats = hits + probs[..., STRIKEOUT] + probs[..., OUT]
+    bases = probs[..., :4] @ np.array([1, 2, 3, 4])
+    avg = np.divide(hits, at_bats, out=np.zeros_like(hits), where=at_bats > 0)
+    slg = np.divide(bases, at_bats, out=np.zeros_like(bases), where=at_bats > 0)
+    obp = hits + probs[..., WALK] + probs[..., HBP]
+    return {'avg': avg, 'obp': obp, 'slg': slg, 'ops': obp + slg}
+
+
+# ——— the base-out chain ———
+
+def _force(bases):
+    if not bases & 1:
+        return bases | 1, 0
+    if not bases & 2:
+        return bases | 3, 0
+    if not bases & 4:
+        return 7, 0
+    return 7, 1
+
+
+def _after_out(outs, bases, ground):
+    """(probability, outs, bases, runs) once a ball in play is turned into an out."""
+    branches = []
+    for p_dp, made, left in (
+        [(DOUBLE_PLAY, 2, bases & ~1), (1 - DOUBLE_PLAY, 1, bases)]
+        if ground and bases & 1 and outs < 2 else [(1, 1, bases)]
+    ):
+        new_outs = outs + made
+        if new_outs >= 3:
+            branches.append((p_dp, 3, 0, 0))
+        elif ground:
+            for p_run, runs, b in (
+                [(SCORE_ON_GROUNDER, 1, left & ~4), (1 - SCORE_ON_GROUNDER, 0, left)]
+                if left & 4 else [(1, 0, left)]
+            ):
+                if b & 2 and not b & 4:
+                    b = (b & ~2) | 4
+                if b & 1 and not b & 2:
+                    b = (b & ~1) | 2
+                branches.append((p_dp * p_run, new_outs, b, runs))
+        elif left & 4:
+            branches += [(p_dp * TAG_UP, new_outs, left & ~4, 1), (p_dp * (1 - TAG_UP), new_outs, left, 0)]
+        else:
+            branches.append((p_dp, new_outs, left, 0))
+    return branches
+
+
+def _branches(outcome, outs, bases):
+    on1, on2, on3 = bool(bases & 1), bool(bases & 2), bool(bases & 4)
+    on_base = on1 + on2 + on3
+    if outcome == SINGLE:
+        branches = []
+        for p2, scored, held in ([(SCORE_FROM_SECOND, 1, 0), (1 - SCORE_FROM_SECOND, 0, 4)] if on2 else [(1, 0, 0)]):
+            if on1 and not held:
+                options = [(FIRST_TO_THIRD, 4), (1 - FIRST_TO_THIRD, 2)]
+            else:
+                options = [(1, 2 if on1 else 0)]
+            for p1, lead in options:
+                branches.append((p2 * p1, outs, 1 | held | lead, on3 + scored))
+        return branches
+    if outcome == DOUBLE:
+        if on1:
+            return [(SCORE_FROM_FIRST, outs, 2, on2 + on3 + 1), (1 - SCORE_FROM_FIRST, outs, 6, on2 + on3)]
+        return [(1, outs, 2, on2 + on3)]
+    if outcome == TRIPLE:
+        return [(1, outs, 4, on_base)]
+    if outcome == HOMER:
+        return [(1, outs, 0, on_base + 1)]
+    if outcome in (WALK, HBP):
+        new, runs = _force(bases)
+        return [(1, outs, new, runs)]
+    if outcome == STRIKEOUT:
+        return [(1, outs + 1, bases, 0)]
+
+    # a ball in play: an error moves everyone up a base, the rest are
+    # ground balls or fly balls
+    error = [(ERROR, outs, 1 | (bases << 1) & 7, on3)]
+    ground = [(p * (GROUND_BALL - ERROR), o, b, r) for p, o, b, r in _after_out(outs, bases, True)]
+    fly = [(p * (1 - GROUND_BALL), o, b, r) for p, o, b, r in _after_out(outs, bases, False)]
+    return error + ground + fly
+
+
+def _outcome_tensors():
+    moves = np.zeros((OUTCOMES, STATES, STATES))
+    runs = np.zeros((OUTCOMES, STATES))
+    moves[:, THREE_OUT, THREE_OUT] = 1
+    for outcome in range(OUTCOMES):
+        for state in range(THREE_OUT):
+            outs, bases = divmod(state, 8)
+            for p, new_outs, new_bases, scored in _branches(outcome, outs, bases):
+                target = THREE_OUT if new_outs >= 3 else new_outs * 8 + new_bases
+                moves[outcome, state, target] += p
+                runs[outcome, state] += p * scored
+    return moves, runs
+
+
+MOVES, RUNS = _outcome_tensors()
+
+
+def transitions(probs):
+    """(..., 25, 25) transition matrices and (..., 25) expected runs per PA for outcome vectors."""
+    probs = np.asarray(probs)
+    return np.einsum('...k,kst->...st', probs, MOVES), probs @ RUNS
+
+
+def inning_runs(lineup_probs, tolerance=1e-10):
+    """
+    For each leadoff hitter of a batting order ((..., 9, 8) outcome
+    vectors, any number of orders at once): expected runs in the inning,
+    and the chance each hitter leads off the next one. Returns (runs
+    (..., 9), next leadoff (..., 9, 9)).
+    """
+    lineup_probs = np.asarray(lineup_probs)
+    *batch, size, _ = lineup_probs.shape
+    moves, runs = transitions(lineup_probs)
+    moves = moves[..., None, :, :, :]
+
+    # mass[..., l, b, s]: inning led off by l, b up, base-out state s
+    mass = np.zeros((*batch, size, size, STATES))
+    mass[..., np.arange(size), np.arange(size), 0] = 1
+    expected = np.zeros((*batch, size))
+    next_leadoff = np.zeros((*batch, size, size))
+
+    while mass.sum() > tolerance * mass[..., 0, 0, 0].size:
+        expected += np.einsum('...lbs,...bs->...l', mass, runs)
+        mass = np.roll((mass[..., None, :] @ moves)[..., 0, :], 1, axis=-2)
+        next_leadoff += mass[..., THREE_OUT]
+        mass[..., THREE_OUT] = 0
+    return expected, next_leadoff
+
+
+def expected_runs(lineup_probs, innings=9):
+    """
+    Expected runs over a game's innings for a batting order of outcome
+    vectors, leadoff first. Given a stack of orders (..., 9, 8), returns an
+    array with one total per order.
+    """
+    per_inning, next_leadoff = inning_runs(lineup_probs)
+    leadoff = np.zeros(per_inning.shape)
+    leadoff[..., 0] = 1
+    total = np.zeros(per_inning.shape[:-1])
+    for _ in range(innings):
+        total += (leadoff * per_inning).sum(-1)
+        leadoff = (leadoff[..., None, :] @ next_leadoff)[..., 0, :]
+    return float(total) if total.ndim == 0 else total
+
+
+def evaluate_lineup(batters, pitchers, weights=None):
+    """
+    Expected runs per nine innings for Players in batting order against an
+    opposing staff. weights are each pitcher's share of the innings
+    (default: even), and the staff's cards are blended by them.
+    """
+    batting, _ = roster_cards(batters)
+    _, pitching = roster_cards(pitchers)
+    staff = np.average(pitching, axis=0, weights=weights)
+    lineup = matchups(batting, staff[None, :])[:, 0, :]
+    return expected_runs(lineup)
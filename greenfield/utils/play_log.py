@@ -0,0 +1,266 @@
+# greenfield/utils/play_log.py
+#
+# Rebuilds a game's stat lines, line score and pitching decisions from its
+# PlayEvents. The counting stats come from per-result lookup tables summed
+# over every event at once with np.add.at. Only who-is-on-which-base has to
+# be walked in order, since it decides runs scored, steals and the W/L/S.
+#
+# Runners never pass each other: after a play the runners still on base
+# (lead runner first, then the batter if he reached) fill the occupied
+# bases from third down, and any left over were put out, lead runner
+# first. That covers force plays, double plays and caught stealing without
+# storing runner ids on every event.
+
+import numpy as np
+from collections import Counter
+from django.db import transaction
+from stats.models import PLAY_RESULTS, PlayerStatLine, InningScore
+
+CODES = {abbr: code for code, abbr in PLAY_RESULTS}
+REACHES = {CODES[abbr] for abbr in ('1B', '2B', '3B', 'HR', 'BB', 'IBB', 'HBP', 'FC', 'E')}
+
+EVENT_FIELDS = (
+    'inning', 'half', 'batter_id', 'pitcher_id', 'result',
+    'outs', 'runners', 'scored', 'rbi', 'unearned',
+)
+
+BATTING = ('ab', 'h', 'doubles', 'triples', 'hr', 'bb', 'hbp', 'so', 'sf', 'dp')
+# ibb is the intentional part of bb_allowed
+PITCHING = ('h_allowed', 'bb_allowed', 'ibb', 'k_thrown', 'hra', 'hb', 'wp', 'balk')
+
+DERIVED = BATTING + ('rbi', 'r', 'sb', 'cs') + PITCHING + ('ip_outs', 'ra', 'er', 'decision', 'threw')
+BLANK = {field: 0 for field in DERIVED} | {'decision': '', 'threw': False}
+
+
+def _table(fields, rows):
+    table = np.zeros((max(CODES.values()) + 1, len(fields)), dtype=np.int64)
+    for abbr, stats in rows.items():
+        for field, value in stats.items():
+            table[CODES[abbr], fields.index(field)] = value
+    return table
+
+
+BATTING_TABLE = _table(BATTING, {
+    '1B': {'ab': 1, 'h': 1},
+    '2B': {'ab': 1, 'h': 1, 'doubles': 1},
+    '3B': {'ab': 1, 'h': 1, 'triples': 1},
+    'HR': {'ab': 1, 'h': 1, 'hr': 1},
+    'BB': {'bb': 1},
+    'IBB': {'bb': 1},
+    'HBP': {'hbp': 1},
+    'K': {'ab': 1, 'so': 1},
+    'GO': {'ab': 1},
+    'FO': {'ab': 1},
+    'GDP': {'ab': 1, 'dp': 1},
+    'FC': {'ab': 1},
+    'E': {'ab': 1},
+    'SF': {'sf': 1},
+})
+
+PITCHING_TABLE = _table(PITCHING, {
+    '1B': {'h_allowed': 1},
+    '2B': {'h_allowed': 1},
+    '3B': {'h_allowed': 1},
+    'HR': {'h_allowed': 1, 'hra': 1},
+    'BB': {'bb_allowed': 1},
+    'IBB': {'bb_allowed': 1, 'ibb': 1},
+    'HBP': {'hb': 1},
+    'K': {'k_thrown': 1},
+    'WP': {'wp': 1},
+    'BK': {'balk': 1},
+})
+
+
+def _sum_by_key(players, teams, values):
+    """{(player_id, team_id): row of summed values}"""
+    keys, idx = np.unique(np.column_stack([players, teams]), axis=0, return_inverse=True)
+    totals = np.zeros((len(keys), values.shape[1]), dtype=np.int64)
+    np.add.at(totals, idx.ravel(), values)
+    return {(int(p), int(t)): row for (p, t), row in zip(keys, totals)}
+
+
+def pitching_decisions(score, used, entered_margin, lead_taken, outs_by):
+    """
+    {(pitcher_id, team_id): 'W' / 'L' / 'S'} for a finished game.
+    score is {away_team_id: runs, home_team_id: runs}, used {team_id:
+    pitchers in order of appearance}, entered_margin {(pitcher_id,
+    team_id): lead when he came in}, lead_taken [(team_id, its pitcher of
+    record, pitcher who gave up the lead)] and outs_by(pitcher_id, team_id)
+    the outs he got. Ties get no decisions, and neither does a game still
+    so early that the team ahead hasn't pitched.
+    """
+    (away_team_id, away_runs), (home_team_id, home_runs) = score.items()
+    if away_runs == home_runs:
+        return {}
+    winner, loser = (away_team_id, home_team_id) if away_runs > home_runs else (home_team_id, away_team_id)
+    if winner not in used:
+        return {}
+    _, win_pitcher, loss_pitcher = [lead for lead in lead_taken if lead[0] == winner][-1]
+    starter = used[winner][0]
+    win_pitcher = win_pitcher or starter
+
+    # a starter needs five innings for the win; otherwise the reliever
+    # who got the most outs takes it
+    relievers = used[winner][1:]
+    if win_pitcher == starter and outs_by(starter, winner) < 15 and relievers:
+        win_pitcher = max(relievers, key=lambda p: outs_by(p, winner))
+    decisions = {(win_pitcher, winner): 'W', (loss_pitcher, loser): 'L'}
+
+    closer = used[winner][-1]
+    margin = entered_margin[(closer, winner)]
+    if closer != win_pitcher and margin >= 1 and (margin <= 3 or outs_by(closer, winner) >= 9):
+        decisions[(closer, winner)] = 'S'
+    return decisions
+
+
+def reduce_events(events, away_team_id, home_team_id):
+    """
+    Stat lines, line score and final score from a game's events, given as
+    EVENT_FIELDS tuples in play order. Returns {'lines': {(player_id,
+    team_id): {field: value}}, 'innings': {(team_id, inning): runs},
+    'away_score', 'home_score'}.
+    """
+    empty = {'lines': {}, 'innings': {}, 'away_score': 0, 'home_score': 0}
+    if not events:
+        return empty
+
+    cols = np.array(events, dtype=np.int64)
+    inning, half, batter, pitcher, result, outs, runners, scored, rbi, unearned = cols.T
+    batting_team = np.where(half == 0, away_team_id, home_team_id)
+    fielding_team = np.where(half == 0, home_team_id, away_team_id)
+    runs = sum((scored >> bit) & 1 for bit in range(4))
+
+    # ——— counting stats, all events at once ———
+    plate = ~np.isin(result, [CODES[abbr] for abbr in ('SB', 'CS', 'WP', 'PB', 'BK')])
+    batting = _sum_by_key(
+        batter[plate], batting_team[plate],
+        np.column_stack([BATTING_TABLE[result], rbi])[plate],
+    )
+    pitching = _sum_by_key(
+        pitcher, fielding_team,
+        np.column_stack([PITCHING_TABLE[result], outs, runs, runs - unearned]),
+    )
+
+    innings = {}
+    for (team_id, inn), total in _sum_by_key(batting_team, inning, runs[:, None]).items():
+        innings[(team_id, inn)] = int(total[0])
+
+    # ——— bases, runs scored, steals and the lead, in play order ———
+    r_credit, sb, cs = Counter(), Counter(), Counter()
+    score = {away_team_id: 0, home_team_id: 0}
+    mound, used, entered_margin = {}, {}, {}
+    lead_taken = []
+    bases, current_half = [None, None, None], None
+
+    columns = zip(inning.tolist(), half.tolist(), batter.tolist(), pitcher.tolist(), result.tolist(),
+                  runners.tolist(), scored.tolist(), runs.tolist(),
+                  batting_team.tolist(), fielding_team.tolist())
+    for i, (inn, hlf, bat, pit, code, after, who, play_runs, bt, ft) in enumerate(columns):
+        if (inn, hlf) != current_half:
+            bases, current_half = [None, None, None], (inn, hlf)
+
+        if mound.get(ft) != pit:
+            mound[ft] = pit
+            if pit not in used.setdefault(ft, []):
+                used[ft].append(pit)
+                entered_margin[(pit, ft)] = score[ft] - score[bt]
+
+        if who & 1:
+            r_credit[(bat, bt)] += 1
+        for base in range(3):
+            if who & (2 << base):
+                if bases[base] is None:
+                    raise ValueError(f"event {i + 1}: nobody on base {base + 1} to score")
+                r_credit[(bases[base], bt)] += 1
+                if code == CODES['SB']:  # steal of home
+                    sb[(bases[base], bt)] += 1
+
+        from_base = {bases[base]: base for base in range(3) if bases[base] is not None}
+        left = [bases[base] for base in (2, 1, 0) if bases[base] is not None and not who & (2 << base)]
+        if code in REACHES and not who & 1:
+            left.append(bat)
+        occupied = [base for base in (2, 1, 0) if after & (1 << base)]
+        if len(left) < len(occupied):
+            raise ValueError(f"event {i + 1}: more bases occupied than runners")
+        out_on_bases, left = left[:len(left) - len(occupied)], left[len(left) - len(occupied):]
+
+        bases = [None, None, None]
+        for base, player in zip(occupied, left):
+            bases[base] = player
+            if code == CODES['SB'] and base > from_base.get(player, base):
+                sb[(player, bt)] += 1
+        if code == CODES['CS']:
+            for player in out_on_bases:
+                cs[(player, bt)] += 1
+
+        if play_runs:
+            was_ahead = score[bt] > score[ft]
+            score[bt] += play_runs
+            if not was_ahead and score[bt] > score[ft]:
+                lead_taken.append((bt, mound.get(bt), pit))
+
+    decisions = pitching_decisions(
+        score, used, entered_margin, lead_taken,
+        lambda p, team_id: int(pitching[(p, team_id)][len(PITCHING)]),
+    )
+
+    # ——— stat lines ———
+    lines = {}
+    for key, row in batting.items():
+        line = lines.setdefault(key, dict(BLANK))
+        line.update(zip(BATTING + ('rbi',), map(int, row)))
+    for key, row in pitching.items():
+        line = lines.setdefault(key, dict(BLANK))
+        line.update(zip(PITCHING + ('ip_outs', 'ra', 'er'), map(int, row)))
+        line['threw'] = True
+    for field, credits in (('r', r_credit), ('sb', sb), ('cs', cs)):
+        for key, count in credits.items():
+            lines.setdefault(key, dict(BLANK))[field] = count
+    for key, decision in decisions.items():
+        lines[key]['decision'] = decision
+
+    return {
+        'lines': lines,
+        'innings': innings,
+        'away_score': score[away_team_id],
+        'home_score': score[home_team_id],
+    }
+
+
+def apply_play_log(game):
+    """
+    Overwrite the game's derived stat fields, inning scores and score with
+    what its events say. Fielding stats are left alone, since events don't
+    record fielders. Returns False if the game has no events.
+    """
+    events = list(game.events.order_by('seq').values_list(*EVENT_FIELDS))
+    if not events:
+        return False
+    derived = reduce_events(events, game.away_team_id, game.home_team_id)
+
+    with transaction.atomic():
+        existing = {(line.player_id, line.team_id): line for line in PlayerStatLine.objects.filter(game=game)}
+        for key, line in existing.items():
+            for field, value in derived['lines'].get(key, BLANK).items():
+                setattr(line, field, value)
+        PlayerStatLine.objects.bulk_update(existing.values(), DERIVED)
+        PlayerStatLine.objects.bulk_create([
+            PlayerStatLine(game=game, player_id=player_id, team_id=team_id,
+                           position='P' if stats['threw'] else '', **stats)
+            for (player_id, team_id), stats in derived['lines'].items()
+            if (player_id, team_id) not in existing
+        ])
+
+        last_inning = max([9] + [inn for _, inn in derived['innings']])
+        InningScore.objects.filter(game=game).delete()
+        InningScore.objects.bulk_create([
+            InningScore(game=game, team_id=team_id, inning=inn,
+                        runs=derived['innings'].get((team_id, inn), 0))
+            for team_id in (game.away_team_id, game.home_team_id)
+            for inn in range(1, last_inning + 1)
+        ])
+
+        game.away_score = derived['away_score']
+        game.home_score = derived['home_score']
+        game.save(update_fields=['away_score', 'home_score'])
+    return True
@@ -0,0 +1,166 @@
+# greenfield/utils/player_search.py
+#
+# Searches the rated player pool (Players and their PlayerPositionRating
+# rows) on the parsed rating columns. Results come a keyset page at a
+# time. The cursor carries the last row's sort values and the next page
+# starts after them, so a late page costs what the first one does. An
+# OFFSET would read and throw away every row before it. Each ordering has
+# a Players index that matches it column for column.
+
+import base64
+import json
+from django.db.models import Exists, OuterRef, Prefetch, Q
+from players.models import Players, PlayerPositionRating
+from greenfield.utils.rating_fields import HIT_GRADES, PITCH_GRADES
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def _grade(grades):
+    def parse(value):
+        value = value.strip().upper()
+        if value not in grades:
+            raise ValueError(f"unknown grade {value!r}")
+        return grades.index(value)
+    return parse
+
+
+def _flag(value):
+    value = value.strip().lower()
+    if value in ('1', 'true', 'yes', 'on'):
+        return True
+    if value in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f"expected true or false, got {value!r}")
+
+
+def _list(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+# query parameter -> (lookup, parser). Grades go best-first here: a
+# hit_grade of 'B' means B or better, a pitch_grade of 'M' means M or better.
+# A lower probable hit number covers more of the dice, so it's a better hitter.
+PLAYER_FILTERS = {
+    'year': ('year__in', _list),
+    'team': ('team_serial_id', int),
+    'franchise': ('team_serial__team_name__iexact', str.strip),
+    'bats': ('bats__iexact', str.strip),
+    'throws': ('throws__iexact', str.strip),
+    'hit_grade': ('hit_grade__gte', _grade(HIT_GRADES)),
+    'hr_min': ('hr_number__gte', int),
+    'speed_min': ('speed__gte', int),
+    'clutch': ('clutch', _flag),
+    'bat_prob_hit_min': ('bat_prob_hit__gte', int),
+    'bat_prob_hit_max': ('bat_prob_hit__lte', int),
+    'pitch_grade': ('pitch_grade__lte', _grade(PITCH_GRADES)),
+    'effectiveness_min': ('effectiveness__gte', int),
+    'wild_pitch': ('wild_pitch', _flag),
+    'pitch_prob_hit_min': ('pitch_prob_hit__gte', int),
+    'pitch_prob_hit_max': ('pitch_prob_hit__lte', int),
+}
+
+# these all have to hold for the same position rating, e.g. SS with range 5
+RATING_FILTERS = {
+    'position': ('position__name__iexact', str.strip),
+    'range': ('range', int),
+    'range_min': ('range__gte', int),
+    'arm': ('arm', int),
+    'arm_min': ('arm__gte', int),
+    'superior': ('superior', _flag),
+    'catcher_throw_min': ('catcher_throw__gte', int),
+}
+
+# order name -> sort columns, ending in serial so every row has its own place
+ORDERINGS = {
+    'name': ('last_name', 'first_name', 'serial'),
+    'year': ('year', 'last_name', 'first_name', 'serial'),
+    'hit_grade': ('-hit_grade', 'serial'),
+    'effectiveness': ('-effectiveness', 'pitch_grade', 'serial'),
+}
+# a keyset can't step over NULLs, so these orderings only list rated players
+RATED = {'hit_grade': 'hit_grade', 'effectiveness': 'effectiveness'}
+
+
+def _lookups(filters, params):
+    lookups = {}
+    for name, (lookup, parse) in filters.items():
+        value = params.get(name, '')
+        if value == '':
+            continue
+        try:
+            lookups[lookup] = parse(value)
+        except ValueError as exc:
+            raise ValueError(f"{name}: {exc}") from None
+    return lookups
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise ValueError("bad cursor") from None
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise ValueError("bad cursor")
+    return values
+
+
+def after(ordering, values):
+    """Rows that sort after values under ordering: (a, b) > (x, y) spelled out as ORs."""
+    def column(field):
+        return field.lstrip('-'), 'lt' if field.startswith('-') else 'gt'
+
+    seek = Q()
+    for i, field in enumerate(ordering):
+        name, op = column(field)
+        step = Q(**{f'{name}__{op}': values[i]})
+        for prior, value in zip(ordering[:i], values):
+            step &= Q(**{column(prior)[0]: value})
+        seek |= step
+    # the leading column's bound on its own lets the planner start the index scan there
+    name, op = column(ordering[0])
+    return Q(**{f'{name}__{op}e': values[0]}) & seek
+
+
+def search_players(params):
+    """
+    (players, next cursor) for one page of the players matching params (a
+    QueryDict or dict of strings, see PLAYER_FILTERS and RATING_FILTERS),
+    sorted by params['order'] and starting after params['cursor']. Players
+    come with team_serial and their position ratings loaded. The cursor is
+    None on the last page. Bad values raise ValueError.
+    """
+    order = params.get('order') or 'name'
+    if order not in ORDERINGS:
+        raise ValueError(f"order: expected one of {', '.join(ORDERINGS)}")
+    ordering = ORDERINGS[order]
+    try:
+        limit = min(max(int(params.get('limit') or DEFAULT_LIMIT), 1), MAX_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+
+    players = Players.objects.filter(**_lookups(PLAYER_FILTERS, params))
+    if order in RATED:
+        players = players.filter(**{f'{RATED[order]}__isnull': False})
+    rating_lookups = _lookups(RATING_FILTERS, params)
+    if rating_lookups:
+        players = players.filter(Exists(
+            PlayerPositionRating.objects.filter(player=OuterRef('pk'), **rating_lookups)
+        ))
+    if params.get('cursor'):
+        players = players.filter(after(ordering, decode_cursor(params['cursor'], ordering)))
+
+    page = list(
+        players.select_related('team_serial').prefetch_related(
+            Prefetch('position_ratings', queryset=PlayerPositionRating.objects.select_related('position'))
+        ).order_by(*ordering)[:limit + 1]
+    )
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    return page, encode_cursor([getattr(page[-1], field.lstrip('-')) for field in ordering])
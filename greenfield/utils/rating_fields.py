@@ -0,0 +1,105 @@
+# greenfield/utils/rating_fields.py
+#
+# Splits the Sher-Co rating strings into the small integers they're made
+# of, for the parsed columns on Players and PlayerPositionRating. Range
+# ends are kept as the dice numbers printed on the card. Anything that
+# doesn't parse (or is the 'G+ [n-36]' placeholder for too few PA) comes
+# back as all None, the same as no rating.
+
+import re
+from greenfield.utils.rating_tables import DICE_NUMBERS
+
+HIT_GRADES = ('G+', 'E', 'E+', 'D', 'D+', 'C', 'C+', 'B', 'B+', 'A', 'A+', 'AA', 'AAA')   # worst first
+PITCH_GRADES = ('J+', 'J', 'K', 'L', 'M', 'W', 'X', 'Y', 'Z+', 'Z')                      # best first
+GOPHER = {'+': 1, '': 0, '-': -1}
+
+OFFENSE_RE = re.compile(
+    r'(?P<clutch>#?)(?P<letter>AAA|AA|A\+|A|B\+|B|C\+|C|D\+|D|E\+|E|G\+)'
+    r'(?P<hr>\d\d)?(?:\((?P<triple>\d\d)\))?(?P<speed>\**)\s*'
+    r'\[(?P<walk>n|\d\d)-(?P<k>\d\d)(?:/(?P<hbp>\d\d))?\]'
+)
+PITCHING_RE = re.compile(
+    r'(?P<gopher>[+-]?)(?P<letter>J\+|J|K|L|M|W|X|Y|Z\+|Z)(?P<ioe>\d+)\s*'
+    r'\[(?P<walk>\d\d)-(?P<k>n|\d\d)(?:/(?P<hbp>\d\d))?\]\s*(?P<wp>\[WP\])?'
+)
+DEFENSE_RE = re.compile(r'(?P<superior>S?)(?P<arm>\d?)(?P<range>\d?)(?:-(?P<throw>\d))?')
+
+# what rate_player gives anyone with 5 or fewer PA
+UNRATED_OFFENSE = 'G+ [n-36]'
+
+OFFENSE_FIELDS = (
+    'hit_grade', 'clutch', 'hr_number', 'triple_number', 'speed',
+    'walk_top', 'strikeout_top', 'hbp_top',
+)
+PITCHING_FIELDS = (
+    'pitch_grade', 'gopher', 'effectiveness',
+    'pitch_walk_top', 'pitch_strikeout_top', 'pitch_hbp_top', 'wild_pitch',
+)
+DEFENSE_FIELDS = ('superior', 'arm', 'range', 'catcher_throw')
+
+NO_OFFENSE = dict.fromkeys(OFFENSE_FIELDS) | {'clutch': False, 'speed': 0}
+NO_PITCHING = dict.fromkeys(PITCHING_FIELDS) | {'wild_pitch': False}
+NO_DEFENSE = dict.fromkeys(DEFENSE_FIELDS) | {'superior': False}
+
+
+def _dice(value):
+    """A printed dice number as an int, None for 'n' or nothing; ValueError if it isn't one."""
+    if not value or value == 'n':
+        return None
+    number = int(value)
+    if number not in DICE_NUMBERS:
+        raise ValueError(number)
+    return number
+
+
+def offense_fields(offense):
+    """The offense columns for an offense string like '#B+26(34)** [21-42/55]'."""
+    offense = (offense or '').strip()
+    match = OFFENSE_RE.match(offense)
+    if not match or offense == UNRATED_OFFENSE:
+        return dict(NO_OFFENSE)
+    try:
+        return {
+            'hit_grade': HIT_GRADES.index(match['letter']),
+            'clutch': bool(match['clutch']),
+            'hr_number': _dice(match['hr']),
+            'triple_number': _dice(match['triple']),
+            'speed': len(match['speed']),
+            'walk_top': _dice(match['walk']),
+            'strikeout_top': _dice(match['k']),
+            'hbp_top': _dice(match['hbp']),
+        }
+    except ValueError:
+        return dict(NO_OFFENSE)
+
+
+def pitching_fields(pitching):
+    """The pitching columns for a pitching string like '-K7 [13-25/26] [WP]'."""
+    match = PITCHING_RE.match((pitching or '').strip())
+    if not match:
+        return dict(NO_PITCHING)
+    try:
+        return {
+            'pitch_grade': PITCH_GRADES.index(match['letter']),
+            'gopher': GOPHER[match['gopher']],
+            'effectiveness': int(match['ioe']),
+            'pitch_walk_top': _dice(match['walk']),
+            'pitch_strikeout_top': _dice(match['k']),
+            'pitch_hbp_top': _dice(match['hbp']),
+            'wild_pitch': bool(match['wp']),
+        }
+    except ValueError:
+        return dict(NO_PITCHING)
+
+
+def defense_fields(rating):
+    """The position rating columns for a rating like 'S95-2'."""
+    match = DEFENSE_RE.fullmatch((rating or '').strip())
+    if not match or not (rating or '').strip():
+        return dict(NO_DEFENSE)
+    return {
+        'superior': bool(match['superior']),
+        'arm': int(match['arm']) if match['arm'] else None,
+        'range': int(match['range']) if match['range'] else None,
+        'catcher_throw': int(match['throw']) if match['throw'] else None,
+    }
@@ -0,0 +1,26 @@
+# greenfield/utils/rating_tables.py
+#
+# Fixed lookup tables for the 36 two-dice results (11-66). The Sher-Co
+# helpers index into these instead of sorting the dice set on every call.
+
+DICE_NUMBERS = frozenset({
+    11, 12, 13, 14, 15, 16,
+    21, 22, 23, 24, 25, 26,
+    31, 32, 33, 34, 35, 36,
+    41, 42, 43, 44, 45, 46,
+    51, 52, 53, 54, 55, 56,
+    61, 62, 63, 64, 65, 66,
+})
+
+ASCENDING = tuple(sorted(DICE_NUMBERS))
+DESCENDING = tuple(sorted(DICE_NUMBERS, reverse=True))
+
+# Number of 36ths (0-36) -> the dice number that covers that many results,
+# counting down from 66. 0 keeps the old list[-1] behaviour
+# probable_hit_number relied on (11).
+DESCENDING_BY_36THS = {k: DESCENDING[k - 1] for k in range(0, 37)}
+
+
+def in_36ths(part, whole):
+    """round(part / whole * 36), the count of dice results a rate is worth."""
+    return round((part / whole) * 36)
@@ -0,0 +1,43 @@
+# greenfield/utils/roster.py
+
+from django.db.models import Prefetch
+from players.models import Players, PlayerPositionRating
+from greenfield.utils.sherco import get_primary_position, get_primary_position_order
+
+
+def pitching_sort_key(player):
+    # most innings of effectiveness first, then by grade; unrated sort as 1 IoE
+    if player.pitch_grade is None:
+        return (-1, -1)
+    return (-player.effectiveness, player.pitch_grade)
+
+
+def load_roster(team_serial):
+    """
+    A team's players with their position ratings prefetched (two queries
+    however big the roster), as (batters, pitchers). Batters are sorted by
+    primary position then name, pitchers by pitching rating. Each player
+    gets .ratings, .is_pitcher and .primary_position.
+    """
+    players = list(
+        Players.objects.filter(team_serial_id=team_serial).prefetch_related(
+            Prefetch(
+                'position_ratings',
+                queryset=PlayerPositionRating.objects.select_related('position'),
+            )
+        )
+    )
+
+    for player in players:
+        ratings = list(player.position_ratings.all())
+        player.ratings = ratings
+        player.is_pitcher = any(r.position.name == 'P' for r in ratings if r.position)
+        player.primary_position = get_primary_position(ratings)
+
+    batters = [p for p in players if not p.is_pitcher]
+    pitchers = [p for p in players if p.is_pitcher]
+
+    batters.sort(key=lambda p: (get_primary_position_order(p), p.last_name, p.first_name))
+    pitchers.sort(key=pitching_sort_key)
+
+    return batters, pitchers
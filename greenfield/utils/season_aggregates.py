@@ -0,0 +1,137 @@
+# greenfield/utils/season_aggregates.py
+#
+# Keeps PlayerSeasonAggregate / TeamSeasonAggregate in step with finalized
+# games, so the competition stats pages read a few rows per player or team
+# instead of every PlayerStatLine of the season.
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+OFFENSE = ('ab', 'h', 'doubles', 'triples', 'r', 'rbi', 'bb', 'hbp', 'so', 'sf', 'hr', 'sb', 'cs', 'dp')
+PITCHING = ('ip_outs', 'er', 'h_allowed', 'bb_allowed', 'k_thrown', 'hb', 'hra', 'balk', 'wp', 'ibb')
+FIELDING = ('po', 'a', 'e', 'pb')
+
+PLAYER_FIELDS = ('games', 'pitching_games', 'wins', 'losses', 'saves') + OFFENSE + PITCHING + FIELDING
+TEAM_FIELDS = ('games',) + OFFENSE + PITCHING + FIELDING
+
+
+def _models():
+    from stats.models import PlayerStatLine, PlayerSeasonAggregate, TeamSeasonAggregate
+    return PlayerStatLine, PlayerSeasonAggregate, TeamSeasonAggregate
+
+
+def _annotated(totals):
+    # aliased, since an annotation named like a field would shadow it in the filters
+    return {f'total_{name}': expr for name, expr in totals.items()}
+
+
+def _player_totals():
+    pitched = Q(ip_outs__gt=0)
+    totals = {f: Sum(f) for f in OFFENSE + FIELDING}
+    totals.update({f: Sum(f, filter=pitched) for f in PITCHING})
+    totals.update(
+        games=Count('game', distinct=True),
+        pitching_games=Count('game', distinct=True, filter=pitched),
+        wins=Count('id', filter=pitched & Q(decision='W')),
+        losses=Count('id', filter=pitched & Q(decision='L')),
+        saves=Count('id', filter=pitched & Q(decision='S')),
+    )
+    return _annotated(totals)
+
+
+def _team_totals():
+    totals = {f: Sum(f) for f in OFFENSE + PITCHING + FIELDING}
+    totals['games'] = Count('game', distinct=True)
+    return _annotated(totals)
+
+
+def _merge(model, existing, rows, key_fields, fields, competition_id):
+    """Add grouped rows onto existing aggregates, creating the missing ones."""
+    changed, created = [], []
+    for row in rows:
+        key = tuple(row[f] for f in key_fields)
+        agg = existing.get(key)
+        if agg is None:
+            agg = model(competition_id=competition_id, **dict(zip(key_fields, key)))
+            created.append(agg)
+        else:
+            changed.append(agg)
+        for field in fields:
+            setattr(agg, field, getattr(agg, field) + (row[f'total_{field}'] or 0))
+
+    model.objects.bulk_create(created)
+    if changed:
+        model.objects.bulk_update(changed, fields)
+
+
+def add_final_game(game):
+    """
+    Fold one game's stat lines into its competition's aggregates. Call once,
+    inside the transaction that moves the game to final.
+    """
+    PlayerStatLine, PlayerSeasonAggregate, TeamSeasonAggregate = _models()
+    lines = PlayerStatLine.objects.filter(game=game)
+
+    player_rows = list(lines.values('player_id', 'team_id').annotate(**_player_totals()))
+    existing = {
+        (agg.player_id, agg.team_id): agg
+        for agg in PlayerSeasonAggregate.objects.filter(
+            competition_id=game.competition_id,
+            player_id__in={row['player_id'] for row in player_rows},
+        )
+    }
+    _merge(PlayerSeasonAggregate, existing, player_rows, ('player_id', 'team_id'),
+           PLAYER_FIELDS, game.competition_id)
+
+    team_rows = list(lines.values('team_id').annotate(**_team_totals()))
+    existing = {
+        (agg.team_id,): agg
+        for agg in TeamSeasonAggregate.objects.filter(
+            competition_id=game.competition_id,
+            team_id__in={row['team_id'] for row in team_rows},
+        )
+    }
+    _merge(TeamSeasonAggregate, existing, team_rows, ('team_id',), TEAM_FIELDS, game.competition_id)
+
+
+def rebuild_season_aggregates(competition_ids=None):
+    """
+    Recompute the aggregates from every finalized game, for the given
+    competitions or all of them. Returns (player rows, team rows).
+    """
+    PlayerStatLine, PlayerSeasonAggregate, TeamSeasonAggregate = _models()
+
+    lines = PlayerStatLine.objects.filter(game__status='final')
+    player_aggs = PlayerSeasonAggregate.objects.all()
+    team_aggs = TeamSeasonAggregate.objects.all()
+    if competition_ids is not None:
+        lines = lines.filter(game__competition_id__in=competition_ids)
+        player_aggs = player_aggs.filter(competition_id__in=competition_ids)
+        team_aggs = team_aggs.filter(competition_id__in=competition_ids)
+
+    players = [
+        PlayerSeasonAggregate(
+            competition_id=row['game__competition_id'],
+            player_id=row['player_id'],
+            team_id=row['team_id'],
+            **{f: row[f'total_{f}'] or 0 for f in PLAYER_FIELDS},
+        )
+        for row in lines.values('game__competition_id', 'player_id', 'team_id')
+                        .annotate(**_player_totals()).order_by()
+    ]
+    teams = [
+        TeamSeasonAggregate(
+            competition_id=row['game__competition_id'],
+            team_id=row['team_id'],
+            **{f: row[f'total_{f}'] or 0 for f in TEAM_FIELDS},
+        )
+        for row in lines.values('game__competition_id', 'team_id')
+                        .annotate(**_team_totals()).order_by()
+    ]
+
+    with transaction.atomic():
+        player_aggs.delete()
+        team_aggs.delete()
+        PlayerSeasonAggregate.objects.bulk_create(players, batch_size=1000)
+        TeamSeasonAggregate.objects.bulk_create(teams, batch_size=1000)
+    return len(players), len(teams)
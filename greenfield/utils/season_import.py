@@ -0,0 +1,306 @@
+# greenfield/utils/season_import.py
+
+import numpy as np
+from collections import defaultdict
+from django.db import transaction
+from psycopg2.extras import RealDictCursor
+from greenfield.utils.lahman_db import get_lahman_connection, use_snapshot
+from greenfield.utils import lahman_snapshot
+from greenfield.utils import sherco_batch
+from greenfield.utils.sherco import (
+    def_rating, get_superior_rating, get_catcher_throw_rating
+)
+from greenfield.utils.all_time import get_franchise_display_map
+from players.models import Players, PlayerPositionRating, Position
+from teams.models import Teams
+
+# Same roster cutoff as get_players_by_team_and_year
+MIN_GAMES = 10
+
+BATTING_QUERY = """
+    SELECT b.playerID, b.yearID, b.teamID,
+        p.nameFirst, p.nameLast, p.bats, p.throws,
+        COALESCE(SUM(b.G), 0) AS g, COALESCE(SUM(b.AB), 0) AS ab,
+        COALESCE(SUM(b.H), 0) AS h, COALESCE(SUM(b."2B"), 0) AS doubles,
+        COALESCE(SUM(b."3B"), 0) AS triples, COALESCE(SUM(b.HR), 0) AS hr,
+        COALESCE(SUM(b.RBI), 0) AS rbi, COALESCE(SUM(b.SB), 0) AS sb,
+        COALESCE(SUM(b.BB), 0) AS bb, COALESCE(SUM(b.SO), 0) AS so,
+        COALESCE(SUM(b.HBP), 0) AS hbp, COALESCE(SUM(b.SF), 0) AS sf,
+        COALESCE(SUM(b.SH), 0) AS sh
+    FROM Batting b
+    JOIN People p ON p.playerID = b.playerID
+    WHERE b.yearID BETWEEN %s AND %s
+    GROUP BY b.playerID, b.yearID, b.teamID,
+        p.nameFirst, p.nameLast, p.bats, p.throws
+    HAVING SUM(b.G) >= %s
+"""
+
+PITCHING_QUERY = """
+    SELECT playerID, yearID, teamID,
+        COALESCE(SUM(BFP), 0) AS bfp, COALESCE(SUM(H), 0) AS h,
+        COALESCE(SUM(BB), 0) AS bb, COALESCE(SUM(HBP), 0) AS hbp,
+        SUM(BAOpp) AS baopp, COALESCE(SUM(G), 0) AS g,
+        COALESCE(SUM(IPouts), 0) AS ipouts, COALESCE(SUM(SO), 0) AS so,
+        COALESCE(SUM(HR), 0) AS hr, COALESCE(SUM(WP), 0) AS wp
+    FROM Pitching
+    WHERE yearID BETWEEN %s AND %s
+    GROUP BY playerID, yearID, teamID
+"""
+
+FIELDING_QUERY = """
+    SELECT playerID, yearID, teamID, POS,
+        COALESCE(SUM(PO), 0) AS po, COALESCE(SUM(A), 0) AS a,
+        COALESCE(SUM(E), 0) AS e, COALESCE(SUM(G), 0) AS g,
+        COALESCE(SUM(SB), 0) AS sb, COALESCE(SUM(CS), 0) AS cs
+    FROM Fielding
+    WHERE yearID BETWEEN %s AND %s
+    GROUP BY playerID, yearID, teamID, POS
+    HAVING SUM(G) >= 1
+"""
+
+OF_SPLIT_QUERY = """
+    SELECT playerID, yearID, teamID, POS,
+        COALESCE(SUM(PO), 0) AS po, COALESCE(SUM(A), 0) AS a,
+        COALESCE(SUM(E), 0) AS e, COALESCE(SUM(G), 0) AS g
+    FROM FieldingOFsplit
+    WHERE yearID BETWEEN %s AND %s
+    GROUP BY playerID, yearID, teamID, POS
+    HAVING SUM(G) >= 5
+"""
+
+TEAMS_QUERY = """
+    SELECT yearID, teamID, franchID, name
+    FROM Teams
+    WHERE yearID BETWEEN %s AND %s
+"""
+
+
+def _stint_key(row):
+    return (row['playerid'], row['yearid'], row['teamid'])
+
+
+def _query_season_rows(year_from, year_to, min_games):
+    params = [year_from, year_to]
+
+    with get_lahman_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            rows = {}
+            for name, query, extra in (
+                ('batting', BATTING_QUERY, [min_games]),
+                ('pitching', PITCHING_QUERY, []),
+                ('fielding', FIELDING_QUERY, []),
+                ('of_splits', OF_SPLIT_QUERY, []),
+                ('teams', TEAMS_QUERY, []),
+            ):
+                cur.execute(query, params + extra)
+                rows[name] = cur.fetchall()
+    return rows
+
+
+def fetch_season_stats(year_from, year_to, min_games=MIN_GAMES):
+    """
+    Pull every player-season-team stint for the given years with one grouped
+    query per Lahman table (or the same groupings over the local snapshot).
+    Returns (stints, team_names) where stints is a list of dicts holding the
+    batting, pitching and fielding totals.
+    """
+    if use_snapshot():
+        rows = lahman_snapshot.get_season_rows(year_from, year_to, min_games)
+    else:
+        rows = _query_season_rows(year_from, year_to, min_games)
+
+    batting = rows['batting']
+    pitching = {_stint_key(row): row for row in rows['pitching']}
+
+    fielding = defaultdict(list)
+    for row in rows['fielding']:
+        fielding[_stint_key(row)].append(row)
+
+    of_splits = defaultdict(list)
+    for row in rows['of_splits']:
+        of_splits[_stint_key(row)].append(row)
+
+    teams = rows['teams']
+
+    display_map = get_franchise_display_map()
+    team_names = {
+        (row['yearid'], row['teamid']): display_map.get(row['franchid']) or row['name']
+        for row in teams
+    }
+
+    stints = []
+    for row in batting:
+        key = _stint_key(row)
+        stints.append({
+            'playerID': row['playerid'],
+            'year': row['yearid'],
+            'teamID': row['teamid'],
+            'batting': row,
+            'pitching': pitching.get(key),
+            'fielding': fielding.get(key, []),
+            'of_splits': of_splits.get(key, []),
+        })
+
+    return stints, team_names
+
+
+def rate_fielding(year, fielding, of_splits):
+    """Ordered list of (pos, rating), most games first."""
+    catching = [row for row in fielding if row['pos'] == 'C']
+    sba_total = sum(row['sb'] for row in catching)
+    cs_total = sum(row['cs'] for row in catching)
+
+    rows = [row for row in fielding if row['pos'] != 'OF']
+    if of_splits:
+        rows += of_splits
+    else:
+        rows += [row for row in fielding if row['pos'] == 'OF']
+    rows.sort(key=lambda row: row['g'], reverse=True)
+
+    position_ratings = []
+    for row in rows:
+        chances = row['po'] + row['a'] + row['e']
+        fpct = round((row['po'] + row['a']) / chances, 3) if chances > 0 else 0.000
+        superior = get_superior_rating(row['pos'], fpct, year)
+        dr = def_rating(row['pos'], row['a'], row['po'], row['g'])
+        cr = get_catcher_throw_rating(cs_total, sba_total)
+        position_ratings.append((row['pos'], superior + dr + cr))
+
+    return position_ratings
+
+
+def rate_stints(stints):
+    """
+    Rate a list of stints in one pass: offense and pitching go through the
+    column-wise engine, fielding is per player. Returns one dict per stint.
+    """
+    if not stints:
+        return []
+
+    batting = [s['batting'] for s in stints]
+    pitching = [s['pitching'] or {} for s in stints]
+
+    def col(rows, field, default=0):
+        return np.array([row.get(field, default) for row in rows], dtype=float)
+
+    offense, bat_prob_hit = sherco_batch.rate_offense(
+        *(col(batting, f) for f in (
+            'g', 'ab', 'h', 'doubles', 'triples', 'hr', 'rbi',
+            'sb', 'bb', 'so', 'hbp', 'sf', 'sh'
+        ))
+    )
+    baopp = np.array([
+        np.nan if row.get('baopp') is None else float(row['baopp'])
+        for row in pitching
+    ])
+    pitch_str, pitch_ctl, pitch_prob_hit = sherco_batch.rate_pitching(
+        col(pitching, 'bfp'), col(pitching, 'h'), col(pitching, 'bb'),
+        col(pitching, 'hbp'), baopp, col(pitching, 'g'), col(pitching, 'ipouts'),
+        col(pitching, 'so'), col(pitching, 'hr'), col(pitching, 'wp'),
+    )
+
+    ratings = []
+    for i, stint in enumerate(stints):
+        ratings.append({
+            'offense': str(offense[i]),
+            'bat_prob_hit': int(bat_prob_hit[i]),
+            'pitching': str(pitch_str[i]),
+            'pitch_ctl': pitch_ctl[i] and int(pitch_ctl[i]),
+            'pitch_prob_hit': pitch_prob_hit[i] and int(pitch_prob_hit[i]),
+            'positions': rate_fielding(stint['year'], stint['fielding'], stint['of_splits']),
+        })
+    return ratings
+
+
+def import_seasons(year_from, year_to=None, min_games=MIN_GAMES):
+    """
+    Rate every Lahman player-season between year_from and year_to and save
+    the Teams, Players and PlayerPositionRating rows in bulk. Players that
+    already exist for a team are left alone.
+    """
+    year_to = year_to or year_from
+    stints, team_names = fetch_season_stats(year_from, year_to, min_games)
+    summary = {'teams': 0, 'players': 0, 'positions': 0, 'skipped': 0}
+
+    position_map = {pos.name: pos for pos in Position.objects.all()}
+
+    with transaction.atomic():
+        # Teams: one per (year, franchise display name)
+        wanted = {
+            (str(s['year']), team_names.get((s['year'], s['teamID']), s['teamID']))
+            for s in stints
+        }
+        teams = {
+            (t.first_name, t.team_name): t
+            for t in Teams.objects.filter(
+                first_name__in={year for year, _ in wanted},
+                team_name__in={name for _, name in wanted}
+            )
+        }
+        new_teams = [
+            Teams(first_name=year, team_name=name)
+            for year, name in wanted if (year, name) not in teams
+        ]
+        for team in Teams.objects.bulk_create(new_teams):
+            teams[(team.first_name, team.team_name)] = team
+        summary['teams'] = len(new_teams)
+
+        existing = set(
+            Players.objects.filter(
+                year__in={year for year, _ in wanted},
+                team_serial__in=teams.values()
+            ).values_list('first_name', 'last_name', 'year', 'team_serial_id')
+        )
+
+        new_players, new_positions = [], []
+        for stint, rating in zip(stints, rate_stints(stints)):
+            b = stint['batting']
+            year = str(stint['year'])
+            team = teams[(year, team_names.get((stint['year'], stint['teamID']), stint['teamID']))]
+            first_name, last_name = b['namefirst'] or '', b['namelast'] or ''
+
+            if (first_name, last_name, year, team.serial) in existing:
+                summary['skipped'] += 1
+                continue
+            existing.add((first_name, last_name, year, team.serial))
+
+            new_players.append(Players(
+                year=year,
+                first_name=first_name,
+                last_name=last_name,
+                bats=b['bats'] or 'R/L',
+                throws=b['throws'] or 'R/L',
+                offense=rating['offense'],
+                bat_prob_hit=rating['bat_prob_hit'],
+                pitching=rating['pitching'],
+                pitch_ctl=rating['pitch_ctl'],
+                pitch_prob_hit=rating['pitch_prob_hit'],
+                team_serial=team,
+            ))
+            new_positions.append(rating['positions'])
+
+        for player in new_players:
+            player.parse_ratings()
+        Players.objects.bulk_create(new_players)
+
+        ratings = []
+        for player, positions in zip(new_players, new_positions):
+            order = 0
+            for pos, rating in positions:
+                if pos not in position_map:
+                    continue
+                ratings.append(PlayerPositionRating(
+                    player=player,
+                    position=position_map[pos],
+                    rating=rating,
+                    position_order=order,
+                ))
+                order += 1
+        for rating in ratings:
+            rating.parse_rating()
+        PlayerPositionRating.objects.bulk_create(ratings)
+
+        summary['players'] = len(new_players)
+        summary['positions'] = len(ratings)
+
+    return summary
@@ -0,0 +1,253 @@
+# greenfield/utils/season_sim.py
+#
+# Whole seasons for a competition's TeamEntry teams with the simulator.
+# The schedule is a repeated round robin of short series. Every game's RNG
+# is seeded from (season seed, replica, game number), so a season or any
+# one game in it comes out the same however the work is split up. Games
+# and replicas are handed to a process pool. Each worker gets the parsed
+# teams once and sends back only what the caller needs: finished games to
+# save, or a replica's final records for playoff odds.
+
+import datetime
+import hashlib
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+import django
+from django.db import connections
+from django.db.models import Q
+from stats.models import Game, TeamEntry
+from greenfield.utils.simulator import load_sim_teams, simulate_game, save_games
+from greenfield.utils.standings import team_placements
+
+_teams = None
+_fixtures = None
+
+
+def round_robin(team_ids):
+    """Rounds in which every team plays once (circle method), as (home, away) pairs."""
+    teams = list(team_ids) + ([None] if len(team_ids) % 2 else [])
+    rounds = []
+    for r in range(len(teams) - 1):
+        pairs = zip(teams[:len(teams) // 2], reversed(teams[len(teams) // 2:]))
+        rounds.append([(a, b) if r % 2 else (b, a) for a, b in pairs if a is not None and b is not None])
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return rounds
+
+
+def season_schedule(team_ids, games_per_team=162, series_length=3):
+    """
+    Fixtures (number, day, home, away, home turn, away turn) for a season
+    of series_length-game series, cycling through the round robin with home
+    and away swapped every other time through, until every team has played
+    games_per_team (an odd number of teams leaves each a few short for
+    the byes). A team's turn is how many games it has played before that
+    one, which picks its starter.
+    """
+    rounds = round_robin(sorted(team_ids))
+    if not rounds:
+        return []
+    played = defaultdict(int)
+    fixtures, day, cycle = [], 0, 0
+    while True:
+        for pairs in rounds:
+            if max(played.values(), default=0) >= games_per_team:
+                return fixtures
+            for _ in range(series_length):
+                for home, away in pairs:
+                    if cycle % 2:
+                        home, away = away, home
+                    fixtures.append((len(fixtures), day, home, away, played[home], played[away]))
+                    played[home] += 1
+                    played[away] += 1
+                day += 1
+        cycle += 1
+
+
+def game_seed(season_seed, replica, number):
+    """A game's RNG seed, positive and inside a BigIntegerField."""
+    digest = hashlib.blake2b(f'{season_seed}:{replica}:{number}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') >> 1
+
+
+def simulate_fixture(teams, fixture, seed):
+    _, _, home_id, away_id, home_turn, away_turn = fixture
+    home, away = teams[home_id], teams[away_id]
+    result = simulate_game(home, away, Random(seed), home.starter(home_turn), away.starter(away_turn))
+    result['seed'] = seed
+    return result
+
+
+def _init_worker(teams, fixtures):
+    global _teams, _fixtures
+    # a no-op under fork; spawn/forkserver children need the app registry
+    django.setup()
+    _teams, _fixtures = teams, fixtures
+
+
+def _play_games(numbers, season_seed):
+    return [
+        simulate_fixture(_teams, _fixtures[n], game_seed(season_seed, 0, n))
+        for n in numbers
+    ]
+
+
+def _play_replica(replica, season_seed):
+    """{team id: [wins, losses, ties, run differential]} at the end of one replica."""
+    records = defaultdict(lambda: [0, 0, 0, 0])
+    for fixture in _fixtures:
+        result = simulate_fixture(_teams, fixture, game_seed(season_seed, replica, fixture[0]))
+        home, away = records[result['home_team_id']], records[result['away_team_id']]
+        margin = result['home_score'] - result['away_score']
+        home[3] += margin
+        away[3] -= margin
+        if margin > 0:
+            home[0] += 1
+            away[1] += 1
+        elif margin < 0:
+            home[1] += 1
+            away[0] += 1
+        else:
+            home[2] += 1
+            away[2] += 1
+    return dict(records)
+
+
+def _pool_map(function, jobs, teams, fixtures, workers, chunksize=1):
+    global _teams, _fixtures
+    if workers == 1:
+        _teams, _fixtures = teams, fixtures
+        return [function(*job) for job in jobs]
+
+    # children must open their own database connections, not share ours
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(teams, fixtures)) as pool:
+        return list(pool.map(function, *zip(*jobs), chunksize=chunksize))
+
+
+def _workers(workers, jobs):
+    return max(1, min(workers or os.cpu_count() or 1, jobs))
+
+
+def competition_teams(competition):
+    """
+    (sim teams, placements) for a competition's TeamEntry teams, placements
+    being {team_id: (league_id, division_id)} from each team's most
+    specific entry.
+    """
+    placements = team_placements(
+        TeamEntry.objects.filter(competition=competition).values_list('team_id', 'league_id', 'division_id')
+    )
+    return load_sim_teams(list(placements)), placements
+
+
+def simulate_season(competition, season_seed, games_per_team=162, series_length=3,
+                    start=None, workers=None, save=True):
+    """
+    Play one season (replica 0 of season_seed), sharding the games across
+    processes, and save it to the competition in bulk. Returns the
+    [(date_played, result)] list in schedule order.
+    """
+    teams, _ = competition_teams(competition)
+    fixtures = season_schedule(list(teams), games_per_team, series_length)
+    workers = _workers(workers, len(fixtures))
+    numbers = [fixture[0] for fixture in fixtures]
+    shards = [(numbers[i::workers], season_seed) for i in range(workers)]
+
+    results = [None] * len(fixtures)
+    for (shard, _), played in zip(shards, _pool_map(_play_games, shards, teams, fixtures, workers)):
+        for n, result in zip(shard, played):
+            results[n] = result
+
+    start = start or datetime.date.today()
+    games = [
+        (start + datetime.timedelta(days=fixture[1]), result)
+        for fixture, result in zip(fixtures, results)
+    ]
+    if save:
+        save_games(competition, games)
+    return games
+
+
+def playoff_teams(records, placements, spots):
+    """
+    (division winners, playoff teams) from one replica's records and the
+    teams' placements (see competition_teams): each league sends its
+    division winners plus the best of the rest until it has spots teams.
+    Ties go to run differential, then the lower team id.
+    """
+    def rank(team_id):
+        wins, losses, ties, diff = records.get(team_id, (0, 0, 0, 0))
+        pct = wins / (wins + losses) if wins + losses else 0
+        return (-pct, -diff, team_id)
+
+    leagues, divisions = defaultdict(list), defaultdict(list)
+    for team_id, (league_id, division_id) in placements.items():
+        leagues[league_id].append(team_id)
+        if division_id is not None:
+            divisions[division_id].append(team_id)
+
+    winners = {min(members, key=rank) for members in divisions.values()}
+    playoffs = set()
+    for members in leagues.values():
+        seeded = [team for team in members if team in winners]
+        rest = sorted((team for team in members if team not in winners), key=rank)
+        playoffs.update((seeded + rest)[:max(spots, len(seeded))])
+    return winners, playoffs
+
+
+def playoff_odds(competition, season_seed, replicas=1000, games_per_team=162,
+                 series_length=3, spots=4, workers=None):
+    """
+    Play the season replicas times, one replica per task across the pool.
+    Returns [{'team', 'wins', 'losses', 'division', 'playoffs'}], best
+    average record first, with division and playoffs as shares of replicas.
+    """
+    teams, placements = competition_teams(competition)
+    fixtures = season_schedule(list(teams), games_per_team, series_length)
+    workers = _workers(workers, replicas)
+    jobs = [(replica, season_seed) for replica in range(replicas)]
+    chunksize = max(1, replicas // (workers * 4))
+
+    totals = defaultdict(lambda: {'wins': 0, 'losses': 0, 'division': 0, 'playoffs': 0})
+    for records in _pool_map(_play_replica, jobs, teams, fixtures, workers, chunksize):
+        winners, playoffs = playoff_teams(records, placements, spots)
+        for team_id, (wins, losses, _, _) in records.items():
+            total = totals[team_id]
+            total['wins'] += wins
+            total['losses'] += losses
+            total['division'] += team_id in winners
+            total['playoffs'] += team_id in playoffs
+
+    rows = [
+        {
+            'team': teams[team_id].name,
+            'wins': total['wins'] / replicas,
+            'losses': total['losses'] / replicas,
+            'division': total['division'] / replicas,
+            'playoffs': total['playoffs'] / replicas,
+        }
+        for team_id, total in totals.items()
+    ]
+    rows.sort(key=lambda row: (-row['wins'], row['team']))
+    return rows
+
+
+def replay_game(game):
+    """
+    Simulate a saved game again from its seed. Its starters are found the
+    way the schedule picked them: by how many simulated games each team
+    had already played in the competition.
+    """
+    teams = load_sim_teams([game.home_team_id, game.away_team_id])
+    earlier = Game.objects.filter(competition_id=game.competition_id, seed__isnull=False).filter(
+        Q(date_played__lt=game.date_played) | Q(date_played=game.date_played, pk__lt=game.pk)
+    )
+
+    def turn(team_id):
+        return earlier.filter(Q(home_team_id=team_id) | Q(away_team_id=team_id)).count()
+
+    fixture = (None, None, game.home_team_id, game.away_team_id, turn(game.home_team_id), turn(game.away_team_id))
+    return simulate_fixture(teams, fixture, game.seed)
@@ -1,13 +1,9 @@
-import math, re
+import math
+from greenfield.utils.rating_tables import (
+    DICE_NUMBERS, ASCENDING, DESCENDING, DESCENDING_BY_36THS, in_36ths
+)
 
-numbers = {
-    11,12,13,14,15,16,
-    21,22,23,24,25,26,
-    31,32,33,34,35,36,
-    41,42,43,44,45,46,
-    51,52,53,54,55,56,
-    61,62,63,64,65,66
-    }
+numbers = DICE_NUMBERS
 
 def clutch(rbi, g):
     rate = round(rbi / g, 3)
@@ -45,14 +41,14 @@ def hr_3b_number(hr, trip, h):
         if hr_check < .5: hr_num, hr_check = '', 0
         elif hr_check >= .5:
             hr_check = round(hr_check) - 1
-            hr_num = sorted(numbers)[hr_check]
+            hr_num = ASCENDING[hr_check]
         hr_trp_score += str(hr_num)
     else: hr_check = 0
     
     if trip > 0 and h > 0:
-        trip_check = round((trip / h) * 36)
+        trip_check = in_36ths(trip, h)
         if trip_check >= 1:
-            trip_num = sorted(numbers)[hr_check + trip_check]
+            trip_num = ASCENDING[hr_check + trip_check]
             hr_trp_score += '(' + str(trip_num) + ')'
 
     return hr_trp_score
@@ -71,16 +67,16 @@ def speed(sb, h, bb, hbp, double, triple, hr):
 def batter_bb_k(bb, so, hbp, pa):
     if bb == 0: walk_check, walk_num = 0, 'n'
     else:
-        walk_check = round((bb / pa) * 36) - 1
+        walk_check = in_36ths(bb, pa) - 1
         if walk_check <= 0: walk_num, walk_check = 'n', 0
-        else: walk_num = sorted(numbers)[walk_check]
-    k_check = round((so / pa) * 36)
+        else: walk_num = ASCENDING[walk_check]
+    k_check = in_36ths(so, pa)
     if k_check == 36: k_num = '66'
-    else: k_num = sorted(numbers)[walk_check + k_check]
+    else: k_num = ASCENDING[walk_check + k_check]
     hbp_check = math.ceil((hbp / pa) * 36)
 
     if hbp_check:
-        hbp_num = sorted(numbers)[walk_check + k_check + hbp_check]
+        hbp_num = ASCENDING[walk_check + k_check + hbp_check]
         hbp_str = '/' + str(hbp_num)
     else: hbp_str = ''
 
@@ -89,10 +85,7 @@ def batter_bb_k(bb, so, hbp, pa):
     return bb_k_string
 
 def probable_hit_number(h, pa):
-    ph_check = round((h / pa) * 36) - 1
-    ph_num = sorted(numbers, reverse=True)[ph_check]
-
-    return ph_num
+    return DESCENDING_BY_36THS[in_36ths(h, pa)]
 
 def pitch_letter(bavg_against):
     if bavg_against < .140: letter = 'J+'
@@ -114,18 +107,17 @@ def innings_of_effectiveness(g, ip):
 
 def pitcher_bb_k_hbp(bf, bb, so, hbp):
     bb_check = math.ceil((bb / bf) * 36)
-    bb_num = sorted(numbers)[bb_check]
-    if bb_num < 11: bb_num = 11
+    bb_num = ASCENDING[bb_check]
     bb_string = '[' + str(bb_num) + '-'
-    k_check = round((so / bf) * 36)
+    k_check = in_36ths(so, bf)
     if k_check == 0: k_str = 'n'
     else:
-        k_num = sorted(numbers)[bb_check + k_check]
+        k_num = ASCENDING[bb_check + k_check]
         k_str = str(k_num)
     hp_check = math.ceil((hbp / bf) * 36)
     if hp_check == 0: hp_str = ']'
     else:
-        hp_num = sorted(numbers)[bb_check + k_check + hp_check]
+        hp_num = ASCENDING[bb_check + k_check + hp_check]
         hp_str = str('/' + str(hp_num) + ']')
 
     return bb_string + k_str + hp_str
@@ -147,10 +139,10 @@ def wild_pitch(wp):
     return wp_str
 
 def pitcher_control_number(walks, hb, hits_allowed, bf):
-    br_check = round(((walks + hits_allowed + hb) / bf) * 36)
+    br_check = in_36ths(walks + hits_allowed + hb, bf)
     if br_check == 36: pcn = 11
     else:
-        pcn = str(sorted(numbers, reverse=True)[br_check])
+        pcn = str(DESCENDING[br_check])
 
     return pcn
 
@@ -281,23 +273,8 @@ POSITION_ORDER = {
 }
 
 def get_primary_position_order(player):
-    ratings = player.position_ratings.all().select_related('position')
-    sorted_ratings = sorted(ratings, key=lambda r: r.position_order if r.position_order is not None else 999)
-    if sorted_ratings:
-        pos_name = sorted_ratings[0].position.name
-        return POSITION_ORDER.get(pos_name, 99)
-    return 99
-
-def parse_pitching_sort_key(pitching_str):
-    if not pitching_str:
-        return (-1, '')
-    prefix = pitching_str.split(' ')[0]
-    match = re.match(r'[^A-Z]*([A-Z])(\d+)', prefix)
-    if match:
-        letter = match.group(1)
-        number = int(match.group(2))
-        return (-number, letter)
-    return (-1, '')
+    # plain .all() so a prefetch_related('position_ratings') is reused
+    return POSITION_ORDER.get(get_primary_position(player.position_ratings.all()), 99)
 
 def get_primary_position(ratings):
     sorted_ratings = sorted(ratings, key=lambda r: r.position_order if r.position_order is not None else 999)
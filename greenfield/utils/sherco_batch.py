@@ -0,0 +1,217 @@
+# greenfield/utils/sherco_batch.py
+#
+# Column-at-a-time versions of the rating helpers in sherco.py. Every
+# function takes NumPy arrays (or anything np.asarray accepts) and returns
+# the same values the scalar helper would give for each row, so whole
+# seasons can be rated without a Python loop per player.
+
+import numpy as np
+from greenfield.utils import rating_tables
+
+ASCENDING = np.array(rating_tables.ASCENDING)
+DESCENDING = np.array(rating_tables.DESCENDING)
+ASCENDING_STR = ASCENDING.astype(str)
+DESCENDING_STR = DESCENDING.astype(str)
+
+# hit_letter: round(h / ab, 3) in thousandths -> letter
+HIT_THRESHOLDS = [84, 112, 140, 168, 196, 223, 251, 279, 307, 335, 362, 390]
+HIT_LETTERS = np.array(['G+', 'E', 'E+', 'D', 'D+', 'C', 'C+', 'B', 'B+', 'A', 'A+', 'AA', 'AAA'])
+
+# speed: round(sb / singles-and-walks, 3) in thousandths -> stars
+SPEED_THRESHOLDS = [76, 101, 201, 301]
+SPEED_STARS = np.array(['', '*', '**', '***', '****'])
+
+# pitch_letter: opponents' average -> letter
+PITCH_THRESHOLDS = [.140, .168, .196, .223, .251, .279, .307, .335, .361]
+PITCH_LETTERS = np.array(['J+', 'J', 'K', 'L', 'M', 'W', 'X', 'Y', 'Z+', 'Z'])
+
+
+def _col(values):
+    return np.asarray(values, dtype=float)
+
+
+def _ratio(num, den):
+    """num / den, with 0 where den is 0 (the scalar helpers would raise there)."""
+    num, den = np.broadcast_arrays(_col(num), _col(den))
+    return np.divide(num, den, out=np.zeros(num.shape), where=den != 0)
+
+
+def _round(values, ndigits):
+    """
+    round(x, ndigits) for each element. np.round scales by 10**ndigits first,
+    which can land on the other side of a .5 tie than Python's round(), so
+    near-ties are handed to round() itself to keep results identical.
+    """
+    values = _col(values)
+    out = np.round(values, ndigits)
+    scaled = values * 10 ** ndigits
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for i in ties:
+        out.flat[i] = round(float(values.flat[i]), ndigits)
+    return out
+
+
+def _thousandths(values):
+    return np.rint(_round(values, 3) * 1000).astype(int)
+
+
+def _index(idx):
+    """Python list indexing into the 36 dice numbers: negatives count from the end."""
+    idx = np.asarray(idx, dtype=int)
+    return np.where(idx < 0, idx % 36, np.minimum(idx, 35))
+
+
+def _join(*parts):
+    out = parts[0]
+    for part in parts[1:]:
+        out = np.char.add(out, part)
+    return out
+
+
+def clutch(rbi, g):
+    return np.where(_thousandths(_ratio(rbi, g)) >= 600, '#', '')
+
+
+def hit_letter(h, ab):
+    h, ab = _col(h), _col(ab)
+    k = np.where((ab == 0) | (h == 0), 1, _thousandths(_ratio(h, ab)))
+    return HIT_LETTERS[np.digitize(k, HIT_THRESHOLDS)]
+
+
+def hr_3b_number(hr, trip, h):
+    hr, trip, h = np.broadcast_arrays(_col(hr), _col(trip), _col(h))
+
+    hr_raw = _ratio(hr, h) * 36
+    has_hr = (hr > 0) & (h > 0) & (hr_raw >= .5)
+    hr_check = np.where(has_hr, np.rint(hr_raw).astype(int) - 1, 0)
+    hr_str = np.where(has_hr, ASCENDING_STR[_index(hr_check)], '')
+
+    trip_check = np.rint(_ratio(trip, h) * 36).astype(int)
+    has_trip = (trip > 0) & (h > 0) & (trip_check >= 1)
+    trip_num = ASCENDING_STR[_index(hr_check + trip_check)]
+    trip_str = np.where(has_trip, _join('(', trip_num, ')'), '')
+
+    return _join(hr_str, trip_str)
+
+
+def speed(sb, h, bb, hbp, double, triple, hr):
+    on_base = _col(h) + _col(bb) + _col(hbp) - (_col(double) + _col(triple) + _col(hr))
+    k = _thousandths(_ratio(sb, on_base))
+    return SPEED_STARS[np.digitize(k, SPEED_THRESHOLDS)]
+
+
+def batter_bb_k(bb, so, hbp, pa):
+    bb = _col(bb)
+
+    walk_check = np.rint(_ratio(bb, pa) * 36).astype(int) - 1
+    has_walk = (bb != 0) & (walk_check > 0)
+    walk_check = np.where(has_walk, walk_check, 0)
+    walk_str = np.where(has_walk, ASCENDING_STR[_index(walk_check)], 'n')
+
+    k_check = np.rint(_ratio(so, pa) * 36).astype(int)
+    k_str = np.where(k_check == 36, '66', ASCENDING_STR[_index(walk_check + k_check)])
+
+    hbp_check = np.ceil(_ratio(hbp, pa) * 36).astype(int)
+    hbp_num = ASCENDING_STR[_index(walk_check + k_check + hbp_check)]
+    hbp_str = np.where(hbp_check != 0, np.char.add('/', hbp_num), '')
+
+    return _join('[', walk_str, '-', k_str, hbp_str, ']')
+
+
+def probable_hit_number(h, pa):
+    ph_check = np.rint(_ratio(h, pa) * 36).astype(int) - 1
+    return DESCENDING[_index(ph_check)]
+
+
+def pitch_letter(bavg_against):
+    return PITCH_LETTERS[np.searchsorted(PITCH_THRESHOLDS, _col(bavg_against), side='right')]
+
+
+def innings_of_effectiveness(g, ip):
+    return np.rint(_ratio(ip, g)).astype(int).astype(str)
+
+
+def pitcher_bb_k_hbp(bf, bb, so, hbp):
+    bb_check = np.ceil(_ratio(bb, bf) * 36).astype(int)
+    bb_str = ASCENDING_STR[_index(bb_check)]
+
+    k_check = np.rint(_ratio(so, bf) * 36).astype(int)
+    k_str = np.where(k_check == 0, 'n', ASCENDING_STR[_index(bb_check + k_check)])
+
+    hp_check = np.ceil(_ratio(hbp, bf) * 36).astype(int)
+    hp_num = ASCENDING_STR[_index(bb_check + k_check + hp_check)]
+    hp_str = np.where(hp_check == 0, ']', _join('/', hp_num, ']'))
+
+    return _join('[', bb_str, '-', k_str, hp_str)
+
+
+def gopher(hr, h):
+    h = _col(h)
+    k = _thousandths(_ratio(hr, h))
+    out = np.where(k >= 100, '+', np.where(k <= 50, '-', ''))
+    return np.where(h == 0, '', out)
+
+
+def wild_pitch(wp):
+    return np.where(_col(wp) >= 5, '[WP]', '')
+
+
+def pitcher_control_number(walks, hb, hits_allowed, bf):
+    br_check = np.rint(_ratio(_col(walks) + _col(hits_allowed) + _col(hb), bf) * 36).astype(int)
+    return np.where(br_check == 36, 11, DESCENDING[_index(br_check)])
+
+
+def rate_offense(g, ab, h, doubles, triples, hr, rbi, sb, bb, so, hbp, sf=0, sh=0):
+    """
+    Offense strings and probable hit numbers for every row, built exactly
+    like rate_player does. Rows with 5 or fewer PA get 'G+ [n-36]' / 66.
+    """
+    pa = _col(ab) + _col(bb) + _col(hbp) + _col(sf) + _col(sh)
+    sb = _col(sb)
+
+    spd_rate = np.where(sb > 0, speed(sb, h, bb, hbp, doubles, triples, hr), '')
+    offense = _join(
+        clutch(rbi, g),
+        hit_letter(h, ab),
+        hr_3b_number(hr, triples, h),
+        spd_rate, ' ',
+        batter_bb_k(bb, so, hbp, pa),
+    )
+    prob_hit = probable_hit_number(h, pa)
+
+    qualified = pa > 5
+    return np.where(qualified, offense, 'G+ [n-36]'), np.where(qualified, prob_hit, 66)
+
+
+def rate_pitching(bfp, h, bb, hbp, baopp, g, ipouts, so, hr, wp):
+    """
+    Pitching strings, control numbers and probable hit numbers for every row.
+    baopp may hold NaN where Lahman has no BAOpp; it is then worked out from
+    H / (BFP - BB - HBP). Rows with no batters faced get '' / None / None.
+    """
+    bfp, h, bb, hbp = _col(bfp), _col(h), _col(bb), _col(hbp)
+    ipouts = _col(ipouts)
+
+    ip = ipouts // 3 + np.select([ipouts % 3 == 1, ipouts % 3 == 2], [.333, .667], 0)
+
+    baopp = _col(baopp)
+    opp_ab = bfp - bb - hbp
+    computed = np.where(opp_ab > 0, _round(_ratio(h, opp_ab), 3), .4)
+    baopp = np.where(np.isnan(baopp), computed, baopp)
+
+    pitching = _join(
+        gopher(hr, h),
+        pitch_letter(baopp),
+        innings_of_effectiveness(g, ip), ' ',
+        pitcher_bb_k_hbp(bfp, bb, so, hbp), ' ',
+        wild_pitch(wp),
+    )
+    pcn = pitcher_control_number(bb, hbp, h, bfp)
+    pitch_ph = probable_hit_number(h, bfp)
+
+    threw = bfp > 0
+    return (
+        np.where(threw, pitching, ''),
+        np.where(threw, pcn, None),
+        np.where(threw, pitch_ph, None),
+    )
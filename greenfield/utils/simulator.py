@@ -0,0 +1,561 @@
+# greenfield/utils/simulator.py
+#
+# Plays games between Teams with the Sher-Co ratings stored on their
+# players. Each player's parsed rating columns are turned once into the
+# share of the 36 dice results they give each outcome. A plate appearance
+# reads either the batter's card or the pitcher's (the first die decides,
+# 1-3 or 4-6) and the two dice read it, so a matchup boils down to one
+# cumulative table: a random() and a bisect play the whole at-bat. Games
+# run in plain Python with no database work; save_games writes a batch of
+# them in bulk.
+#
+# What the cards don't say (doubles, taking the extra base, double plays,
+# errors) comes from the league-average constants below, nudged by the
+# speed stars and defensive ratings.
+
+from bisect import bisect
+from itertools import accumulate
+from django.db import transaction
+from stats.models import Game, InningScore, PlayerStatLine
+from teams.models import Teams
+from greenfield.utils.rating_tables import ASCENDING, DESCENDING
+from greenfield.utils.roster import load_roster
+from greenfield.utils.play_log import BLANK, pitching_decisions
+from greenfield.utils.season_aggregates import rebuild_season_aggregates
+from greenfield.utils.standings import refresh_standings, invalidate_standings
+
+SINGLE, DOUBLE, TRIPLE, HOMER, WALK, HBP, STRIKEOUT, OUT = range(8)
+
+UP = {number: i for i, number in enumerate(ASCENDING)}      # 11 -> 0 ... 66 -> 35
+DOWN = {number: i for i, number in enumerate(DESCENDING)}   # 66 -> 0 ... 11 -> 35
+
+# cards are shares of 36 dice results, in outcome order
+WEAK_BATTER = tuple(n / 36 for n in (4, 1, 0, 0, 1, 0, 12, 18))    # a pitcher at the plate
+WEAK_PITCHER = tuple(n / 36 for n in (8, 2, 0, 1, 5, 0, 2, 18))    # a position player on the mound
+
+# the ratings don't split out doubles, and pitchers' cards don't carry
+# triples or homers, so those shares of hits are league averages
+DOUBLE_SHARE = .17
+TRIPLE_SHARE = .02
+GOPHER_SHARE = {1: .12, 0: .08, -1: .04}    # by Players.gopher
+
+GROUND_BALL = .5         # of balls in play that are outs
+DOUBLE_PLAY = .28        # of ground balls with a force at second
+SCORE_ON_GROUNDER = .5   # runner on third, fewer than two out
+TAG_UP = .5              # runner on third on a fly ball, plus .1 a speed star
+ERROR = .025             # per ball in play, less .004 a Superior fielder
+WILD_PITCH = (1 / 108, 1 / 36)    # per PA with men on, without and with [WP]
+STEAL_TRY = .05          # per speed star, man on first with second open
+STEAL_SAFE = .55         # plus .08 a speed star, less .05 a point of catcher arm
+PULL_RUNS = 5            # a pitcher who has allowed this many is done
+MAX_INNINGS = 20         # then it goes in the book as a tie
+
+BATTING = ('ab', 'h', 'doubles', 'triples', 'hr', 'r', 'rbi', 'bb', 'hbp', 'so', 'sf', 'sb', 'cs', 'dp')
+PITCHING = ('ip_outs', 'h_allowed', 'ra', 'er', 'bb_allowed', 'k_thrown', 'hb', 'hra', 'wp')
+AB, H, D2, D3, HR, R, RBI, BB, HP, SO, SF, SB, CS, DP = range(len(BATTING))
+P_OUTS, P_H, P_R, P_ER, P_BB, P_K, P_HB, P_HR, P_WP = range(len(PITCHING))
+
+INFIELD = ('1B', '2B', '3B', 'SS')
+LINEUP_SLOTS = ('first', 'second', 'third', 'fourth', 'fifth', 'sixth', 'seventh', 'eighth', 'ninth')
+FIELD_ORDER = ('C', '1B', '2B', '3B', 'SS', 'LF', 'CF', 'RF')
+
+
+def _card(hits, homers, triples, doubles, walks, hbp, strikeouts):
+    """Outcome shares from counts of the 36 dice results and shares of hits."""
+    hits = max(0, min(hits, 36 - walks - hbp - strikeouts))
+    homers = hits * min(homers, 1)
+    triples = min(hits * triples, hits - homers)
+    doubles = min(hits * doubles, hits - homers - triples)
+    singles = hits - homers - triples - doubles
+    outs = 36 - hits - walks - hbp - strikeouts
+    return tuple(n / 36 for n in (singles, doubles, triples, homers, walks, hbp, strikeouts, outs))
+
+
+def _hit_results(prob_hit):
+    # the probable hit number covers everything from 66 down to it; 11
+    # is also what a hitless line gets, and 36 of 36 never happens
+    if prob_hit not in DOWN or prob_hit == 11:
+        return 0
+    return DOWN[prob_hit] + 1
+
+
+def offense_card(player):
+    """(card, speed stars, clutch) from a player's parsed offense columns, or None if he isn't rated."""
+    if player.hit_grade is None or player.bat_prob_hit is None:
+        return None
+
+    walk_end = UP[player.walk_top] + 1 if player.walk_top else 0
+    k_end = max(UP[player.strikeout_top] + 1, walk_end)
+    hbp_end = max(UP[player.hbp_top] + 1, k_end) if player.hbp_top else k_end
+
+    hr_index = UP[player.hr_number] if player.hr_number else -1
+    triples = (UP[player.triple_number] - max(hr_index, 0)) / 36 if player.triple_number else 0
+    card = _card(
+        _hit_results(player.bat_prob_hit), (hr_index + 1) / 36, max(triples, 0), DOUBLE_SHARE,
+        walk_end, hbp_end - k_end, k_end - walk_end,
+    )
+    return card, player.speed, player.clutch
+
+
+def pitching_card(player):
+    """(card, innings of effectiveness, [WP]) from a player's parsed pitching columns, or None."""
+    if player.pitch_grade is None or player.pitch_prob_hit is None:
+        return None
+
+    walk_end = UP[player.pitch_walk_top]
+    k_end = max(UP[player.pitch_strikeout_top], walk_end) if player.pitch_strikeout_top else walk_end
+    hbp_end = max(UP[player.pitch_hbp_top], k_end) if player.pitch_hbp_top else k_end
+
+    card = _card(
+        _hit_results(player.pitch_prob_hit), GOPHER_SHARE[player.gopher], TRIPLE_SHARE, DOUBLE_SHARE,
+        walk_end, hbp_end - k_end, k_end - walk_end,
+    )
+    return card, max(player.effectiveness, 1), player.wild_pitch
+
+
+def fielding(rating):
+    """(superior, arm, range, catcher throw) from a PlayerPositionRating's parsed columns, zeros for None."""
+    if rating is None:
+        return False, 0, 0, 0
+    return rating.superior, rating.arm or 0, rating.range or 0, rating.catcher_throw or 0
+
+
+class _Lineup:
+    """Batting order as roster indexes (None where the pitcher bats) plus the defense behind it."""
+
+    def __init__(self, slots, ratings):
+        self.batters = [index for index, _ in slots]
+        self.positions = [position for _, position in slots]
+        self.fielders = [index for index, position in slots if index is not None and position != 'DH']
+
+        defense = [fielding(ratings.get((index, position))) for index, position in slots]
+        superior = sum(rating[0] for rating in defense)
+        arms = sum(rating[1] == 9 for rating, (_, pos) in zip(defense, slots) if pos in INFIELD)
+        self.error_chance = max(ERROR - .004 * superior, .005)
+        self.dp_chance = DOUBLE_PLAY + .03 * arms
+        self.catcher_throw = max(
+            [rating[3] for rating, (_, pos) in zip(defense, slots) if pos == 'C'], default=0
+        )
+
+
+class SimTeam:
+    """One team's roster parsed for play: cards, lineups, rotation and bullpen."""
+
+    def __init__(self, team, players, lineups):
+        self.team_id = team.serial
+        self.name = str(team)
+        self.players = players
+        self.index = {player.serial: i for i, player in enumerate(players)}
+        self.throws = ['L' if (player.throws or '').startswith('L') else 'R' for player in players]
+        # cumulative outcome tables for our batters, built as matchups come up
+        self.matchups = {}
+
+        self.batting, self.clutch_batting, self.speed = [], [], []
+        self.pitching, self.stamina, self.wild = [], [], []
+        for player in players:
+            card, speed, clutch = offense_card(player) or (WEAK_BATTER, 0, False)
+            self.batting.append(card)
+            # clutch hitters turn an out into a single with men in scoring position
+            self.clutch_batting.append(
+                (card[0] + 1 / 36,) + card[1:7] + (card[7] - 1 / 36,) if clutch and card[7] >= 1 / 36 else card
+            )
+            self.speed.append(speed)
+
+            card, stamina, wild = pitching_card(player) or (WEAK_PITCHER, 1, False)
+            self.pitching.append(card)
+            self.stamina.append(stamina)
+            self.wild.append(wild)
+
+        staff = [i for i, player in enumerate(players) if player.is_pitcher]
+        if not staff:
+            raise ValueError(f"{team} has no pitchers")
+        # players come in load_roster order, so the staff is longest-lasting first
+        starters = [i for i in staff if self.stamina[i] >= 5][:5] or staff[:1]
+        self.rotation = starters
+        # worst reliever first, so the best one is left for the late innings
+        self.bullpen = sorted(
+            (i for i in staff if i not in starters),
+            key=lambda i: self.pitching[i][7],
+        )
+
+        ratings = {
+            (i, rating.position.name): rating
+            for i, player in enumerate(players) for rating in player.ratings
+        }
+        default = self._default_slots()
+        common = lineups.get('common') or default
+        self.lineups = {
+            hand: _Lineup(self._slots(lineups.get(hand) or common), ratings)
+            for hand in ('R', 'L')
+        }
+
+    def _slots(self, lineup):
+        if isinstance(lineup, list):
+            return lineup
+        slots = []
+        for name in LINEUP_SLOTS:
+            serial = getattr(lineup, f'{name}_id')
+            position = (getattr(lineup, f'{name}_pos') or '').upper()
+            if serial is None or position == 'P' or serial not in self.index:
+                slots.append((None, 'P'))
+            else:
+                slots.append((self.index[serial], position))
+        return slots
+
+    def _default_slots(self):
+        """Best available at each position in roster order, pitcher batting ninth."""
+        slots, taken = [], set()
+        for position in FIELD_ORDER:
+            for i, player in enumerate(self.players):
+                if i not in taken and not player.is_pitcher and player.primary_position == position:
+                    slots.append((i, position))
+                    taken.add(i)
+                    break
+        bench = [i for i, player in enumerate(self.players) if not player.is_pitcher and i not in taken]
+        missing = [pos for pos in FIELD_ORDER if pos not in {position for _, position in slots}]
+        slots += list(zip(bench, missing))
+        slots.sort(key=lambda slot: -sum(self.batting[slot[0]][:6]))
+        return slots + [(None, 'P')]
+
+    def starter(self, turn):
+        return self.rotation[turn % len(self.rotation)]
+
+
+def load_sim_teams(team_serials):
+    """{team serial: SimTeam}: one query, plus two a team for the rosters."""
+    teams = Teams.objects.filter(serial__in=team_serials).select_related(
+        'common_lineup_serial', 'vs_r_lineup_serial', 'vs_l_lineup_serial'
+    )
+    sim_teams = {}
+    for team in teams:
+        batters, pitchers = load_roster(team.serial)
+        sim_teams[team.serial] = SimTeam(team, batters + pitchers, {
+            'common': team.common_lineup_serial,
+            'R': team.vs_r_lineup_serial,
+            'L': team.vs_l_lineup_serial,
+        })
+    return sim_teams
+
+
+class _Side:
+    """One team's state during a game."""
+
+    def __init__(self, team, starter, lineup):
+        self.team = team
+        self.lineup = lineup
+        self.up = 0
+        self.runs = 0
+        self.innings = []
+        self.pitcher = starter
+        self.used = [starter]
+        self.bullpen = [i for i in team.bullpen if i != starter]
+        self.bat = {i: [0] * len(BATTING) for i in lineup.batters if i is not None}
+        self.bat.setdefault(starter, [0] * len(BATTING))
+        self.pitch = {starter: [0] * len(PITCHING)}
+        self.errors = {}
+
+
+class _Game:
+    def __init__(self, home, away, rng, home_starter, away_starter):
+        self.rng = rng
+        self.away = _Side(away, away_starter, away.lineups[home.throws[home_starter]])
+        self.home = _Side(home, home_starter, home.lineups[away.throws[away_starter]])
+        self.entered_margin = {
+            (away.players[away_starter].serial, away.team_id): 0,
+            (home.players[home_starter].serial, home.team_id): 0,
+        }
+        self.lead_taken = []
+
+    @staticmethod
+    def _cdf(bat, field, batter, risp):
+        cards = bat.team.clutch_batting if risp else bat.team.batting
+        pairs = zip(cards[batter][:7], field.team.pitching[field.pitcher][:7])
+        cdf = list(accumulate((b + p) / 2 for b, p in pairs))
+        bat.team.matchups[(field.team.team_id, field.pitcher, batter, risp)] = cdf
+        return cdf
+
+    def _relieve(self, field, bat):
+        """Change pitchers between innings once the one out there is spent."""
+        stats = field.pitch[field.pitcher]
+        if not field.bullpen:
+            return
+        if stats[P_OUTS] < 3 * field.team.stamina[field.pitcher] and stats[P_R] < PULL_RUNS:
+            return
+        pitcher = field.pitcher = field.bullpen.pop(0)
+        field.used.append(pitcher)
+        field.pitch[pitcher] = [0] * len(PITCHING)
+        field.bat.setdefault(pitcher, [0] * len(BATTING))
+        self.entered_margin[(field.team.players[pitcher].serial, field.team.team_id)] = field.runs - bat.runs
+
+    def _score(self, bat, field, runner, earned, batter_stats=None):
+        bat.bat[runner][R] += 1
+        field.pitch[field.pitcher][P_R] += 1
+        if earned:
+            field.pitch[field.pitcher][P_ER] += 1
+        if batter_stats is not None:
+            batter_stats[RBI] += 1
+        bat.runs += 1
+        if bat.runs == field.runs + 1:
+            self.lead_taken.append((bat.team.team_id, bat.team.players[bat.pitcher].serial,
+                                    field.team.players[field.pitcher].serial))
+
+    def _half(self, bat, field, walkoff):
+        rng = self.rng.random
+        team = bat.team
+        lineup = bat.lineup
+        speed = team.speed
+        pitcher = field.pitcher
+        pstats = field.pitch[pitcher]
+        wild = WILD_PITCH[field.team.wild[pitcher]]
+        defense = field.lineup
+        matchups = team.matchups
+        opponent = field.team.team_id
+        score = self._score
+        start = bat.runs
+        outs = 0
+        b1 = b2 = b3 = None
+        earned = True
+
+        while outs < 3:
+            if walkoff and bat.runs > field.runs:
+                break
+
+            if b1 is not None or b2 is not None or b3 is not None:
+                if rng() < wild:
+                    pstats[P_WP] += 1
+                    if b3 is not None:
+                        score(bat, field, b3, earned)
+                    b1, b2, b3 = None, b1, b2
+                    continue
+                if b1 is not None and b2 is None and outs < 2 and speed[b1] and rng() < STEAL_TRY * speed[b1]:
+                    if rng() < STEAL_SAFE + .08 * speed[b1] - .05 * defense.catcher_throw:
+                        bat.bat[b1][SB] += 1
+                        b1, b2 = None, b1
+                    else:
+                        bat.bat[b1][CS] += 1
+                        b1 = None
+                        outs += 1
+                        pstats[P_OUTS] += 1
+                    continue
+
+            batter = lineup.batters[bat.up]
+            if batter is None:
+                batter = bat.pitcher
+            bat.up = (bat.up + 1) % len(lineup.batters)
+            st = bat.bat[batter]
+            risp = b2 is not None or b3 is not None
+            cdf = matchups.get((opponent, pitcher, batter, risp)) or self._cdf(bat, field, batter, risp)
+            result = bisect(cdf, rng())
+
+            if result <= HOMER:
+                st[AB] += 1
+                st[H] += 1
+                pstats[P_H] += 1
+                if result == SINGLE:
+                    if b3 is not None:
+                        score(bat, field, b3, earned, st)
+                        b3 = None
+                    if b2 is not None:
+                        if rng() < .55 + .1 * speed[b2]:
+                            score(bat, field, b2, earned, st)
+                        else:
+                            b3 = b2
+                        b2 = None
+                    if b1 is not None:
+                        if b3 is None and rng() < .25 + .08 * speed[b1]:
+                            b3 = b1
+                        else:
+                            b2 = b1
+                    b1 = batter
+                elif result == DOUBLE:
+                    st[D2] += 1
+                    for runner in (b3, b2):
+                        if runner is not None:
+                            score(bat, field, runner, earned, st)
+                    b3 = None
+                    if b1 is not None:
+                        if rng() < .35 + .1 * speed[b1]:
+                            score(bat, field, b1, earned, st)
+                        else:
+                            b3 = b1
+                    b1, b2 = None, batter
+                else:
+                    for runner in (b3, b2, b1):
+                        if runner is not None:
+                            score(bat, field, runner, earned, st)
+                    b1 = b2 = b3 = None
+                    if result == TRIPLE:
+                        st[D3] += 1
+                        b3 = batter
+                    else:
+                        st[HR] += 1
+                        pstats[P_HR] += 1
+                        score(bat, field, batter, earned, st)
+
+            elif result == WALK or result == HBP:
+                if result == WALK:
+                    st[BB] += 1
+                    pstats[P_BB] += 1
+                else:
+                    st[HP] += 1
+                    pstats[P_HB] += 1
+                if b1 is not None:
+                    if b2 is not None:
+                        if b3 is not None:
+                            score(bat, field, b3, earned, st)
+                        b3 = b2
+                    b2 = b1
+                b1 = batter
+
+            elif result == STRIKEOUT:
+                st[AB] += 1
+                st[SO] += 1
+                pstats[P_K] += 1
+                pstats[P_OUTS] += 1
+                outs += 1
+
+            else:
+                roll = rng()
+                if roll < defense.error_chance:
+                    # everybody moves up a base and the rest of the inning is unearned
+                    st[AB] += 1
+                    fielder = defense.fielders[int(rng() * len(defense.fielders))]
+                    field.errors[fielder] = field.errors.get(fielder, 0) + 1
+                    earned = False
+                    if b3 is not None:
+                        score(bat, field, b3, earned)
+                    b1, b2, b3 = batter, b1, b2
+                elif roll < GROUND_BALL:
+                    st[AB] += 1
+                    turned_two = b1 is not None and outs < 2 and rng() < defense.dp_chance
+                    if turned_two:
+                        st[DP] += 1
+                        pstats[P_OUTS] += 2
+                        outs += 2
+                        b1 = None
+                    else:
+                        pstats[P_OUTS] += 1
+                        outs += 1
+                    if outs < 3:
+                        if b3 is not None and rng() < SCORE_ON_GROUNDER:
+                            score(bat, field, b3, earned, None if turned_two else st)
+                            b3 = None
+                        if b2 is not None and b3 is None:
+                            b2, b3 = None, b2
+                        if b1 is not None and b2 is None:
+                            b1, b2 = None, b1
+                else:
+                    pstats[P_OUTS] += 1
+                    outs += 1
+                    if b3 is not None and outs < 3 and rng() < TAG_UP + .1 * speed[b3]:
+                        st[SF] += 1
+                        score(bat, field, b3, earned, st)
+                        b3 = None
+                    else:
+                        st[AB] += 1
+
+        bat.innings.append(bat.runs - start)
+
+    def play(self):
+        away, home = self.away, self.home
+        inning = 0
+        while True:
+            inning += 1
+            self._relieve(home, away)
+            self._half(away, home, walkoff=False)
+            if inning >= 9 and home.runs > away.runs:
+                break
+            self._relieve(away, home)
+            self._half(home, away, walkoff=inning >= 9)
+            if inning >= 9 and home.runs != away.runs or inning >= MAX_INNINGS:
+                break
+        return self._result()
+
+    def _result(self):
+        away, home = self.away, self.home
+        lines = {}
+        for side in (away, home):
+            team = side.team
+            positions = dict(zip(side.lineup.batters, side.lineup.positions))
+            for i, st in side.bat.items():
+                line = lines.setdefault((team.players[i].serial, team.team_id), dict(BLANK))
+                line.update(zip(BATTING, st))
+                line['position'] = positions.get(i, 'P')
+            for i, st in side.pitch.items():
+                line = lines[(team.players[i].serial, team.team_id)]
+                line.update(zip(PITCHING, st))
+                line['threw'] = True
+                line['position'] = 'P'
+            for i, count in side.errors.items():
+                lines[(team.players[i].serial, team.team_id)]['e'] = count
+
+        serials = {
+            side.team.team_id: [side.team.players[i].serial for i in side.used]
+            for side in (away, home)
+        }
+        decisions = pitching_decisions(
+            {away.team.team_id: away.runs, home.team.team_id: home.runs},
+            serials, self.entered_margin, self.lead_taken,
+            lambda serial, team_id: lines[(serial, team_id)]['ip_outs'],
+        )
+        for key, decision in decisions.items():
+            lines[key]['decision'] = decision
+
+        innings = {}
+        for side in (away, home):
+            for inning, runs in enumerate(side.innings, 1):
+                innings[(side.team.team_id, inning)] = runs
+
+        return {
+            'away_team_id': away.team.team_id,
+            'home_team_id': home.team.team_id,
+            'lines': lines,
+            'innings': innings,
+            'away_score': away.runs,
+            'home_score': home.runs,
+        }
+
+
+def simulate_game(home, away, rng, home_starter=None, away_starter=None):
+    """
+    Play one game between two SimTeams with a random.Random. Starters are
+    roster indexes (default: each team's first starter). Returns the same
+    shape as play_log.reduce_events, plus the two team ids.
+    """
+    home_starter = home.rotation[0] if home_starter is None else home_starter
+    away_starter = away.rotation[0] if away_starter is None else away_starter
+    return _Game(home, away, rng, home_starter, away_starter).play()
+
+
+def save_games(competition, games, batch_size=1000):
+    """
+    Write [(date_played, simulate_game result)] as final games with their
+    line scores and stat lines, then bring the competition's season
+    aggregates and standings up to date. Returns the new Games.
+    """
+    with transaction.atomic():
+        created = Game.objects.bulk_create([
+            Game(
+                competition=competition, date_played=date_played, status='final',
+                home_team_id=result['home_team_id'], away_team_id=result['away_team_id'],
+                home_score=result['home_score'], away_score=result['away_score'],
+                seed=result.get('seed'),
+            )
+            for date_played, result in games
+        ], batch_size=batch_size)
+
+        InningScore.objects.bulk_create([
+            InningScore(game=game, team_id=team_id, inning=inning, runs=runs)
+            for game, (_, result) in zip(created, games)
+            for (team_id, inning), runs in result['innings'].items()
+        ], batch_size=batch_size)
+        PlayerStatLine.objects.bulk_create([
+            PlayerStatLine(game=game, player_id=player_id, team_id=team_id, **line)
+            for game, (_, result) in zip(created, games)
+            for (player_id, team_id), line in result['lines'].items()
+        ], batch_size=batch_size)
+
+        rebuild_season_aggregates([competition.pk])
+        refresh_standings(competition.pk)
+        invalidate_standings(competition.pk)
+    return created
@@ -0,0 +1,221 @@
+# greenfield/utils/standings.py
+#
+# Standings from one pass over a competition's finalized games, in the
+# order they were played. Each team keeps a small ledger (record, runs,
+# home/away splits, last ten and current streak) that is written to
+# TeamStanding when a game is finalized, so the standings pages only ever
+# read those rows. The page context is also cached per competition; saving
+# or deleting one of its games drops the entry and rebuilds it in the
+# background once the change is committed.
+
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from django.core.cache import caches
+from django.db import connections, transaction
+
+RESULT_FIELDS = {'W': 'wins', 'L': 'losses', 'T': 'ties'}
+
+# one thread is plenty, and it keeps warm-ups in invalidation order
+_warmer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='standings-warm')
+
+
+def _models():
+    from stats.models import Game, TeamEntry, TeamStanding
+    return Game, TeamEntry, TeamStanding
+
+
+class _Ledger:
+    def __init__(self):
+        self.totals = defaultdict(int)
+        self.last10 = deque(maxlen=10)
+        self.streak_result = None
+        self.streak_length = 0
+
+    def add(self, side, scored, allowed):
+        result = 'W' if scored > allowed else 'L' if scored < allowed else 'T'
+        field = RESULT_FIELDS[result]
+        self.totals[field] += 1
+        self.totals[f'{side}_{field}'] += 1
+        self.totals['runs_scored'] += scored
+        self.totals['runs_allowed'] += allowed
+        self.last10.append(result)
+        if result == self.streak_result:
+            self.streak_length += 1
+        else:
+            self.streak_result, self.streak_length = result, 1
+
+    def fields(self):
+        fields = dict(self.totals)
+        for result, field in RESULT_FIELDS.items():
+            fields[f'last10_{field}'] = self.last10.count(result)
+        fields['streak'] = f'{self.streak_result}{self.streak_length}' if self.streak_result else ''
+        return fields
+
+
+def team_ledgers(games):
+    """
+    {team_id: TeamStanding field values} from (home_id, away_id, home_score,
+    away_score) tuples given in the order the games were played.
+    """
+    ledgers = defaultdict(_Ledger)
+    for home_id, away_id, home_score, away_score in games:
+        ledgers[home_id].add('home', home_score, away_score)
+        ledgers[away_id].add('away', away_score, home_score)
+    return {team_id: ledger.fields() for team_id, ledger in ledgers.items()}
+
+
+def team_placements(entries):
+    """
+    {team_id: (league_id, division_id)} from (team_id, league_id,
+    division_id) TeamEntry rows. A team can be entered more than once;
+    the most specific entry places it.
+    """
+    placement = {}
+    for team_id, league_id, division_id in entries:
+        placement[team_id] = max(
+            placement.get(team_id, (None, None)), (league_id, division_id),
+            key=lambda entry: (entry[1] is not None, entry[0] is not None),
+        )
+    return placement
+
+
+def refresh_standings(competition_id):
+    """Rebuild a competition's TeamStanding rows from its finalized games."""
+    Game, TeamEntry, TeamStanding = _models()
+
+    games = (
+        Game.objects.filter(competition_id=competition_id, status='final')
+        .order_by('date_played', 'id')
+        .values_list('home_team_id', 'away_team_id', 'home_score', 'away_score')
+    )
+    ledgers = team_ledgers(games.iterator())
+
+    placement = team_placements(
+        TeamEntry.objects.filter(competition_id=competition_id)
+        .values_list('team_id', 'league_id', 'division_id')
+    )
+
+    standings = [
+        TeamStanding(
+            competition_id=competition_id,
+            team_id=team_id,
+            league_id=placement.get(team_id, (None, None))[0],
+            division_id=placement.get(team_id, (None, None))[1],
+            **ledgers.get(team_id, {}),
+        )
+        for team_id in placement.keys() | ledgers.keys()
+    ]
+
+    with transaction.atomic():
+        TeamStanding.objects.filter(competition_id=competition_id).delete()
+        TeamStanding.objects.bulk_create(standings)
+    return len(standings)
+
+
+def _record(wins, losses, ties):
+    return f'{wins}-{losses}-{ties}' if ties else f'{wins}-{losses}'
+
+
+def standing_rows(standings):
+    """Display rows for a group of TeamStandings, best record first, with GB."""
+    rows = []
+    for s in standings:
+        decided = s.wins + s.losses  # ties don't count toward the percentage
+        rows.append({
+            'display_name': f'{s.team.first_name} {s.team.team_name}',
+            'wins': s.wins,
+            'losses': s.losses,
+            'ties': s.ties,
+            'win_pct': s.wins / decided if decided else 0.0,
+            'runs_scored': s.runs_scored,
+            'runs_allowed': s.runs_allowed,
+            'run_diff': s.runs_scored - s.runs_allowed,
+            'home': _record(s.home_wins, s.home_losses, s.home_ties),
+            'away': _record(s.away_wins, s.away_losses, s.away_ties),
+            'last10': _record(s.last10_wins, s.last10_losses, s.last10_ties),
+            'streak': s.streak,
+        })
+
+    rows.sort(key=lambda row: (-row['win_pct'], -row['wins'], row['display_name']))
+    if rows:
+        leader = rows[0]
+        for row in rows:
+            row['gb'] = ((leader['wins'] - row['wins']) + (row['losses'] - leader['losses'])) / 2
+    return rows
+
+
+def competition_standings(competition):
+    """
+    Standings page context for a competition, from one query: 'structured'
+    (leagues, split into divisions where the league has them) or
+    'unstructured' (one table).
+    """
+    TeamStanding = _models()[2]
+    standings = list(
+        TeamStanding.objects.filter(competition=competition)
+        .select_related('team', 'league', 'division')
+    )
+    if not competition.has_structure:
+        return {'unstructured': standing_rows(standings)}
+
+    leagues = {}
+    for s in sorted(standings, key=lambda s: (s.league_id or 0, s.division_id or 0)):
+        if s.league is None:
+            continue
+        league = leagues.setdefault(s.league_id, {'league': s.league, 'teams': [], 'divisions': {}})
+        if s.league.has_divisions:
+            if s.division is not None:
+                league['divisions'].setdefault(s.division_id, (s.division, []))[1].append(s)
+        else:
+            league['teams'].append(s)
+
+    structured = []
+    for group in leagues.values():
+        if group['league'].has_divisions:
+            structured.append({
+                'name': group['league'].name,
+                'divisions': [
+                    {'name': division.name, 'rows': standing_rows(teams)}
+                    for division, teams in group['divisions'].values()
+                ],
+            })
+        else:
+            structured.append({'name': group['league'].name, 'rows': standing_rows(group['teams'])})
+    return {'structured': structured}
+
+
+def _cache_key(competition_id):
+    return f'competition:{competition_id}'
+
+
+def get_competition_standings(competition):
+    """competition_standings, through the standings cache."""
+    cache = caches['standings']
+    context = cache.get(_cache_key(competition.pk))
+    if context is None:
+        context = competition_standings(competition)
+        cache.set(_cache_key(competition.pk), context)
+    return context
+
+
+def _warm(competition_id):
+    from stats.models import Competition
+    try:
+        competition = Competition.objects.get(pk=competition_id)
+        caches['standings'].set(_cache_key(competition_id), competition_standings(competition))
+    except Competition.DoesNotExist:
+        pass
+    finally:
+        connections.close_all()  # this thread's own connections
+
+
+def invalidate_standings(competition_id):
+    """
+    Drop a competition's cached standings once the current transaction
+    commits, then rebuild them in the background.
+    """
+    def drop_and_warm():
+        caches['standings'].delete(_cache_key(competition_id))
+        _warmer.submit(_warm, competition_id)
+
+    transaction.on_commit(drop_and_warm)
@@ -0,0 +1,272 @@
+# greenfield/utils/team_cards.py
+#
+# Rendering for the team card PDFs and CSVs, plus the PDF cache. PDFs are
+# cached per team and kind under a digest of everything that goes on the
+# page. The digest doubles as the ETag, so a browser that already has the
+# current file gets a 304. Saves and deletes of Players /
+# PlayerPositionRating drop the team's entries (see players/signals.py);
+# anything that skips signals, like bulk_create, still can't serve stale
+# cards because the digest changes with the ratings.
+
+import csv
+import hashlib
+import json
+from io import BytesIO, StringIO
+from django.conf import settings
+from django.core.cache import caches
+from reportlab.lib.pagesizes import letter
+from reportlab.lib import colors
+from reportlab.pdfgen import canvas
+from reportlab.lib.units import inch
+from reportlab.platypus import Table, TableStyle, Paragraph, SimpleDocTemplate, Spacer
+from reportlab.lib.styles import getSampleStyleSheet
+from greenfield.utils.sherco import get_defense_string, get_pitching_string
+
+# bump when the PDF layout changes so old renders aren't served
+RENDER_VERSION = 1
+
+KINDS = ('full', 'batters', 'pitchers')
+
+
+def _cache():
+    return caches['team_cards']
+
+
+def _key(team_serial, kind):
+    return f"team_card:{team_serial}:{kind}"
+
+
+def roster_digest(team, players, kind):
+    """Hex digest of the team header and every player's ratings, in page order."""
+    content = [RENDER_VERSION, kind, team.serial, team.first_name, team.team_name]
+    for p in players:
+        content.append([
+            p.serial, p.first_name, p.last_name, p.bats, p.throws,
+            p.offense, p.bat_prob_hit, p.pitching, p.pitch_ctl, p.pitch_prob_hit,
+            [[r.position.name if r.position else None, r.rating, r.position_order] for r in p.ratings],
+        ])
+    return hashlib.sha256(json.dumps(content, default=str).encode()).hexdigest()[:32]
+
+
+def get_team_pdf(team, kind, digest, render):
+    """The cached PDF bytes for this digest, or render() them and cache the result."""
+    cached = _cache().get(_key(team.serial, kind))
+    if cached and cached[0] == digest:
+        return cached[1]
+
+    pdf = render()
+    _cache().set(_key(team.serial, kind), (digest, pdf), settings.TEAM_CARD_CACHE_TIMEOUT)
+    return pdf
+
+
+def invalidate_team_cards(team_serial):
+    if team_serial is not None:
+        _cache().delete_many([_key(team_serial, kind) for kind in KINDS])
+
+
+def render_full_pdf(team, players):
+    # === PDF Setup ===
+    buffer = BytesIO()
+    margin = 50  # Safe margin
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=letter,
+        leftMargin=margin,
+        rightMargin=margin,
+        topMargin=60,
+        bottomMargin=40,
+    )
+
+    styles = getSampleStyleSheet()
+    styleN = styles["Normal"]
+    styleN.fontSize = 9
+    styleN.leading = 11
+
+    elements = []
+
+    # Title
+    title = f"Team: {team.team_name} ({team.first_name})"
+    elements.append(Paragraph(title, styles["Title"]))
+    elements.append(Spacer(1, 12))
+
+    # Table headers and data
+    headers = ["Name", "B-T", "Offense", "Defense", "Pitching"]
+    table_data = [headers]
+
+    for player in players:
+        name = f"{player.first_name} {player.last_name}"
+        hand = f"{player.bats}-{player.throws}"
+        offense = f"{player.offense or ''} PH-{player.bat_prob_hit}" if player.bat_prob_hit else (player.offense or '')
+        pitching = " ".join(filter(None, [
+            player.pitching,
+            f"PCN-{player.pitch_ctl}" if player.pitch_ctl is not None else '',
+            f"PPH-{player.pitch_prob_hit}" if player.pitch_prob_hit is not None else ''
+        ]))
+        defense = ', '.join(f"{r.position.name}: {r.rating}" for r in player.ratings if r.position)
+
+        row = [
+            Paragraph(name, styleN),
+            Paragraph(hand, styleN),
+            Paragraph(offense.strip(), styleN),
+            Paragraph(defense, styleN),
+            Paragraph(pitching.strip(), styleN),
+        ]
+        table_data.append(row)
+
+    # Column widths — total must be < page width - 2 * margin (about 6.5 inches)
+    col_widths = [
+        2.3 * inch,  # Name
+        0.6 * inch,  # B-T
+        1.5 * inch,  # Offense
+        1.7 * inch,  # Defense
+        1.4 * inch   # Pitching
+    ]
+
+    table = Table(table_data, colWidths=col_widths)
+    table.setStyle(TableStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.darkblue),
+        ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ]))
+
+    elements.append(table)
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def render_batters_pdf(team, batters):
+    buffer = BytesIO()
+    margin = 50
+    doc = SimpleDocTemplate(buffer, pagesize=letter, leftMargin=margin, rightMargin=margin, topMargin=60, bottomMargin=40)
+
+    styles = getSampleStyleSheet()
+    styleN = styles["Normal"]
+    styleN.fontSize = 9
+    styleN.leading = 11
+
+    elements = [Paragraph(f"Batters: {team.team_name} ({team.first_name})", styles["Title"]), Spacer(1, 12)]
+
+    headers = ["Name", "B-T", "Offense", "Defense"]
+    table_data = [headers]
+
+    for p in batters:
+        name = f"{p.first_name} {p.last_name}"
+        hand = f"{p.bats}-{p.throws}"
+        offense = f"{p.offense or ''} PH-{p.bat_prob_hit}" if p.bat_prob_hit else (p.offense or '')
+        defense = ', '.join(f"{r.position.name}: {r.rating}" for r in p.ratings if r.position)
+
+        row = [
+            Paragraph(name, styleN),
+            Paragraph(hand, styleN),
+            Paragraph(offense.strip(), styleN),
+            Paragraph(defense, styleN),
+        ]
+        table_data.append(row)
+
+    col_widths = [2.4 * inch, 0.6 * inch, 2.0 * inch, 2.2 * inch]
+
+    table = Table(table_data, colWidths=col_widths)
+    table.setStyle([
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.darkblue),
+        ('LINEBELOW', (0, 0), (-1, 0), 1, colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ])
+
+    elements.append(table)
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def render_pitchers_pdf(team, pitchers):
+    for player in pitchers:
+        player.offense = player.offense or ''  # Ensure exists
+        player.defense = get_defense_string(player.ratings)
+        player.pitching = get_pitching_string(player)
+
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+
+    margin = 40
+    y = height - 50
+    p.setFont("Helvetica-Bold", 14)
+    p.drawString(margin, y, f"Pitchers - {team.team_name} ({team.first_name})")
+    y -= 30
+
+    headers = ["Name", "B-T", "Offense", "Defense", "Pitching"]
+    col_widths = [1.6 * inch, 0.5 * inch, 2.0 * inch, 1.0 * inch, 2.5 * inch]
+    x_positions = [margin]
+    for width in col_widths[:-1]:
+        x_positions.append(x_positions[-1] + width)
+
+    p.setFont("Helvetica-Bold", 10)
+    for i, header in enumerate(headers):
+        p.drawString(x_positions[i], y, header)
+    y -= 15
+    p.setFont("Helvetica", 10)
+
+    for player in pitchers:
+        if y < 50:
+            p.showPage()
+            y = height - 50
+            p.setFont("Helvetica-Bold", 10)
+            for i, header in enumerate(headers):
+                p.drawString(x_positions[i], y, header)
+            y -= 15
+            p.setFont("Helvetica", 10)
+
+        data = [
+            f"{player.first_name} {player.last_name}",
+            f"{player.bats}-{player.throws}",
+            player.offense,
+            player.defense,
+            player.pitching,
+        ]
+        for i, val in enumerate(data):
+            p.drawString(x_positions[i], y, str(val))
+        y -= 15
+
+    p.save()
+    return buffer.getvalue()
+
+
+def render_batters_csv(team, batters):
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["Name", "B-T", "Offense", "Defense"])
+
+    for p in batters:
+        name = f"{p.first_name} {p.last_name}"
+        hand = f"{p.bats}-{p.throws}"
+        offense = f"{p.offense or ''} PH-{p.bat_prob_hit}" if p.bat_prob_hit else (p.offense or '')
+        defense = ', '.join(f"{r.position.name}: {r.rating}" for r in p.ratings if r.position)
+        writer.writerow([name, hand, offense.strip(), defense])
+
+    return output.getvalue()
+
+
+def render_pitchers_csv(team, pitchers):
+    for player in pitchers:
+        player.offense = player.offense or ''
+        player.defense = get_defense_string(player.ratings)
+        player.pitching = get_pitching_string(player)
+
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["Name", "B-T", "Offense", "Defense", "Pitching"])
+
+    for p in pitchers:
+        name = f"{p.first_name} {p.last_name}"
+        hand = f"{p.bats}-{p.throws}"
+        writer.writerow([name, hand, p.offense, p.defense, p.pitching])
+
+    return output.getvalue()
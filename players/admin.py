@@ -4,10 +4,15 @@ from .models import Players, PlayerPositionRating, Position, PlayerPicture
 @admin.register(Players)
 class PlayersAdmin(admin.ModelAdmin):
     list_display = ('first_name', 'last_name', 'year', 'team_serial')
-    list_filter = ('team_serial',)  # 👈 Enables filtering by team in the sidebar
+    list_filter = ('team_serial', 'hit_grade', 'pitch_grade')  # sidebar filters: team and parsed grades
+
+@admin.register(PlayerPositionRating)
+class PlayerPositionRatingAdmin(admin.ModelAdmin):
+    list_display = ('player', 'position', 'rating')
+    list_filter = ('position', 'range', 'arm', 'superior')  # e.g. every SS with range 5
+    list_select_related = ('player', 'position')
 
 # Optionally register the other models too
-admin.site.register(PlayerPositionRating)
 admin.site.register(Position)
 admin.site.register(PlayerPicture)
 
@@ -109,6 +109,17 @@ class CustomPlayerStatsForm(forms.Form):
     CS = forms.IntegerField(required=False)
     SBA = forms.IntegerField(required=False)
 
+class SeasonImportForm(forms.Form):
+    year_from = forms.IntegerField(min_value=1871, label="Year")
+    year_to = forms.IntegerField(min_value=1871, required=False, label="Through year")
+
+    def clean(self):
+        cleaned = super().clean()
+        year_from, year_to = cleaned.get('year_from'), cleaned.get('year_to')
+        if year_from and year_to and year_to < year_from:
+            raise forms.ValidationError("Through year must not be before the starting year.")
+        return cleaned
+
 # allow adding/removing pictures; each form has just the 'picture' field
 PictureFormSet = inlineformset_factory(
     parent_model=Players,
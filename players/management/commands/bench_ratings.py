@@ -0,0 +1,189 @@
+import math
+import random
+import time
+from django.core.management.base import BaseCommand
+from greenfield.utils.rating_tables import DICE_NUMBERS
+from greenfield.utils.sherco import (
+    clutch, hit_letter, hr_3b_number,
+    speed, batter_bb_k, probable_hit_number,
+    pitch_letter, innings_of_effectiveness,
+    pitcher_bb_k_hbp, wild_pitch, gopher,
+    pitcher_control_number
+)
+
+
+# The helpers as they were before rating_tables, sorting the dice set on
+# every lookup. Only here so the bench has something to compare against.
+
+def _sorted_hr_3b_number(hr, trip, h):
+    hr_trp_score = ''
+    if hr > 0 and h > 0:
+        hr_check = (hr / h) * 36
+        if hr_check < .5: hr_num, hr_check = '', 0
+        elif hr_check >= .5:
+            hr_check = round(hr_check) - 1
+            hr_num = sorted(DICE_NUMBERS)[hr_check]
+        hr_trp_score += str(hr_num)
+    else: hr_check = 0
+
+    if trip > 0 and h > 0:
+        trip_check = round((trip / h) * 36)
+        if trip_check >= 1:
+            trip_num = sorted(DICE_NUMBERS)[hr_check + trip_check]
+            hr_trp_score += '(' + str(trip_num) + ')'
+
+    return hr_trp_score
+
+
+def _sorted_batter_bb_k(bb, so, hbp, pa):
+    if bb == 0: walk_check, walk_num = 0, 'n'
+    else:
+        walk_check = round((bb / pa) * 36) - 1
+        if walk_check <= 0: walk_num, walk_check = 'n', 0
+        else: walk_num = sorted(DICE_NUMBERS)[walk_check]
+    k_check = round((so / pa) * 36)
+    if k_check == 36: k_num = '66'
+    else: k_num = sorted(DICE_NUMBERS)[walk_check + k_check]
+    hbp_check = math.ceil((hbp / pa) * 36)
+
+    if hbp_check:
+        hbp_num = sorted(DICE_NUMBERS)[walk_check + k_check + hbp_check]
+        hbp_str = '/' + str(hbp_num)
+    else: hbp_str = ''
+
+    return '[' + str(walk_num) + '-' + str(k_num) + hbp_str + ']'
+
+
+def _sorted_probable_hit_number(h, pa):
+    ph_check = round((h / pa) * 36) - 1
+    return sorted(DICE_NUMBERS, reverse=True)[ph_check]
+
+
+def _sorted_pitcher_bb_k_hbp(bf, bb, so, hbp):
+    bb_check = math.ceil((bb / bf) * 36)
+    bb_num = sorted(DICE_NUMBERS)[bb_check]
+    if bb_num < 11: bb_num = 11
+    bb_string = '[' + str(bb_num) + '-'
+    k_check = round((so / bf) * 36)
+    if k_check == 0: k_str = 'n'
+    else:
+        k_num = sorted(DICE_NUMBERS)[bb_check + k_check]
+        k_str = str(k_num)
+    hp_check = math.ceil((hbp / bf) * 36)
+    if hp_check == 0: hp_str = ']'
+    else:
+        hp_num = sorted(DICE_NUMBERS)[bb_check + k_check + hp_check]
+        hp_str = str('/' + str(hp_num) + ']')
+
+    return bb_string + k_str + hp_str
+
+
+def _sorted_pitcher_control_number(walks, hb, hits_allowed, bf):
+    br_check = round(((walks + hits_allowed + hb) / bf) * 36)
+    if br_check == 36: pcn = 11
+    else:
+        pcn = str(sorted(DICE_NUMBERS, reverse=True)[br_check])
+
+    return pcn
+
+
+TABLES = {
+    'hr_3b_number': hr_3b_number,
+    'batter_bb_k': batter_bb_k,
+    'probable_hit_number': probable_hit_number,
+    'pitcher_bb_k_hbp': pitcher_bb_k_hbp,
+    'pitcher_control_number': pitcher_control_number,
+}
+BASELINE = {
+    'hr_3b_number': _sorted_hr_3b_number,
+    'batter_bb_k': _sorted_batter_bb_k,
+    'probable_hit_number': _sorted_probable_hit_number,
+    'pitcher_bb_k_hbp': _sorted_pitcher_bb_k_hbp,
+    'pitcher_control_number': _sorted_pitcher_control_number,
+}
+
+
+def _synthetic_seasons(count, seed):
+    rng = random.Random(seed)
+    seasons = []
+    for _ in range(count):
+        ab = rng.randint(100, 650)
+        h = int(ab * rng.uniform(.2, .33))
+        hr = int(h * rng.uniform(0, .25))
+        triples = int((h - hr) * rng.uniform(0, .06))
+        doubles = int((h - hr - triples) * rng.uniform(.1, .3))
+        bb = rng.randint(5, 100)
+        hbp = rng.randint(0, 12)
+        pa = ab + bb + hbp
+        bf = rng.randint(100, 1000)
+        seasons.append({
+            'g': rng.randint(40, 162), 'ab': ab, 'h': h, 'doubles': doubles,
+            'triples': triples, 'hr': hr, 'rbi': rng.randint(10, 130),
+            'sb': rng.randint(1, 50), 'bb': bb, 'so': int(pa * rng.uniform(.08, .25)),
+            'hbp': hbp, 'pa': pa,
+            'bf': bf, 'ha': int(bf * rng.uniform(.18, .28)),
+            'pbb': int(bf * rng.uniform(.04, .12)), 'pso': int(bf * rng.uniform(.1, .3)),
+            'phb': rng.randint(0, 10), 'phr': rng.randint(0, 30), 'gp': rng.randint(10, 40),
+            'ip': bf / 4.3, 'wp': rng.randint(0, 12),
+        })
+    return seasons
+
+
+def _rate(s, helpers=TABLES):
+    offense = (
+        clutch(s['rbi'], s['g']) +
+        hit_letter(s['h'], s['ab']) +
+        str(helpers['hr_3b_number'](s['hr'], s['triples'], s['h'])) +
+        speed(s['sb'], s['h'], s['bb'], s['hbp'], s['doubles'], s['triples'], s['hr']) +
+        ' ' + helpers['batter_bb_k'](s['bb'], s['so'], s['hbp'], s['pa'])
+    )
+    pitching = (
+        gopher(s['phr'], s['ha']) +
+        pitch_letter(s['ha'] / (s['bf'] - s['pbb'] - s['phb'])) +
+        innings_of_effectiveness(s['gp'], s['ip']) + ' ' +
+        helpers['pitcher_bb_k_hbp'](s['bf'], s['pbb'], s['pso'], s['phb']) + ' ' +
+        wild_pitch(s['wp'])
+    )
+    return (
+        offense, helpers['probable_hit_number'](s['h'], s['pa']),
+        pitching, helpers['pitcher_control_number'](s['pbb'], s['phb'], s['ha'], s['bf']),
+        helpers['probable_hit_number'](s['ha'], s['bf']),
+    )
+
+
+def _best(seasons, helpers, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for s in seasons:
+            _rate(s, helpers)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the per-player cost of the Sher-Co rating helpers on synthetic "
+        "seasons, against the sorted(numbers) versions they replaced"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        seasons = _synthetic_seasons(options['players'], options['seed'])
+        same = all(_rate(s, TABLES) == _rate(s, BASELINE) for s in seasons)
+
+        self.stdout.write(f"{len(seasons)} players, best of {options['repeat']}:")
+        self.stdout.write(f"  {'helpers':<16}{'total ms':>10}{'us/player':>11}")
+        for label, helpers in (('sorted(numbers)', BASELINE), ('rating_tables', TABLES)):
+            best = _best(seasons, helpers, options['repeat'])
+            per_player = best / len(seasons) * 1e6
+            self.stdout.write(f"  {label:<16}{best * 1000:>10.1f}{per_player:>11.2f}")
+        if same:
+            self.stdout.write("both give identical ratings")
+        else:
+            self.stdout.write(self.style.ERROR("the two give different ratings"))
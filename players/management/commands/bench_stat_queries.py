@@ -0,0 +1,142 @@
+import datetime
+import random
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from players.models import Players
+from stats.models import Competition, Game, PlayerStatLine
+from teams.models import Teams
+
+ROSTER = 25
+PITCHERS = 12       # the back of each roster
+LINES = 21          # stat lines a team gets in each game
+
+
+def _synthetic_season(name, teams, games_per_team, rng):
+    """A competition of finished games (the last tenth still draft), about teams * games * LINES statlines."""
+    competition = Competition.objects.create(name=name)
+    clubs = Teams.objects.bulk_create([Teams(first_name=name, team_name=f'T{i}') for i in range(teams)])
+    rosters = {}
+    for club in clubs:
+        rosters[club.serial] = Players.objects.bulk_create([
+            Players(year=name, first_name='P', last_name=f'{club.serial}-{i}', team_serial=club)
+            for i in range(ROSTER)
+        ])
+
+    start = datetime.date(2000, 4, 1)
+    count = teams * games_per_team // 2
+    games = Game.objects.bulk_create([
+        Game(
+            competition=competition, date_played=start + datetime.timedelta(days=n * 2 // teams),
+            home_team=clubs[n % teams], away_team=clubs[(n + 1 + n // teams % (teams - 1)) % teams],
+            home_score=rng.randrange(10), away_score=rng.randrange(10),
+            status='final' if n < count * .9 else 'draft',
+        )
+        for n in range(count)
+    ], batch_size=1000)
+
+    lines = []
+    for game in games:
+        for team_id in (game.home_team_id, game.away_team_id):
+            roster = rosters[team_id]
+            for i in sorted(rng.sample(range(ROSTER), LINES)):
+                pitched = i >= ROSTER - PITCHERS and rng.random() < .3
+                lines.append(PlayerStatLine(
+                    game=game, player=roster[i], team_id=team_id,
+                    ab=rng.randrange(5), h=rng.randrange(3),
+                    threw=pitched, ip_outs=rng.randrange(1, 19) if pitched else 0,
+                ))
+    PlayerStatLine.objects.bulk_create(lines, batch_size=5000)
+    return competition, games, rosters[clubs[0].serial][-1], len(lines)
+
+
+def _queries(competition, game, pitcher):
+    """The access paths the stats pages take, as (label, queryset, how to run it)."""
+    final = (
+        PlayerStatLine.objects.filter(game__status='final', game__competition_id__in=[competition.pk])
+        .values('game__competition_id', 'player_id', 'team_id')
+        .annotate(games=Count('game', distinct=True), ab=Sum('ab'), ip_outs=Sum('ip_outs'))
+        .order_by()
+    )
+    return [
+        ('standings: final games in date order',
+         Game.objects.filter(competition=competition, status='final').order_by('date_played', 'id')
+         .values_list('home_team_id', 'away_team_id', 'home_score', 'away_score'), list),
+        ('schedule: games in date order',
+         Game.objects.filter(competition=competition).order_by('date_played'), list),
+        ('aggregates: final lines by player', final, list),
+        ('boxscore: one game\'s lines', PlayerStatLine.objects.filter(game=game), list),
+        ('games pitched', PlayerStatLine.objects.filter(player=pitcher, ip_outs__gt=0), lambda qs: qs.count()),
+        ('games played', PlayerStatLine.objects.filter(player=pitcher), lambda qs: qs.count()),
+    ]
+
+
+def _measure(queries, repeat):
+    results = []
+    for label, queryset, run in queries:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run(queryset.all())
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results.append((label, best, queryset.explain()))
+    return results
+
+
+def _analyze():
+    with connection.cursor() as cursor:
+        for model in (Game, PlayerStatLine):
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+
+class Command(BaseCommand):
+    help = (
+        "Query plans and timings for the stats access paths on a synthetic "
+        "season, without and then with the Game and PlayerStatLine indexes. "
+        "Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--teams', type=int, default=30)
+        parser.add_argument('--games', type=int, default=162, help="games per team")
+        parser.add_argument('--seasons', type=int, default=2, help="seasons in the table; the first is queried")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        indexes = [(model, index) for model in (Game, PlayerStatLine) for index in model._meta.indexes]
+        editor = connection.schema_editor()
+
+        with transaction.atomic():
+            seasons = [
+                _synthetic_season(f'bench {n}', options['teams'], options['games'], rng)
+                for n in range(options['seasons'])
+            ]
+            competition, games, pitcher, lines = seasons[0]
+            queries = _queries(competition, games[len(games) // 2], pitcher)
+            self.stdout.write(
+                f"{sum(season[3] for season in seasons)} statlines in {options['seasons']} seasons, "
+                f"{lines} in the one queried"
+            )
+
+            with connection.cursor() as cursor:
+                for _, index in indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+            _analyze()
+            before = _measure(queries, options['repeat'])
+
+            with connection.cursor() as cursor:
+                for model, index in indexes:
+                    cursor.execute(str(index.create_sql(model, editor)))
+            _analyze()
+            after = _measure(queries, options['repeat'])
+
+            transaction.set_rollback(True)
+
+        for (label, slow, slow_plan), (_, fast, fast_plan) in zip(before, after):
+            self.stdout.write(f"\n{label}: {slow * 1000:.2f} ms -> {fast * 1000:.2f} ms")
+            self.stdout.write("  without:\n    " + slow_plan.replace('\n', '\n    '))
+            self.stdout.write("  with:\n    " + fast_plan.replace('\n', '\n    '))
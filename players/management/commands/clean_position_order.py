@@ -10,9 +10,11 @@ class Command(BaseCommand):
     help = "Clean and assign position_order for each player's positions based on Lahman fielding games"
 
     def handle(self, *args, **kwargs):
-        conn = get_lahman_connection()
-        cursor = conn.cursor()
+        with get_lahman_connection() as conn:
+            with conn.cursor() as cursor:
+                self.clean(cursor)
 
+    def clean(self, cursor):
         # Build Position map
         position_map = {pos.name: pos for pos in Position.objects.all()}
 
@@ -56,7 +58,4 @@ class Command(BaseCommand):
             updated_count += 1
             self.stdout.write(f"Updated {player}: {[f'{r.position.name}:{r.position_order}' for r, _ in sorted_ratings]}")
 
-        cursor.close()
-        conn.close()
-
         self.stdout.write(self.style.SUCCESS(f"Done: {updated_count} players updated, {skipped_count} skipped."))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from greenfield.utils.lahman_db import get_lahman_connection
+from greenfield.utils.lahman_snapshot import export_snapshot
+
+
+class Command(BaseCommand):
+    help = "Copy the Lahman tables used for ratings into the local columnar snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=settings.LAHMAN_SNAPSHOT_DIR,
+            help="Snapshot directory (defaults to settings.LAHMAN_SNAPSHOT_DIR)"
+        )
+
+    def handle(self, *args, **options):
+        with get_lahman_connection() as conn:
+            counts = export_snapshot(conn, options['path'])
+
+        for table, count in counts.items():
+            self.stdout.write(f"  {table}: {count} rows")
+        self.stdout.write(self.style.SUCCESS(f"Snapshot written to {options['path']}"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from greenfield.utils.league_export import competition_team_serials, iter_league_zip
+from stats.models import Competition
+
+
+class Command(BaseCommand):
+    help = "Write every team's card PDF and CSVs for a competition into one ZIP"
+
+    def add_arguments(self, parser):
+        parser.add_argument('competition', help="Competition id or name")
+        parser.add_argument('output', help="Path of the ZIP to write")
+        parser.add_argument('--workers', type=int, help="Render processes (default: one per core)")
+
+    def handle(self, *args, **options):
+        key = options['competition']
+        competition = Competition.objects.filter(
+            **({'pk': int(key)} if key.isdigit() else {'name': key})
+        ).first()
+        if competition is None:
+            raise CommandError(f"No competition {key!r}")
+
+        serials = competition_team_serials(competition)
+        written = 0
+        with open(options['output'], 'wb') as out:
+            for chunk in iter_league_zip(serials, options['workers']):
+                out.write(chunk)
+                written += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(serials)} teams ({written / 1024:.0f} KB) to {options['output']}"
+        ))
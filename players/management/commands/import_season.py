@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from greenfield.utils.season_import import import_seasons, MIN_GAMES
+
+
+class Command(BaseCommand):
+    help = "Rate every Lahman player for a season (or range of seasons) in one bulk pass"
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int, help="First yearID to import")
+        parser.add_argument('--through', type=int, help="Last yearID to import (defaults to year)")
+        parser.add_argument(
+            '--min-games', type=int, default=MIN_GAMES,
+            help=f"Minimum games with a team to get a card (default {MIN_GAMES})"
+        )
+
+    def handle(self, *args, **options):
+        year_from = options['year']
+        year_to = options['through'] or year_from
+        if year_to < year_from:
+            raise CommandError("--through must not be before year")
+
+        summary = import_seasons(year_from, year_to, options['min_games'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done {year_from}-{year_to}: {summary['players']} players, "
+            f"{summary['positions']} position ratings, {summary['teams']} new teams, "
+            f"{summary['skipped']} skipped."
+        ))
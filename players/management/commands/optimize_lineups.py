@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from greenfield.utils.lineup_optimizer import league_pitching, optimize_lineups, save_lineup
+from stats.models import TeamEntry
+from teams.models import Teams
+
+
+class Command(BaseCommand):
+    help = "Search batting orders and positions for the best vs-R and vs-L lineups and save them"
+
+    def add_arguments(self, parser):
+        parser.add_argument('teams', nargs='*', type=int, help="Team serials")
+        parser.add_argument('--competition', type=int, help="Every team in this competition")
+        parser.add_argument('--dh', action='store_true', help="Bat a DH instead of the pitcher")
+        parser.add_argument('--seed', type=int, help="Seed for the order search")
+        parser.add_argument('--dry-run', action='store_true', help="Print the lineups without saving them")
+
+    def handle(self, *args, **options):
+        serials = list(options['teams'])
+        if options['competition']:
+            serials += TeamEntry.objects.filter(
+                competition_id=options['competition']
+            ).values_list('team_id', flat=True)
+        if not serials:
+            raise CommandError("Give team serials or --competition")
+
+        pitching = league_pitching()
+        for team in Teams.objects.filter(serial__in=serials).order_by('serial'):
+            try:
+                lineups = optimize_lineups(team.serial, options['dh'], options['seed'], pitching)
+            except ValueError as exc:
+                self.stderr.write(f"{team}: {exc}")
+                continue
+
+            for hand, field in (('R', 'vs_r_lineup_serial'), ('L', 'vs_l_lineup_serial')):
+                slots, runs = lineups[hand]
+                self.stdout.write(f"{team} vs {hand}HP ({runs:.2f} runs/game)")
+                for spot, (player, position) in enumerate(slots, 1):
+                    self.stdout.write(f"  {spot}. {player or 'Pitcher'} {position}")
+                if not options['dry_run']:
+                    save_lineup(team, field, slots)
+
+        if not options['dry_run']:
+            self.stdout.write(self.style.SUCCESS("Saved lineups"))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from greenfield.utils.season_aggregates import rebuild_season_aggregates
+
+
+class Command(BaseCommand):
+    help = "Recompute the player and team season aggregates from finalized games"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'competitions', nargs='*', type=int,
+            help="Competition ids to rebuild (default: all)"
+        )
+
+    def handle(self, *args, **options):
+        players, teams = rebuild_season_aggregates(options['competitions'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {players} player and {teams} team season aggregates"
+        ))
@@ -0,0 +1,14 @@
+import time
+from django.core.management.base import BaseCommand
+from greenfield.utils.career_totals import refresh_career_totals
+
+
+class Command(BaseCommand):
+    help = "Rebuild the career totals table from Lahman (run once per Lahman release)"
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        count = refresh_career_totals()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt career totals for {count} players in {time.perf_counter() - start:.1f}s"
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from stats.models import Game
+from greenfield.utils.play_log import apply_play_log
+from greenfield.utils.season_aggregates import rebuild_season_aggregates
+
+
+class Command(BaseCommand):
+    help = "Rebuild stat lines, line scores and decisions from each game's play-by-play events"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'competitions', nargs='*', type=int,
+            help="Competition ids to replay (default: all)"
+        )
+
+    def handle(self, *args, **options):
+        games = Game.objects.filter(events__isnull=False).distinct().order_by('id')
+        if options['competitions']:
+            games = games.filter(competition_id__in=options['competitions'])
+
+        replayed, final_competitions = 0, set()
+        for game in games:
+            try:
+                apply_play_log(game)
+            except ValueError as exc:
+                self.stderr.write(f"Game {game.pk}: {exc}")
+                continue
+            replayed += 1
+            if game.status == 'final':
+                final_competitions.add(game.competition_id)
+
+        # final games already sit in the season aggregates, so redo those
+        if final_competitions:
+            rebuild_season_aggregates(sorted(final_competitions))
+        self.stdout.write(self.style.SUCCESS(f"Replayed {replayed} games"))
@@ -0,0 +1,58 @@
+import datetime
+import random
+import time
+from django.core.management.base import BaseCommand, CommandError
+from greenfield.utils.simulator import load_sim_teams, simulate_game, save_games
+from stats.models import Competition
+
+
+class Command(BaseCommand):
+    help = "Play a series between two teams with the Sher-Co simulator and save it to a competition"
+
+    def add_arguments(self, parser):
+        parser.add_argument('competition', help="Competition id or name")
+        parser.add_argument('home', type=int, help="Home team serial")
+        parser.add_argument('away', type=int, help="Away team serial")
+        parser.add_argument('--games', type=int, default=1)
+        parser.add_argument('--seed', type=int, help="Seed for a repeatable series")
+        parser.add_argument('--start', type=datetime.date.fromisoformat,
+                            default=datetime.date.today(), help="Date of the first game (YYYY-MM-DD)")
+        parser.add_argument('--dry-run', action='store_true', help="Play the games without saving them")
+
+    def handle(self, *args, **options):
+        key = options['competition']
+        competition = Competition.objects.filter(
+            **({'pk': int(key)} if key.isdigit() else {'name': key})
+        ).first()
+        if competition is None:
+            raise CommandError(f"No competition {key!r}")
+
+        try:
+            teams = load_sim_teams([options['home'], options['away']])
+            home, away = teams[options['home']], teams[options['away']]
+        except KeyError as exc:
+            raise CommandError(f"No team {exc}")
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        games = [
+            (options['start'] + datetime.timedelta(days=n),
+             simulate_game(home, away, rng, home.starter(n), away.starter(n)))
+            for n in range(options['games'])
+        ]
+        elapsed = time.perf_counter() - started
+
+        home_wins = sum(result['home_score'] > result['away_score'] for _, result in games)
+        away_wins = sum(result['away_score'] > result['home_score'] for _, result in games)
+        summary = (
+            f"{home.name} {home_wins}, {away.name} {away_wins} "
+            f"({len(games) / elapsed:.0f} games/s)"
+        )
+        if options['dry_run']:
+            self.stdout.write(summary)
+            return
+
+        save_games(competition, games)
+        self.stdout.write(self.style.SUCCESS(f"Saved {len(games)} games: {summary}"))
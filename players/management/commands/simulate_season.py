@@ -0,0 +1,64 @@
+import datetime
+import random
+import time
+from django.core.management.base import BaseCommand, CommandError
+from greenfield.utils.season_sim import simulate_season, playoff_odds
+from stats.models import Competition
+
+
+class Command(BaseCommand):
+    help = "Simulate a season for a competition's teams, or replay it many times for playoff odds"
+
+    def add_arguments(self, parser):
+        parser.add_argument('competition', help="Competition id or name")
+        parser.add_argument('--games', type=int, default=162, help="Games per team")
+        parser.add_argument('--series', type=int, default=3, help="Games per series")
+        parser.add_argument('--seed', type=int, help="Season seed (printed, so a run can be repeated)")
+        parser.add_argument('--replicas', type=int, default=1,
+                            help="Seasons to play for playoff odds; with 1 the season is saved")
+        parser.add_argument('--playoff-teams', type=int, default=4, help="Playoff spots per league")
+        parser.add_argument('--start', type=datetime.date.fromisoformat,
+                            default=datetime.date.today(), help="Opening day (YYYY-MM-DD)")
+        parser.add_argument('--workers', type=int, help="Simulation processes (default: one per core)")
+        parser.add_argument('--dry-run', action='store_true', help="Play the season without saving it")
+
+    def handle(self, *args, **options):
+        key = options['competition']
+        competition = Competition.objects.filter(
+            **({'pk': int(key)} if key.isdigit() else {'name': key})
+        ).first()
+        if competition is None:
+            raise CommandError(f"No competition {key!r}")
+
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        started = time.perf_counter()
+        try:
+            if options['replicas'] > 1:
+                rows = playoff_odds(
+                    competition, seed, options['replicas'], options['games'], options['series'],
+                    options['playoff_teams'], options['workers'],
+                )
+            else:
+                games = simulate_season(
+                    competition, seed, options['games'], options['series'],
+                    options['start'], options['workers'], save=not options['dry_run'],
+                )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        if options['replicas'] > 1:
+            self.stdout.write(f"{'Team':30} {'W':>6} {'L':>6} {'Div':>6} {'Playoffs':>9}")
+            for row in rows:
+                self.stdout.write(
+                    f"{row['team'][:30]:30} {row['wins']:6.1f} {row['losses']:6.1f} "
+                    f"{row['division']:6.1%} {row['playoffs']:9.1%}"
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f"{options['replicas']} seasons in {elapsed:.1f}s (seed {seed})"
+            ))
+        else:
+            verb = "Played" if options['dry_run'] else "Saved"
+            self.stdout.write(self.style.SUCCESS(
+                f"{verb} {len(games)} games in {elapsed:.1f}s (seed {seed})"
+            ))
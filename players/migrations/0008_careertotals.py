@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0007_alter_playerpositionrating_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CareerTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_id', models.CharField(max_length=10, unique=True)),
+                ('name_first', models.CharField(blank=True, null=True)),
+                ('name_last', models.CharField(blank=True, null=True)),
+                ('name_given', models.CharField(blank=True, null=True)),
+                ('debut_year', models.IntegerField(blank=True, null=True)),
+                ('bats', models.CharField(blank=True, max_length=1, null=True)),
+                ('throws', models.CharField(blank=True, max_length=1, null=True)),
+                ('first_year', models.IntegerField(blank=True, null=True)),
+                ('last_year', models.IntegerField(blank=True, null=True)),
+                ('games', models.IntegerField(default=0)),
+                ('primary_team', models.CharField(blank=True, null=True)),
+                ('primary_franchise', models.CharField(blank=True, max_length=3, null=True)),
+                ('primary_position', models.CharField(blank=True, max_length=3, null=True)),
+                ('batting', models.JSONField(default=list)),
+                ('pitching', models.JSONField(default=list)),
+                ('fielding', models.JSONField(default=list)),
+                ('catcher_sb', models.IntegerField(default=0)),
+                ('catcher_cs', models.IntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,237 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:14
+
+import re
+from django.db import migrations, models
+
+# frozen copy of greenfield.utils.rating_fields as of this migration, so a
+# later parser change can't change what this backfills
+HIT_GRADES = ('G+', 'E', 'E+', 'D', 'D+', 'C', 'C+', 'B', 'B+', 'A', 'A+', 'AA', 'AAA')
+PITCH_GRADES = ('J+', 'J', 'K', 'L', 'M', 'W', 'X', 'Y', 'Z+', 'Z')
+GOPHER = {'+': 1, '': 0, '-': -1}
+DICE_NUMBERS = frozenset(10 * tens + ones for tens in range(1, 7) for ones in range(1, 7))
+
+OFFENSE_RE = re.compile(
+    r'(?P<clutch>#?)(?P<letter>AAA|AA|A\+|A|B\+|B|C\+|C|D\+|D|E\+|E|G\+)'
+    r'(?P<hr>\d\d)?(?:\((?P<triple>\d\d)\))?(?P<speed>\**)\s*'
+    r'\[(?P<walk>n|\d\d)-(?P<k>\d\d)(?:/(?P<hbp>\d\d))?\]'
+)
+PITCHING_RE = re.compile(
+    r'(?P<gopher>[+-]?)(?P<letter>J\+|J|K|L|M|W|X|Y|Z\+|Z)(?P<ioe>\d+)\s*'
+    r'\[(?P<walk>\d\d)-(?P<k>n|\d\d)(?:/(?P<hbp>\d\d))?\]\s*(?P<wp>\[WP\])?'
+)
+DEFENSE_RE = re.compile(r'(?P<superior>S?)(?P<arm>\d?)(?P<range>\d?)(?:-(?P<throw>\d))?')
+UNRATED_OFFENSE = 'G+ [n-36]'
+
+OFFENSE_FIELDS = (
+    'hit_grade', 'clutch', 'hr_number', 'triple_number', 'speed',
+    'walk_top', 'strikeout_top', 'hbp_top',
+)
+PITCHING_FIELDS = (
+    'pitch_grade', 'gopher', 'effectiveness',
+    'pitch_walk_top', 'pitch_strikeout_top', 'pitch_hbp_top', 'wild_pitch',
+)
+DEFENSE_FIELDS = ('superior', 'arm', 'range', 'catcher_throw')
+
+NO_OFFENSE = dict.fromkeys(OFFENSE_FIELDS) | {'clutch': False, 'speed': 0}
+NO_PITCHING = dict.fromkeys(PITCHING_FIELDS) | {'wild_pitch': False}
+NO_DEFENSE = dict.fromkeys(DEFENSE_FIELDS) | {'superior': False}
+
+
+def _dice(value):
+    if not value or value == 'n':
+        return None
+    number = int(value)
+    if number not in DICE_NUMBERS:
+        raise ValueError(number)
+    return number
+
+
+def offense_fields(offense):
+    offense = (offense or '').strip()
+    match = OFFENSE_RE.match(offense)
+    if not match or offense == UNRATED_OFFENSE:
+        return dict(NO_OFFENSE)
+    try:
+        return {
+            'hit_grade': HIT_GRADES.index(match['letter']),
+            'clutch': bool(match['clutch']),
+            'hr_number': _dice(match['hr']),
+            'triple_number': _dice(match['triple']),
+            'speed': len(match['speed']),
+            'walk_top': _dice(match['walk']),
+            'strikeout_top': _dice(match['k']),
+            'hbp_top': _dice(match['hbp']),
+        }
+    except ValueError:
+        return dict(NO_OFFENSE)
+
+
+def pitching_fields(pitching):
+    match = PITCHING_RE.match((pitching or '').strip())
+    if not match:
+        return dict(NO_PITCHING)
+    try:
+        return {
+            'pitch_grade': PITCH_GRADES.index(match['letter']),
+            'gopher': GOPHER[match['gopher']],
+            'effectiveness': int(match['ioe']),
+            'pitch_walk_top': _dice(match['walk']),
+            'pitch_strikeout_top': _dice(match['k']),
+            'pitch_hbp_top': _dice(match['hbp']),
+            'wild_pitch': bool(match['wp']),
+        }
+    except ValueError:
+        return dict(NO_PITCHING)
+
+
+def defense_fields(rating):
+    match = DEFENSE_RE.fullmatch((rating or '').strip())
+    if not match or not (rating or '').strip():
+        return dict(NO_DEFENSE)
+    return {
+        'superior': bool(match['superior']),
+        'arm': int(match['arm']) if match['arm'] else None,
+        'range': int(match['range']) if match['range'] else None,
+        'catcher_throw': int(match['throw']) if match['throw'] else None,
+    }
+
+
+def fill_rating_columns(apps, schema_editor):
+    # historical models don't have the save() hooks, so parse here
+    Players = apps.get_model('players', 'Players')
+    PlayerPositionRating = apps.get_model('players', 'PlayerPositionRating')
+
+    players = list(Players.objects.only('serial', 'offense', 'pitching'))
+    for player in players:
+        for name, value in (offense_fields(player.offense) | pitching_fields(player.pitching)).items():
+            setattr(player, name, value)
+    Players.objects.bulk_update(players, OFFENSE_FIELDS + PITCHING_FIELDS, batch_size=1000)
+
+    ratings = list(PlayerPositionRating.objects.only('id', 'rating'))
+    for rating in ratings:
+        for name, value in defense_fields(rating.rating).items():
+            setattr(rating, name, value)
+    PlayerPositionRating.objects.bulk_update(ratings, DEFENSE_FIELDS, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0008_careertotals'),
+        ('teams', '0002_remove_teams_name_teams_first_name_teams_team_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerpositionrating',
+            name='arm',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='playerpositionrating',
+            name='catcher_throw',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='playerpositionrating',
+            name='range',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='playerpositionrating',
+            name='superior',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='clutch',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='effectiveness',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='gopher',
+            field=models.SmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='hbp_top',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='hit_grade',
+            field=models.PositiveSmallIntegerField(blank=True, choices=[(0, 'G+'), (1, 'E'), (2, 'E+'), (3, 'D'), (4, 'D+'), (5, 'C'), (6, 'C+'), (7, 'B'), (8, 'B+'), (9, 'A'), (10, 'A+'), (11, 'AA'), (12, 'AAA')], editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='hr_number',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='pitch_grade',
+            field=models.PositiveSmallIntegerField(blank=True, choices=[(0, 'J+'), (1, 'J'), (2, 'K'), (3, 'L'), (4, 'M'), (5, 'W'), (6, 'X'), (7, 'Y'), (8, 'Z+'), (9, 'Z')], editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='pitch_hbp_top',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='pitch_strikeout_top',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='pitch_walk_top',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='speed',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='strikeout_top',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='triple_number',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='walk_top',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='players',
+            name='wild_pitch',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(fill_rating_columns, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='playerpositionrating',
+            index=models.Index(fields=['position', 'range'], name='rating_position_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerpositionrating',
+            index=models.Index(fields=['position', 'arm'], name='rating_position_arm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='players',
+            index=models.Index(fields=['hit_grade', 'hr_number'], name='players_hit_grade_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='players',
+            index=models.Index(fields=['effectiveness', 'pitch_grade'], name='players_effectiveness_idx'),
+        ),
+    ]
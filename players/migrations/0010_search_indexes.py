@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0009_rating_columns'),
+        ('teams', '0002_remove_teams_name_teams_first_name_teams_team_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='players',
+            index=models.Index(fields=['last_name', 'first_name', 'serial'], name='players_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='players',
+            index=models.Index(fields=['year', 'last_name', 'first_name', 'serial'], name='players_year_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='players',
+            index=models.Index(fields=['-hit_grade', 'serial'], name='players_hit_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='players',
+            index=models.Index(fields=['-effectiveness', 'pitch_grade', 'serial'], name='players_effect_order_idx'),
+        ),
+    ]
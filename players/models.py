@@ -1,5 +1,9 @@
 from django.db import models
 from django.urls import reverse
+from greenfield.utils.rating_fields import (
+    HIT_GRADES, PITCH_GRADES, OFFENSE_FIELDS, PITCHING_FIELDS, DEFENSE_FIELDS,
+    offense_fields, pitching_fields, defense_fields,
+)
 
 class Players(models.Model):
 
@@ -17,10 +21,56 @@ class Players(models.Model):
     pitch_prob_hit = models.IntegerField(null=True, blank=True)
     team_serial = models.ForeignKey('teams.Teams', on_delete=models.SET_NULL, null=True, blank=True)
 
+    # offense and pitching split into their parts on save (see rating_fields),
+    # so sorting, filtering and the simulator don't re-parse the strings.
+    # Range ends are the dice numbers as printed.
+    hit_grade = models.PositiveSmallIntegerField(
+        null=True, blank=True, editable=False, choices=list(enumerate(HIT_GRADES))
+    )
+    clutch = models.BooleanField(default=False, editable=False)
+    hr_number = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    triple_number = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    speed = models.PositiveSmallIntegerField(default=0, editable=False)
+    walk_top = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    strikeout_top = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    hbp_top = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    pitch_grade = models.PositiveSmallIntegerField(
+        null=True, blank=True, editable=False, choices=list(enumerate(PITCH_GRADES))
+    )
+    gopher = models.SmallIntegerField(null=True, blank=True, editable=False)   # +1, 0 or -1
+    effectiveness = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    pitch_walk_top = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    pitch_strikeout_top = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    pitch_hbp_top = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    wild_pitch = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['hit_grade', 'hr_number'], name='players_hit_grade_idx'),
+            models.Index(fields=['effectiveness', 'pitch_grade'], name='players_effectiveness_idx'),
+            # one per player_search ordering, columns and directions matching
+            models.Index(fields=['last_name', 'first_name', 'serial'], name='players_name_idx'),
+            models.Index(fields=['year', 'last_name', 'first_name', 'serial'], name='players_year_name_idx'),
+            models.Index(fields=['-hit_grade', 'serial'], name='players_hit_order_idx'),
+            models.Index(fields=['-effectiveness', 'pitch_grade', 'serial'], name='players_effect_order_idx'),
+        ]
+
     @property
     def id(self):
         return self.serial
 
+    def parse_ratings(self):
+        """Fill the parsed columns from offense and pitching. bulk_create callers do this themselves."""
+        for name, value in (offense_fields(self.offense) | pitching_fields(self.pitching)).items():
+            setattr(self, name, value)
+
+    def save(self, *args, **kwargs):
+        self.parse_ratings()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *OFFENSE_FIELDS, *PITCHING_FIELDS}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.year})"
 
@@ -35,10 +85,30 @@ class PlayerPositionRating(models.Model):
     position = models.ForeignKey(Position, on_delete=models.CASCADE)
     rating = models.CharField(max_length=10)
     position_order = models.PositiveIntegerField(default=0)  # New field for ordering
+    # rating split into its parts on save, like the Players rating columns
+    superior = models.BooleanField(default=False, editable=False)
+    arm = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    range = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    catcher_throw = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
 
     class Meta:
         unique_together = ('player', 'position')
         ordering = ['position_order']  # ⚠️ This enforces order at the query level
+        indexes = [
+            models.Index(fields=['position', 'range'], name='rating_position_range_idx'),
+            models.Index(fields=['position', 'arm'], name='rating_position_arm_idx'),
+        ]
+
+    def parse_rating(self):
+        for name, value in defense_fields(self.rating).items():
+            setattr(self, name, value)
+
+    def save(self, *args, **kwargs):
+        self.parse_rating()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *DEFENSE_FIELDS}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.player} - {self.position.name}: {self.rating}"
@@ -50,4 +120,33 @@ class PlayerPicture(models.Model):
     picture = models.ImageField(
         upload_to='players/', height_field=None, 
         width_field=None, max_length=100, null=True, blank=True
-        )
\ No newline at end of file
+        )
+
+class CareerTotals(models.Model):
+    """
+    One row per Lahman player: career sums, primary team/franchise and
+    position. Rebuilt by manage.py refresh_career_totals after each Lahman
+    release; the career search and career rating pages read from here.
+    """
+    player_id = models.CharField(max_length=10, unique=True)  # Lahman playerID
+    name_first = models.CharField(null=True, blank=True)
+    name_last = models.CharField(null=True, blank=True)
+    name_given = models.CharField(null=True, blank=True)
+    debut_year = models.IntegerField(null=True, blank=True)
+    bats = models.CharField(max_length=1, null=True, blank=True)
+    throws = models.CharField(max_length=1, null=True, blank=True)
+    first_year = models.IntegerField(null=True, blank=True)
+    last_year = models.IntegerField(null=True, blank=True)
+    games = models.IntegerField(default=0)
+    primary_team = models.CharField(null=True, blank=True)  # Lahman team name
+    primary_franchise = models.CharField(max_length=3, null=True, blank=True)  # franchID
+    primary_position = models.CharField(max_length=3, null=True, blank=True)
+    # Sums in the column order rate_player_career and its template index by
+    batting = models.JSONField(default=list)
+    pitching = models.JSONField(default=list)
+    fielding = models.JSONField(default=list)  # [pos, po, a, e, g], most games first
+    catcher_sb = models.IntegerField(default=0)
+    catcher_cs = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name_first} {self.name_last} ({self.player_id})"
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from greenfield.utils.team_cards import invalidate_team_cards
+from .models import Players, PlayerPositionRating
+
+
+@receiver([post_save, post_delete], sender=Players)
+def player_changed(sender, instance, **kwargs):
+    invalidate_team_cards(instance.team_serial_id)
+
+
+@receiver([post_save, post_delete], sender=PlayerPositionRating)
+def position_rating_changed(sender, instance, **kwargs):
+    player = Players.objects.filter(pk=instance.player_id).values('team_serial_id').first()
+    if player:
+        invalidate_team_cards(player['team_serial_id'])
@@ -6,6 +6,8 @@ app_name = 'players'
 urlpatterns = [
     path('create_from_team/', views.create_players_from_team, name='create_players_from_team'),
     path('career-search/', views.search_career_players, name='search_career_players'),
+    path('career-autocomplete/', views.career_autocomplete, name='career_autocomplete'),
+    path('search/', views.player_search, name='player_search'),
     path('rate/career/<str:player_id>/', views.rate_player_career, name='rate_player_career'),
     path('view/<str:playerID>/', views.view_player, name='view_player'),
     path('rate/<str:playerID>/<int:year>/<str:team_name>/', views.rate_player, name='rate_player'),
@@ -13,5 +15,7 @@ urlpatterns = [
     path('edit/', views.select_team_for_edit, name='select_team_for_edit'),
     path('edit/<int:player_id>/', views.edit_player, name='edit_player'),
     path('delete/<int:player_id>/', views.delete_player, name='delete_player'),
+    path('import_season/', views.import_season, name='import_season'),
+    path('lahman_pool/', views.lahman_pool_status, name='lahman_pool_status'),
     path('create_custom_player/', views.create_custom_player, name='create_custom_player'),
 ]
\ No newline at end of file
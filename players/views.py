@@ -8,7 +8,7 @@ from greenfield.utils.lahman_db import (
     get_teamID_from_name,
     get_rated_player_status,
     get_player_season_stats,
-    get_lahman_connection
+    lahman_pool_stats
     )
 from greenfield.utils.sherco import (
     clutch, hit_letter, hr_3b_number,
@@ -19,14 +19,19 @@ from greenfield.utils.sherco import (
     get_superior_rating, get_catcher_throw_rating
 )
 from greenfield.utils.all_time import all_time_team_finder, get_franchise_display_map
-from .models import Players, Position, PlayerPositionRating  # Your Greenfield models
+from greenfield.utils.season_import import import_seasons
+from greenfield.utils.career_totals import get_career_stats
+from greenfield.utils.name_index import get_name_index
+from greenfield.utils.player_search import search_players
+from .models import Players, Position, PlayerPositionRating, CareerTotals  # Your Greenfield models
 from teams.models import Teams
 from django.db.models import Q
+from django.http import JsonResponse
 from django.contrib import messages
 from .forms import (
     PlayerForm, PlayerPositionRatingFormSet, PlayerEditForm,
     PlayerPositionRatingModelFormset, CustomPlayerStatsForm,
-    PictureFormSet
+    PictureFormSet, SeasonImportForm
 )
 from django.forms import modelformset_factory
 from django.contrib import messages
@@ -177,6 +182,25 @@ def create_custom_player(request):
     return render(request, 'players/create_custom_player.html', {'form': form})
 
 
+def import_season(request):
+    if request.method == 'POST':
+        form = SeasonImportForm(request.POST)
+        if form.is_valid():
+            year_from = form.cleaned_data['year_from']
+            year_to = form.cleaned_data['year_to'] or year_from
+            summary = import_seasons(year_from, year_to)
+            messages.success(
+                request,
+                f"Imported {year_from}-{year_to}: {summary['players']} players, "
+                f"{summary['teams']} new teams, {summary['skipped']} already rated."
+            )
+            return redirect('players:import_season')
+    else:
+        form = SeasonImportForm()
+
+    return render(request, 'players/import_season.html', {'form': form})
+
+
 def search_career_players(request):
     players = []
     first_name = last_name = ""
@@ -186,77 +210,22 @@ def search_career_players(request):
         last_name = request.GET.get("last_name", "").strip()
 
         if first_name or last_name:
-            conn = get_lahman_connection()
-            cursor = conn.cursor()
-
-            # Base query
-            query = """
-                SELECT p.playerID, p.nameFirst, p.nameLast, p.nameGiven,
-                    MIN(stats.yearID) AS first_year,
-                    MAX(stats.yearID) AS last_year,
-
-                    (
-                        SELECT t.name
-                        FROM (
-                            SELECT teamID, SUM(G) as total_games
-                            FROM (
-                                SELECT teamID, G FROM Batting WHERE playerID = p.playerID
-                                UNION ALL
-                                SELECT teamID, G FROM Pitching WHERE playerID = p.playerID
-                                UNION ALL
-                                SELECT teamID, G FROM Fielding WHERE playerID = p.playerID
-                            ) AS appearances
-                            GROUP BY teamID
-                            ORDER BY total_games DESC
-                            LIMIT 1
-                        ) AS top_team
-                        JOIN Teams t ON t.teamID = top_team.teamID
-                        ORDER BY t.yearID DESC
-                        LIMIT 1
-                    ) AS primary_team,
-
-                    (
-                        SELECT POS
-                        FROM Fielding f
-                        WHERE f.playerID = p.playerID
-                        GROUP BY POS
-                        ORDER BY SUM(G) DESC
-                        LIMIT 1
-                    ) AS primary_position
-
-                FROM People p
-                JOIN (
-                    SELECT playerID, yearID FROM Batting
-                    UNION
-                    SELECT playerID, yearID FROM Pitching
-                    UNION
-                    SELECT playerID, yearID FROM Fielding
-                ) stats USING(playerID)
-            """
-
-            # WHERE clause and params
-            where_clauses = []
-            params = []
-
-            if first_name:
-                where_clauses.append("LOWER(p.nameFirst) ILIKE %s")
-                params.append(f"%{first_name.lower()}%")
-
-            if last_name:
-                where_clauses.append("LOWER(p.nameLast) ILIKE %s")
-                params.append(f"%{last_name.lower()}%")
-
-            if where_clauses:
-                query += " WHERE " + " AND ".join(where_clauses)
-
-            query += """
-                GROUP BY p.playerID, p.nameFirst, p.nameLast, p.nameGiven
-                ORDER BY p.nameGiven
-            """
-
-            cursor.execute(query, params)
-            players = cursor.fetchall()
-            conn.close()
+            matches = get_name_index().search(first_name=first_name, last_name=last_name)
+            matches.sort(key=lambda row: (row['name_given'] is None, row['name_given'] or ''))
+
+            # tuples in the order the template indexes them
+            players = [
+                tuple(row[field] for field in (
+                    'player_id', 'name_first', 'name_last', 'name_given',
+                    'first_year', 'last_year', 'primary_team', 'primary_position'
+                ))
+                for row in matches
+            ]
+
+            if not players and not CareerTotals.objects.exists():
+                messages.warning(
+                    request, "Career totals haven't been built yet: run manage.py refresh_career_totals."
+                )
 
     return render(request, "players/career_search.html", {
         "players": players,
@@ -265,138 +234,87 @@ def search_career_players(request):
     })
 
 
+def career_autocomplete(request):
+    """Top career matches for the typed name, most games first, as JSON."""
+    query = request.GET.get("q", "").strip()
+    try:
+        limit = min(max(int(request.GET.get("limit", 10)), 1), 50)
+    except ValueError:
+        limit = 10
+
+    results = []
+    if query:
+        for row in get_name_index().search(query=query, limit=limit):
+            results.append({
+                'player_id': row['player_id'],
+                'name': f"{row['name_first'] or ''} {row['name_last'] or ''}".strip(),
+                'first_year': row['first_year'],
+                'last_year': row['last_year'],
+                'primary_team': row['primary_team'],
+                'primary_position': row['primary_position'],
+                'games': row['games'],
+                'url': reverse('players:rate_player_career', args=[row['player_id']]),
+            })
+
+    return JsonResponse({'query': query, 'results': results})
+
+
+def player_search(request):
+    """
+    Rated players matching the query string filters, a page at a time, as
+    JSON. Pass back 'next' as ?cursor= for the following page.
+    """
+    try:
+        players, cursor = search_players(request.GET)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    results = []
+    for player in players:
+        team = player.team_serial
+        results.append({
+            'serial': player.serial,
+            'name': f"{player.first_name} {player.last_name}",
+            'year': player.year,
+            'team': str(team) if team else None,
+            'franchise': team.team_name if team else None,
+            'bats': player.bats,
+            'throws': player.throws,
+            'offense': player.offense,
+            'bat_prob_hit': player.bat_prob_hit,
+            'pitching': player.pitching,
+            'pitch_prob_hit': player.pitch_prob_hit,
+            'positions': [
+                {'position': rating.position.name, 'rating': rating.rating}
+                for rating in player.position_ratings.all()
+            ],
+            'url': reverse('players:edit_player', args=[player.serial]),
+        })
+
+    return JsonResponse({'results': results, 'next': cursor})
+
+
 def rate_player_career(request, player_id):
     greenfield_dict = {'year': 'All Time'}
 
-    with get_lahman_connection() as conn:
-        with conn.cursor() as cursor:
-            # Player names
-            cursor.execute("""
-                SELECT nameFirst, nameLast, nameGiven,
-                EXTRACT(YEAR FROM debut)
-                FROM People
-                WHERE playerID = %s
-            """, (player_id,))
-            result = cursor.fetchone()
-            name_first, name_last, name_given, debut = result
-            print(debut)
-            greenfield_dict['first_name'] = name_first
-            greenfield_dict['last_name'] = name_last
-            greenfield_dict['debut_year'] = int(debut)
-
-            # Bats / Throws
-            cursor.execute("""
-                SELECT bats, throws
-                FROM People
-                WHERE playerID = %s
-            """, (player_id,))
-            bats_throws = cursor.fetchone()
-            bats = bats_throws[0] if bats_throws else None
-            throws = bats_throws[1] if bats_throws else None
-
-            # Batting totals
-            cursor.execute("""
-                SELECT
-                    SUM(H), SUM(AB), SUM(HR), SUM("3B"), SUM(BB), SUM(HBP),
-                    SUM(SB), SUM("2B"), SUM(RBI), SUM(SO), SUM(G), SUM(SF),
-                    SUM(SH)
-                FROM Batting
-                WHERE playerID = %s
-            """, (player_id,))
-            batting = cursor.fetchone()
-
-            # Pitching totals
-            cursor.execute("""
-                SELECT
-                    SUM(BFP), SUM(H), SUM(BB), SUM(HBP), SUM(SH), SUM(SF),
-                    SUM(G), SUM(IPouts), SUM(SO), SUM(HR), SUM(WP),
-                    COUNT(DISTINCT yearID) AS seasons
-                FROM Pitching
-                WHERE playerID = %s
-            """, (player_id,))
-            pitching = cursor.fetchone()
-
-            # Fielding summary by position
-            cursor.execute("""
-                SELECT POS, SUM(PO), SUM(A), SUM(E), SUM(G)
-                FROM Fielding
-                WHERE playerID = %s
-                GROUP BY POS
-                HAVING SUM(G) >= 6
-                ORDER BY SUM(G) DESC
-            """, (player_id,))
-            fielding = cursor.fetchall()
-
-            # Catcher SB/CS
-            cursor.execute("""
-                SELECT SUM(SB), SUM(CS)
-                FROM Fielding
-                WHERE playerID = %s AND POS = 'C'
-            """, (player_id,))
-            sb_cs = cursor.fetchone()
-            sba_total = sb_cs[0] or 0
-            cs_total = sb_cs[1] or 0
-
-            # OF Splits
-            of_stats = [row for row in fielding if row[0] == 'OF']
-            non_of_stats = [row for row in fielding if row[0] != 'OF']
-            of_splits = []
-
-            if of_stats:
-                cursor.execute("""
-                    SELECT POS, SUM(PO), SUM(A), SUM(E), SUM(G)
-                    FROM FieldingOFsplit
-                    WHERE playerID = %s
-                    GROUP BY POS
-                    HAVING SUM(G) >= 15
-                    ORDER BY SUM(G) DESC
-                """, (player_id,))
-                of_splits = cursor.fetchall()
-
-            if of_splits:
-                fielding = non_of_stats + of_splits
-            else:
-                fielding = non_of_stats + of_stats
-            fielding.sort(key=lambda row: row[4], reverse=True)
-
-            # Get top franchise by appearances
-            cursor.execute("""
-                SELECT franchID, SUM(games) as total_games
-                FROM (
-                    SELECT t.franchID, b.G AS games
-                    FROM Batting b
-                    JOIN Teams t ON b.teamID = t.teamID AND b.yearID = t.yearID
-                    WHERE b.playerID = %s
-
-                    UNION ALL
-
-                    SELECT t.franchID, p.G AS games
-                    FROM Pitching p
-                    JOIN Teams t ON p.teamID = t.teamID AND p.yearID = t.yearID
-                    WHERE p.playerID = %s
-
-                    UNION ALL
-
-                    SELECT t.franchID, f.G AS games
-                    FROM Fielding f
-                    JOIN Teams t ON f.teamID = t.teamID AND f.yearID = t.yearID
-                    WHERE f.playerID = %s
-                ) AS combined
-                GROUP BY franchID
-                ORDER BY total_games DESC
-                LIMIT 1
-            """, (player_id, player_id, player_id))
-
-            top_team = cursor.fetchone()
-            
-            print(f"Top franchise: {top_team}")
-
-            franchise_id = top_team[0] if top_team else 'UNK'
-            display_map = get_franchise_display_map()
-            franchise_display = display_map.get(franchise_id, "Unknown Team")
-
-            greenfield_dict['team_name'] = franchise_display
-            print(f"Final franchise name: {franchise_display}")
+    career = get_career_stats(player_id)
+    name_first, name_last = career['name_first'], career['name_last']
+    greenfield_dict['first_name'] = name_first
+    greenfield_dict['last_name'] = name_last
+    greenfield_dict['debut_year'] = career['debut_year']
+    bats, throws = career['bats'], career['throws']
+
+    batting = career['batting']
+    pitching = career['pitching']
+    fielding = career['fielding']
+    sba_total = career['sb']
+    cs_total = career['cs']
+
+    franchise_id = career['franchise_id'] or 'UNK'
+    display_map = get_franchise_display_map()
+    franchise_display = display_map.get(franchise_id, "Unknown Team")
+
+    greenfield_dict['team_name'] = franchise_display
 
     # --- Sherco Ratings Calculations ---
 
@@ -540,6 +458,10 @@ def rate_player_career(request, player_id):
     return render(request, 'players/rate_player.html', context)
 
 
+def lahman_pool_status(request):
+    return JsonResponse(lahman_pool_stats())
+
+
 def view_player(request, playerID):
     with connection.cursor() as cursor:
         cursor.execute("SELECT * FROM People WHERE playerID = %s", [playerID])
@@ -554,84 +476,13 @@ def rate_player(request, playerID, year, team_name):
     greenfield_dict['first_name'] = name_first
     greenfield_dict['last_name'] = name_last
 
-    with get_lahman_connection() as conn:
-
-        with conn.cursor() as cursor:
-            # Bats/Throws info
-            cursor.execute("""
-                SELECT bats, throws
-                FROM People
-                WHERE playerID = %s
-            """, (playerID,))
-            bats_throws = cursor.fetchone()
-            bats = bats_throws[0] if bats_throws else None
-            throws = bats_throws[1] if bats_throws else None
-
-        with conn.cursor() as cursor:
-            # Batting stats
-            cursor.execute("""
-                SELECT
-                    SUM(H), SUM(AB), SUM(HR), SUM("3B"), SUM(BB), SUM(HBP),
-                    SUM(SB), SUM("2B"), SUM(RBI), SUM(SO), SUM(G), SUM(SF),
-                    SUM(SH)
-                FROM Batting
-                WHERE playerID = %s AND yearID = %s
-            """, (playerID, year))
-            batting = cursor.fetchone()
-
-            # Pitching stats
-            cursor.execute("""
-                SELECT
-                    SUM(BFP), SUM(H), SUM(BB), SUM(HBP), SUM(BAOpp),
-                    SUM(G), SUM(IPouts), SUM(SO), SUM(HR), SUM(WP)
-                FROM Pitching
-                WHERE playerID = %s AND yearID = %s
-            """, (playerID, year))
-            pitching = cursor.fetchone()
-
-            # Fielding summary by position (POS)
-            cursor.execute("""
-                SELECT POS, SUM(PO), SUM(A), SUM(E), SUM(G)
-                FROM Fielding
-                WHERE playerID = %s AND yearID = %s
-                GROUP BY POS
-                HAVING SUM(G) >= 1
-                ORDER BY SUM(G) DESC
-            """, (playerID, year))
-            fielding = cursor.fetchall()
-            # field ex. = [('2B', 160, 206, 14), ('3B', 12, 26, 5), ('OF', 21, 1, 2)]
-
-            # SB and CS from Fielding (catcher stats)
-            cursor.execute("""
-                SELECT SUM(SB), SUM(CS)
-                FROM Fielding
-                WHERE playerID = %s AND yearID = %s AND POS = 'C'
-            """, (playerID, year))
-            sb_cs = cursor.fetchone()
-            sba_total = sb_cs[0] or 0
-            cs_total = sb_cs[1] or 0
-
-            # of_splits = []
-            of_stats = [row for row in fielding if row[0] == 'OF']
-            non_of_stats = [row for row in fielding if row[0] != 'OF']
-            of_splits = []
-
-            if of_stats:
-                cursor.execute("""
-                    SELECT POS, SUM(PO), SUM(A), SUM(E), SUM(G)
-                    FROM FieldingOFsplit
-                    WHERE playerID = %s AND yearID = %s
-                    GROUP BY POS
-                    HAVING SUM(G) >= 5
-                    ORDER BY SUM(G) DESC
-                """, (playerID, year))
-                of_splits = cursor.fetchall()
-
-            if of_splits:
-                fielding = non_of_stats + of_splits
-            else:
-                fieldimng = non_of_stats + of_stats
-            fielding.sort(key=lambda row: row[4], reverse=True)
+    season = get_player_season_stats(playerID, year)
+    bats, throws = season['bats'], season['throws']
+    batting = season['batting']
+    pitching = season['pitching']
+    fielding = season['fielding']
+    sba_total = season['sb']
+    cs_total = season['cs']
 
     batting_stats = {
         'G': batting[10],
@@ -747,8 +598,8 @@ def rate_player(request, playerID, year, team_name):
         'batting': batting,
         'pitching': pitching,
         'fielding': fielding,
-        'sb': sb_cs[0] or 0,
-        'cs': sb_cs[1] or 0,
+        'sb': sba_total,
+        'cs': cs_total,
         'name_first': name_first,
         'name_last': name_last,
         'greenfield': greenfield_dict,
@@ -9,4 +9,5 @@ admin.site.register(TeamStanding)
 admin.site.register(PlayerStatLine)
 admin.site.register(LineupEntry)
 admin.site.register(Substitution)
-admin.site.register(InningScore)
\ No newline at end of file
+admin.site.register(InningScore)
+admin.site.register(PlayEvent)
@@ -1,5 +1,5 @@
 from django import forms
-from django.forms import modelformset_factory, formset_factory
+from django.forms import modelformset_factory, formset_factory, BaseModelFormSet
 from .models import (
     Competition, Game, LineupEntry, PlayerStatLine,
     Substitution, InningScore, League, Division,
@@ -202,6 +202,29 @@ InningScoreFormSet = modelformset_factory(
     can_delete=False
 )
 
+def parse_innings(raw):
+    """Baseball-format innings ('6.2' = 6 innings, 2 outs) -> total outs."""
+    raw = (raw or '').strip()
+    if not raw:
+        return 0
+    if raw.startswith('.'):
+        raw = '0' + raw
+    try:
+        if '.' in raw:
+            full_str, part_str = raw.split('.')
+            full, part = int(full_str), int(part_str)
+        else:
+            full, part = int(raw), 0
+        if part not in (0, 1, 2):
+            raise ValueError
+        # convert to total outs
+        return full * 3 + part
+    except ValueError:
+        raise forms.ValidationError(
+            "Use baseball format for IP: e.g., 5.2 (5 innings, 2 outs)"
+        )
+
+
 class OffenseForm(forms.Form):
     ab      = forms.IntegerField(min_value=0, required=False, initial=0, label="AB")
     r       = forms.IntegerField(min_value=0, required=False, initial=0, label="R")
@@ -255,25 +278,7 @@ class PitchingForm(forms.Form):
     ibb         = forms.IntegerField(min_value=0, required=False, initial=0, label="IBB")
 
     def clean_ip_outs(self):
-        raw = (self.cleaned_data.get('ip_outs') or '').strip()
-        if not raw:
-            return 0
-        if raw.startswith('.'):
-            raw = '0' + raw
-        try:
-            if '.' in raw:
-                full_str, part_str = raw.split('.')
-                full, part = int(full_str), int(part_str)
-            else:
-                full, part = int(raw), 0
-            if part not in (0, 1, 2):
-                raise ValueError
-            # convert to total outs
-            return full * 3 + part
-        except ValueError:
-            raise forms.ValidationError(
-                "Use baseball format for IP: e.g., 5.2 (5 innings, 2 outs)"
-            )
+        return parse_innings(self.cleaned_data.get('ip_outs'))
 
     def clean_ra(self):
         raw = (self.cleaned_data.get('ra') or '').strip()
@@ -301,4 +306,111 @@ class TeamEntryForm(forms.ModelForm):
         }
         labels = {
             'team': 'Select Team',
-        }
\ No newline at end of file
+        }
+
+
+GRID_FIELDS = [
+    'ab', 'r', 'h', 'doubles', 'triples', 'hr', 'rbi', 'bb', 'so', 'sf', 'hbp', 'sb', 'cs', 'dp',
+    'po', 'a', 'e', 'pb',
+    'ip_outs', 'ra', 'er', 'h_allowed', 'bb_allowed', 'k_thrown', 'hra', 'hb', 'balk', 'wp', 'ibb',
+    'decision',
+]
+
+
+class StatLineGridForm(forms.ModelForm):
+    """One row of the whole-game stat grid."""
+    ip_outs = forms.CharField(required=False, label="IP")
+
+    class Meta:
+        model = PlayerStatLine
+        fields = GRID_FIELDS
+        labels = {
+            'ab': 'AB', 'r': 'R', 'h': 'H', 'doubles': '2B', 'triples': '3B', 'hr': 'HR',
+            'rbi': 'RBI', 'bb': 'BB', 'so': 'SO', 'sf': 'SF', 'hbp': 'HBP', 'sb': 'SB',
+            'cs': 'CS', 'dp': 'DP', 'po': 'PO', 'a': 'A', 'e': 'E', 'pb': 'PB',
+            'ra': 'RA', 'er': 'ER', 'h_allowed': 'H', 'bb_allowed': 'BB', 'k_thrown': 'K',
+            'hra': 'HR', 'hb': 'HB', 'balk': 'BK', 'wp': 'WP', 'ibb': 'IBB', 'decision': 'Dec',
+        }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        outs = self.instance.ip_outs or 0
+        self.initial['ip_outs'] = f"{outs // 3}.{outs % 3}"
+        for name, field in self.fields.items():
+            field.widget.attrs.update({'class': 'form-control form-control-sm', 'style': 'width: 4em;'})
+
+    def clean_ip_outs(self):
+        return parse_innings(self.cleaned_data.get('ip_outs'))
+
+
+class _LoadedRowField(forms.ModelChoiceField):
+    """A formset's hidden id field that resolves against rows already loaded."""
+    def __init__(self, rows, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rows = rows
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.rows[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise forms.ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+
+class BaseStatLineGridFormSet(BaseModelFormSet):
+    """
+    Checks each team's batting runs, and the runs its pitchers allowed,
+    against the line score once inning scores have been entered.
+    """
+    def __init__(self, *args, game=None, inning_runs=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.game = game
+        self.inning_runs = inning_runs or {}
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        # the stock id field runs a query per row to look itself up
+        if not hasattr(self, '_rows'):
+            self._rows = {row.pk: row for row in self.get_queryset()}
+        field = form.fields['id']
+        form.fields['id'] = _LoadedRowField(
+            self._rows, field.queryset, required=False, widget=field.widget, initial=field.initial,
+        )
+
+    def clean(self):
+        super().clean()
+        if any(self.errors) or not self.inning_runs:
+            return
+
+        scored, allowed = {}, {}
+        for form in self.forms:
+            team_id = form.instance.team_id
+            scored[team_id] = scored.get(team_id, 0) + (form.cleaned_data.get('r') or 0)
+            allowed[team_id] = allowed.get(team_id, 0) + (form.cleaned_data.get('ra') or 0)
+
+        sides = (
+            (self.game.away_team, self.game.home_team_id),
+            (self.game.home_team, self.game.away_team_id),
+        )
+        errors = []
+        for team, opponent_id in sides:
+            if team.pk not in scored:  # not on this grid
+                continue
+            runs = self.inning_runs.get(team.pk, 0)
+            if scored[team.pk] != runs:
+                errors.append(f"{team}: batters scored {scored[team.pk]} runs, the line score has {runs}.")
+            runs = self.inning_runs.get(opponent_id, 0)
+            if allowed[team.pk] != runs:
+                errors.append(f"{team}: pitchers allowed {allowed[team.pk]} runs, the line score has {runs}.")
+        if errors:
+            raise forms.ValidationError(errors)
+
+
+StatLineGridFormSet = modelformset_factory(
+    PlayerStatLine,
+    form=StatLineGridForm,
+    formset=BaseStatLineGridFormSet,
+    extra=0,
+    can_delete=False,
+)
@@ -0,0 +1,152 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+# frozen copy of greenfield.utils.season_aggregates as of this migration,
+# so later changes there can't change what this backfills
+OFFENSE = ('ab', 'h', 'doubles', 'triples', 'r', 'rbi', 'bb', 'hbp', 'so', 'sf', 'hr', 'sb', 'cs', 'dp')
+PITCHING = ('ip_outs', 'er', 'h_allowed', 'bb_allowed', 'k_thrown', 'hb', 'hra', 'balk', 'wp', 'ibb')
+FIELDING = ('po', 'a', 'e', 'pb')
+
+PLAYER_FIELDS = ('games', 'pitching_games', 'wins', 'losses', 'saves') + OFFENSE + PITCHING + FIELDING
+TEAM_FIELDS = ('games',) + OFFENSE + PITCHING + FIELDING
+
+
+def backfill(apps, schema_editor):
+    PlayerStatLine = apps.get_model('stats', 'PlayerStatLine')
+    PlayerSeasonAggregate = apps.get_model('stats', 'PlayerSeasonAggregate')
+    TeamSeasonAggregate = apps.get_model('stats', 'TeamSeasonAggregate')
+
+    pitched = Q(ip_outs__gt=0)
+    player_totals = {f: Sum(f) for f in OFFENSE + FIELDING}
+    player_totals.update({f: Sum(f, filter=pitched) for f in PITCHING})
+    player_totals.update(
+        games=Count('game', distinct=True),
+        pitching_games=Count('game', distinct=True, filter=pitched),
+        wins=Count('id', filter=pitched & Q(decision='W')),
+        losses=Count('id', filter=pitched & Q(decision='L')),
+        saves=Count('id', filter=pitched & Q(decision='S')),
+    )
+    team_totals = {f: Sum(f) for f in OFFENSE + PITCHING + FIELDING}
+    team_totals['games'] = Count('game', distinct=True)
+
+    lines = PlayerStatLine.objects.filter(game__status='final')
+    PlayerSeasonAggregate.objects.bulk_create([
+        PlayerSeasonAggregate(
+            competition_id=row['game__competition_id'],
+            player_id=row['player_id'],
+            team_id=row['team_id'],
+            **{f: row[f'total_{f}'] or 0 for f in PLAYER_FIELDS},
+        )
+        for row in lines.values('game__competition_id', 'player_id', 'team_id')
+                        .annotate(**{f'total_{f}': e for f, e in player_totals.items()}).order_by()
+    ], batch_size=1000)
+    TeamSeasonAggregate.objects.bulk_create([
+        TeamSeasonAggregate(
+            competition_id=row['game__competition_id'],
+            team_id=row['team_id'],
+            **{f: row[f'total_{f}'] or 0 for f in TEAM_FIELDS},
+        )
+        for row in lines.values('game__competition_id', 'team_id')
+                        .annotate(**{f'total_{f}': e for f, e in team_totals.items()}).order_by()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0008_careertotals'),
+        ('stats', '0010_playerstatline_threw'),
+        ('teams', '0002_remove_teams_name_teams_first_name_teams_team_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerSeasonAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('games', models.PositiveIntegerField(default=0)),
+                ('ab', models.PositiveIntegerField(default=0)),
+                ('h', models.PositiveIntegerField(default=0)),
+                ('doubles', models.PositiveIntegerField(default=0)),
+                ('triples', models.PositiveIntegerField(default=0)),
+                ('r', models.PositiveIntegerField(default=0)),
+                ('rbi', models.PositiveIntegerField(default=0)),
+                ('bb', models.PositiveIntegerField(default=0)),
+                ('hbp', models.PositiveIntegerField(default=0)),
+                ('so', models.PositiveIntegerField(default=0)),
+                ('sf', models.PositiveIntegerField(default=0)),
+                ('hr', models.PositiveIntegerField(default=0)),
+                ('sb', models.PositiveIntegerField(default=0)),
+                ('cs', models.PositiveIntegerField(default=0)),
+                ('dp', models.PositiveIntegerField(default=0)),
+                ('ip_outs', models.PositiveIntegerField(default=0)),
+                ('er', models.PositiveIntegerField(default=0)),
+                ('h_allowed', models.PositiveIntegerField(default=0)),
+                ('bb_allowed', models.PositiveIntegerField(default=0)),
+                ('k_thrown', models.PositiveIntegerField(default=0)),
+                ('hb', models.PositiveIntegerField(default=0)),
+                ('hra', models.PositiveIntegerField(default=0)),
+                ('balk', models.PositiveIntegerField(default=0)),
+                ('wp', models.PositiveIntegerField(default=0)),
+                ('ibb', models.PositiveIntegerField(default=0)),
+                ('po', models.PositiveIntegerField(default=0)),
+                ('a', models.PositiveIntegerField(default=0)),
+                ('e', models.PositiveIntegerField(default=0)),
+                ('pb', models.PositiveIntegerField(default=0)),
+                ('pitching_games', models.PositiveIntegerField(default=0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('losses', models.PositiveIntegerField(default=0)),
+                ('saves', models.PositiveIntegerField(default=0)),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_aggregates', to='stats.competition')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='players.players')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='teams.teams')),
+            ],
+            options={
+                'unique_together': {('competition', 'player', 'team')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TeamSeasonAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('games', models.PositiveIntegerField(default=0)),
+                ('ab', models.PositiveIntegerField(default=0)),
+                ('h', models.PositiveIntegerField(default=0)),
+                ('doubles', models.PositiveIntegerField(default=0)),
+                ('triples', models.PositiveIntegerField(default=0)),
+                ('r', models.PositiveIntegerField(default=0)),
+                ('rbi', models.PositiveIntegerField(default=0)),
+                ('bb', models.PositiveIntegerField(default=0)),
+                ('hbp', models.PositiveIntegerField(default=0)),
+                ('so', models.PositiveIntegerField(default=0)),
+                ('sf', models.PositiveIntegerField(default=0)),
+                ('hr', models.PositiveIntegerField(default=0)),
+                ('sb', models.PositiveIntegerField(default=0)),
+                ('cs', models.PositiveIntegerField(default=0)),
+                ('dp', models.PositiveIntegerField(default=0)),
+                ('ip_outs', models.PositiveIntegerField(default=0)),
+                ('er', models.PositiveIntegerField(default=0)),
+                ('h_allowed', models.PositiveIntegerField(default=0)),
+                ('bb_allowed', models.PositiveIntegerField(default=0)),
+                ('k_thrown', models.PositiveIntegerField(default=0)),
+                ('hb', models.PositiveIntegerField(default=0)),
+                ('hra', models.PositiveIntegerField(default=0)),
+                ('balk', models.PositiveIntegerField(default=0)),
+                ('wp', models.PositiveIntegerField(default=0)),
+                ('ibb', models.PositiveIntegerField(default=0)),
+                ('po', models.PositiveIntegerField(default=0)),
+                ('a', models.PositiveIntegerField(default=0)),
+                ('e', models.PositiveIntegerField(default=0)),
+                ('pb', models.PositiveIntegerField(default=0)),
+                ('competition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='team_aggregates', to='stats.competition')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='teams.teams')),
+            ],
+            options={
+                'unique_together': {('competition', 'team')},
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
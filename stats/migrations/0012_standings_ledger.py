@@ -0,0 +1,150 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:40
+
+import django.db.models.deletion
+from collections import defaultdict, deque
+from django.db import migrations, models
+
+# frozen copy of the ledger in greenfield.utils.standings as of this
+# migration, so later changes there can't change what this backfills
+RESULT_FIELDS = {'W': 'wins', 'L': 'losses', 'T': 'ties'}
+
+
+def _ledger_fields(results):
+    """TeamStanding field values from a team's (side, scored, allowed) in the order played."""
+    totals = defaultdict(int)
+    last10 = deque(maxlen=10)
+    streak_result, streak_length = None, 0
+    for side, scored, allowed in results:
+        result = 'W' if scored > allowed else 'L' if scored < allowed else 'T'
+        field = RESULT_FIELDS[result]
+        totals[field] += 1
+        totals[f'{side}_{field}'] += 1
+        totals['runs_scored'] += scored
+        totals['runs_allowed'] += allowed
+        last10.append(result)
+        if result == streak_result:
+            streak_length += 1
+        else:
+            streak_result, streak_length = result, 1
+
+    fields = dict(totals)
+    for result, field in RESULT_FIELDS.items():
+        fields[f'last10_{field}'] = last10.count(result)
+    fields['streak'] = f'{streak_result}{streak_length}' if streak_result else ''
+    return fields
+
+
+def backfill(apps, schema_editor):
+    Competition = apps.get_model('stats', 'Competition')
+    Game = apps.get_model('stats', 'Game')
+    TeamEntry = apps.get_model('stats', 'TeamEntry')
+    TeamStanding = apps.get_model('stats', 'TeamStanding')
+
+    for competition_id in Competition.objects.values_list('id', flat=True):
+        results = defaultdict(list)
+        for home_id, away_id, home_score, away_score in (
+            Game.objects.filter(competition_id=competition_id, status='final')
+            .order_by('date_played', 'id')
+            .values_list('home_team_id', 'away_team_id', 'home_score', 'away_score')
+        ):
+            results[home_id].append(('home', home_score, away_score))
+            results[away_id].append(('away', away_score, home_score))
+
+        # a team can be entered more than once; the most specific entry places it
+        placement = {}
+        for team_id, league_id, division_id in (
+            TeamEntry.objects.filter(competition_id=competition_id)
+            .values_list('team_id', 'league_id', 'division_id')
+        ):
+            placement[team_id] = max(
+                placement.get(team_id, (None, None)), (league_id, division_id),
+                key=lambda entry: (entry[1] is not None, entry[0] is not None),
+            )
+
+        TeamStanding.objects.filter(competition_id=competition_id).delete()
+        TeamStanding.objects.bulk_create([
+            TeamStanding(
+                competition_id=competition_id,
+                team_id=team_id,
+                league_id=placement.get(team_id, (None, None))[0],
+                division_id=placement.get(team_id, (None, None))[1],
+                **(_ledger_fields(results[team_id]) if team_id in results else {}),
+            )
+            for team_id in placement.keys() | results.keys()
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0011_season_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teamstanding',
+            name='away_losses',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='away_ties',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='away_wins',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='home_losses',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='home_ties',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='home_wins',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='last10_losses',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='last10_ties',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='last10_wins',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='league',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='stats.league'),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='runs_allowed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='runs_scored',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='teamstanding',
+            name='streak',
+            field=models.CharField(blank=True, max_length=5),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:44
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def drop_duplicate_statlines(apps, schema_editor):
+    # get_or_create raised on these anyway; keep the first line of each set
+    PlayerStatLine = apps.get_model('stats', 'PlayerStatLine')
+    dupes = (
+        PlayerStatLine.objects.values('game_id', 'player_id', 'team_id')
+        .annotate(n=Count('id'), keep=Min('id'))
+        .filter(n__gt=1)
+    )
+    for dupe in dupes:
+        PlayerStatLine.objects.filter(
+            game_id=dupe['game_id'], player_id=dupe['player_id'], team_id=dupe['team_id']
+        ).exclude(pk=dupe['keep']).delete()
+
+
+def seed_draft_games(apps, schema_editor):
+    # the overview used to seed lines on first view; do it for games still in progress
+    # frozen copy of greenfield.utils.game_setup.seed_statlines as of this migration
+    Game = apps.get_model('stats', 'Game')
+    LineupEntry = apps.get_model('stats', 'LineupEntry')
+    Substitution = apps.get_model('stats', 'Substitution')
+    PlayerStatLine = apps.get_model('stats', 'PlayerStatLine')
+    for game_id in Game.objects.exclude(status='final').values_list('id', flat=True):
+        # lineup positions win over substitution positions
+        positions = {}
+        for team_id, player_id, position in (
+            Substitution.objects.filter(game_id=game_id).order_by('-inning')
+            .values_list('team_id', 'player_in_id', 'position')
+        ):
+            positions[(team_id, player_id)] = position
+        for team_id, player_id, position in (
+            LineupEntry.objects.filter(game_id=game_id).values_list('team_id', 'player_id', 'fielding_position')
+        ):
+            positions[(team_id, player_id)] = position
+
+        PlayerStatLine.objects.bulk_create(
+            [
+                PlayerStatLine(game_id=game_id, team_id=team_id, player_id=player_id, position=position)
+                for (team_id, player_id), position in positions.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0008_careertotals'),
+        ('stats', '0012_standings_ledger'),
+        ('teams', '0002_remove_teams_name_teams_first_name_teams_team_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_statlines, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='playerstatline',
+            unique_together={('game', 'player', 'team')},
+        ),
+        migrations.RunPython(seed_draft_games, migrations.RunPython.noop),
+    ]
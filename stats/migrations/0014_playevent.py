@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0008_careertotals'),
+        ('stats', '0013_statline_unique_seed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveSmallIntegerField()),
+                ('inning', models.PositiveSmallIntegerField()),
+                ('half', models.PositiveSmallIntegerField(choices=[(0, 'Top'), (1, 'Bottom')])),
+                ('dice', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('result', models.PositiveSmallIntegerField(choices=[(1, '1B'), (2, '2B'), (3, '3B'), (4, 'HR'), (5, 'BB'), (6, 'IBB'), (7, 'HBP'), (8, 'K'), (9, 'GO'), (10, 'FO'), (11, 'GDP'), (12, 'FC'), (13, 'SF'), (14, 'SH'), (15, 'E'), (16, 'SB'), (17, 'CS'), (18, 'WP'), (19, 'PB'), (20, 'BK')])),
+                ('outs', models.PositiveSmallIntegerField(default=0)),
+                ('runners', models.PositiveSmallIntegerField(default=0)),
+                ('scored', models.PositiveSmallIntegerField(default=0)),
+                ('rbi', models.PositiveSmallIntegerField(default=0)),
+                ('unearned', models.PositiveSmallIntegerField(default=0)),
+                ('batter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batting_events', to='players.players')),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='stats.game')),
+                ('pitcher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pitching_events', to='players.players')),
+            ],
+            options={
+                'ordering': ['game', 'seq'],
+                'unique_together': {('game', 'seq')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0014_playevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='seed',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
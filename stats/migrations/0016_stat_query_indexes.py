@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0010_search_indexes'),
+        ('stats', '0015_game_seed'),
+        ('teams', '0002_remove_teams_name_teams_first_name_teams_team_name'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['competition', 'status', 'date_played'], name='game_comp_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['competition', 'date_played'], name='game_comp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playerstatline',
+            index=models.Index(condition=models.Q(('ip_outs__gt', 0)), fields=['player'], include=('ip_outs',), name='statline_pitched_idx'),
+        ),
+    ]
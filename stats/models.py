@@ -124,20 +124,50 @@ class Game(models.Model):
         ('final', 'FInal')
     ]
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
+    # RNG seed of a simulated game; simulate it again with this to replay it
+    seed = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # standings and aggregates: a competition's final games in date order
+            models.Index(fields=['competition', 'status', 'date_played'], name='game_comp_status_date_idx'),
+            # the schedule page and replay_game
+            models.Index(fields=['competition', 'date_played'], name='game_comp_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.date_played}: {self.away_team} @ {self.home_team})"
 
 
 class TeamStanding(models.Model):
+    """
+    A team's record in a competition over its finalized games, rebuilt by
+    greenfield.utils.standings whenever a game is finalized.
+    """
     competition = models.ForeignKey(Competition, on_delete=models.CASCADE)
     team = models.ForeignKey('teams.Teams', on_delete=models.CASCADE)
+    league = models.ForeignKey(League, on_delete=models.SET_NULL, null=True, blank=True)
     division = models.ForeignKey(Division, on_delete=models.SET_NULL, null=True, blank=True)
-    
+
     wins = models.PositiveSmallIntegerField(default=0)
     losses = models.PositiveSmallIntegerField(default=0)
     ties = models.PositiveSmallIntegerField(default=0)
 
+    runs_scored = models.PositiveIntegerField(default=0)
+    runs_allowed = models.PositiveIntegerField(default=0)
+
+    home_wins = models.PositiveSmallIntegerField(default=0)
+    home_losses = models.PositiveSmallIntegerField(default=0)
+    home_ties = models.PositiveSmallIntegerField(default=0)
+    away_wins = models.PositiveSmallIntegerField(default=0)
+    away_losses = models.PositiveSmallIntegerField(default=0)
+    away_ties = models.PositiveSmallIntegerField(default=0)
+
+    last10_wins = models.PositiveSmallIntegerField(default=0)
+    last10_losses = models.PositiveSmallIntegerField(default=0)
+    last10_ties = models.PositiveSmallIntegerField(default=0)
+    streak = models.CharField(max_length=5, blank=True)  # e.g. W3, L1
+
     class Meta:
         unique_together = ('competition', 'team')
 
@@ -197,6 +227,16 @@ class PlayerStatLine(models.Model):
     pb = models.PositiveSmallIntegerField(default=0)
     position = models.CharField(max_length=3)  # e.g., SS, C, RF
 
+    class Meta:
+        unique_together = ('game', 'player', 'team')
+        indexes = [
+            # games_pitched and pitching totals: only the lines with outs recorded
+            models.Index(
+                fields=['player'], include=['ip_outs'], condition=models.Q(ip_outs__gt=0),
+                name='statline_pitched_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.player} - {self.game}"
 
@@ -245,4 +285,122 @@ class InningScore(models.Model):
         unique_together = ('game', 'team', 'inning')
 
     def __str__(self):
-        return f"{self.team} - Inning {self.inning}: {self.runs} runs"
\ No newline at end of file
+        return f"{self.team} - Inning {self.inning}: {self.runs} runs"
+
+# Result codes for PlayEvent.result
+PLAY_RESULTS = [
+    (1, '1B'), (2, '2B'), (3, '3B'), (4, 'HR'),
+    (5, 'BB'), (6, 'IBB'), (7, 'HBP'), (8, 'K'),
+    (9, 'GO'), (10, 'FO'), (11, 'GDP'), (12, 'FC'), (13, 'SF'), (14, 'SH'), (15, 'E'),
+    # base-running plays, no plate appearance
+    (16, 'SB'), (17, 'CS'), (18, 'WP'), (19, 'PB'), (20, 'BK'),
+]
+
+
+class PlayEvent(models.Model):
+    """
+    One roll of the dice: a plate appearance or a base-running play. A
+    game's stat lines, line score and decisions can be rebuilt from its
+    events (greenfield/utils/play_log.py).
+
+    runners is the bases occupied after the play (1 = first, 2 = second,
+    4 = third); scored is who crossed the plate (1 = batter, 2/4/8 = the
+    runner who was on first/second/third before the play).
+    """
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='events')
+    seq = models.PositiveSmallIntegerField()  # order within the game
+    inning = models.PositiveSmallIntegerField()
+    half = models.PositiveSmallIntegerField(choices=[(0, 'Top'), (1, 'Bottom')])
+    batter = models.ForeignKey('players.Players', on_delete=models.CASCADE, related_name='batting_events')
+    pitcher = models.ForeignKey('players.Players', on_delete=models.CASCADE, related_name='pitching_events')
+    dice = models.PositiveSmallIntegerField(null=True, blank=True)  # e.g. 36
+    result = models.PositiveSmallIntegerField(choices=PLAY_RESULTS)
+    outs = models.PositiveSmallIntegerField(default=0)  # outs made on the play
+    runners = models.PositiveSmallIntegerField(default=0)
+    scored = models.PositiveSmallIntegerField(default=0)
+    rbi = models.PositiveSmallIntegerField(default=0)
+    unearned = models.PositiveSmallIntegerField(default=0)  # runs on the play that aren't earned
+
+    class Meta:
+        unique_together = ('game', 'seq')
+        ordering = ['game', 'seq']
+
+    def __str__(self):
+        return f"{self.game} #{self.seq}: {self.get_result_display()}"
+
+
+class SeasonTotals(models.Model):
+    """Counting stats shared by the season aggregates below."""
+    games = models.PositiveIntegerField(default=0)
+
+    # Offense
+    ab = models.PositiveIntegerField(default=0)
+    h = models.PositiveIntegerField(default=0)
+    doubles = models.PositiveIntegerField(default=0)
+    triples = models.PositiveIntegerField(default=0)
+    r = models.PositiveIntegerField(default=0)
+    rbi = models.PositiveIntegerField(default=0)
+    bb = models.PositiveIntegerField(default=0)
+    hbp = models.PositiveIntegerField(default=0)
+    so = models.PositiveIntegerField(default=0)
+    sf = models.PositiveIntegerField(default=0)
+    hr = models.PositiveIntegerField(default=0)
+    sb = models.PositiveIntegerField(default=0)
+    cs = models.PositiveIntegerField(default=0)
+    dp = models.PositiveIntegerField(default=0)
+
+    # Pitching
+    ip_outs = models.PositiveIntegerField(default=0)
+    er = models.PositiveIntegerField(default=0)
+    h_allowed = models.PositiveIntegerField(default=0)
+    bb_allowed = models.PositiveIntegerField(default=0)
+    k_thrown = models.PositiveIntegerField(default=0)
+    hb = models.PositiveIntegerField(default=0)
+    hra = models.PositiveIntegerField(default=0)
+    balk = models.PositiveIntegerField(default=0)
+    wp = models.PositiveIntegerField(default=0)
+    ibb = models.PositiveIntegerField(default=0)
+
+    # Fielding
+    po = models.PositiveIntegerField(default=0)
+    a = models.PositiveIntegerField(default=0)
+    e = models.PositiveIntegerField(default=0)
+    pb = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class PlayerSeasonAggregate(SeasonTotals):
+    """
+    A player's PlayerStatLine totals for one team in one competition, over
+    finalized games. Added to when a game is finalized; rebuilt from
+    scratch by manage.py rebuild_season_aggregates. Pitching totals only
+    count lines where the player recorded an out, as the stats page does.
+    """
+    competition = models.ForeignKey(Competition, on_delete=models.CASCADE, related_name='player_aggregates')
+    player = models.ForeignKey('players.Players', on_delete=models.CASCADE)
+    team = models.ForeignKey('teams.Teams', on_delete=models.CASCADE)
+
+    pitching_games = models.PositiveIntegerField(default=0)
+    wins = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    saves = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('competition', 'player', 'team')
+
+    def __str__(self):
+        return f"{self.player} - {self.team} ({self.competition})"
+
+
+class TeamSeasonAggregate(SeasonTotals):
+    """A team's PlayerStatLine totals in one competition, over finalized games."""
+    competition = models.ForeignKey(Competition, on_delete=models.CASCADE, related_name='team_aggregates')
+    team = models.ForeignKey('teams.Teams', on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ('competition', 'team')
+
+    def __str__(self):
+        return f"{self.team} ({self.competition})"
@@ -0,0 +1,59 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from greenfield.utils.standings import refresh_standings, invalidate_standings
+from greenfield.utils.boxscore import invalidate_boxscore
+from .models import (
+    Competition, Game, TeamEntry, PlayerStatLine, LineupEntry, Substitution, InningScore
+)
+
+
+def _refresh_after_delete(competition_id):
+    # the delete may be a cascade from the competition itself
+    def refresh():
+        if Competition.objects.filter(pk=competition_id).exists():
+            refresh_standings(competition_id)
+
+    transaction.on_commit(refresh)
+    invalidate_standings(competition_id)
+
+
+@receiver(post_save, sender=Game)
+def game_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # only finalized games count; this also catches score edits after the fact
+    if instance.status == 'final':
+        refresh_standings(instance.competition_id)
+    invalidate_standings(instance.competition_id)
+    invalidate_boxscore(instance.pk)
+
+
+@receiver(post_save, sender=TeamEntry)
+def team_entry_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # teams are placed into leagues/divisions from their entries
+    refresh_standings(instance.competition_id)
+    invalidate_standings(instance.competition_id)
+
+
+@receiver(post_delete, sender=Game)
+def game_deleted(sender, instance, **kwargs):
+    _refresh_after_delete(instance.competition_id)
+    invalidate_boxscore(instance.pk)
+
+
+@receiver(post_delete, sender=TeamEntry)
+def team_entry_deleted(sender, instance, **kwargs):
+    _refresh_after_delete(instance.competition_id)
+
+
+@receiver([post_save, post_delete], sender=PlayerStatLine)
+@receiver([post_save, post_delete], sender=LineupEntry)
+@receiver([post_save, post_delete], sender=Substitution)
+@receiver([post_save, post_delete], sender=InningScore)
+def game_detail_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_boxscore(instance.game_id)
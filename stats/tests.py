@@ -1,3 +1,167 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from greenfield.utils.play_log import CODES, pitching_decisions, reduce_events
+from greenfield.utils.season_sim import playoff_teams
+from greenfield.utils.standings import team_placements
+
+AWAY, HOME = 100, 200
+
+
+class PlayLog:
+    """Builds EVENT_FIELDS tuples for reduce_events."""
+
+    def __init__(self):
+        self.events = []
+
+    def play(self, inning, half, batter, pitcher, result,
+             outs=0, runners=0, scored=0, rbi=0, unearned=0):
+        self.events.append((inning, half, batter, pitcher, CODES[result],
+                            outs, runners, scored, rbi, unearned))
+
+    def three_up(self, inning, half, batter, pitcher):
+        for result in ('GO', 'FO', 'K'):
+            self.play(inning, half, batter, pitcher, result, outs=1)
+
+    def reduce(self):
+        return reduce_events(self.events, AWAY, HOME)
+
+
+class ReduceEventsTests(SimpleTestCase):
+    # away batters are 1-4 and pitchers 9, 8; home batters 11-14 and pitchers 19, 18
+
+    def test_runners_advance_and_get_credit(self):
+        log = PlayLog()
+        log.play(1, 0, 1, 19, '1B', runners=1)
+        log.play(1, 0, 2, 19, '2B', runners=2 | 4)                  # 1 to third
+        log.play(1, 0, 3, 19, '1B', runners=1 | 4, scored=8, rbi=1)  # 1 scores, 2 to third
+        log.play(1, 0, 4, 19, 'SF', outs=1, runners=1, scored=8, rbi=1)
+        lines = log.reduce()['lines']
+
+        self.assertEqual(lines[(1, AWAY)]['r'], 1)
+        self.assertEqual(lines[(2, AWAY)]['r'], 1)
+        self.assertEqual(lines[(2, AWAY)]['doubles'], 1)
+        self.assertEqual((lines[(3, AWAY)]['rbi'], lines[(3, AWAY)]['r']), (1, 0))
+        self.assertEqual((lines[(4, AWAY)]['ab'], lines[(4, AWAY)]['sf'], lines[(4, AWAY)]['rbi']), (0, 1, 1))
+        pitcher = lines[(19, HOME)]
+        self.assertEqual((pitcher['h_allowed'], pitcher['ra'], pitcher['er'], pitcher['ip_outs']), (3, 2, 2, 1))
+
+    def test_runner_on_base_nobody_put_there(self):
+        log = PlayLog()
+        log.play(1, 0, 1, 19, '1B', runners=1, scored=8)
+        with self.assertRaises(ValueError):
+            log.reduce()
+
+    def test_runs_after_an_error_are_unearned(self):
+        log = PlayLog()
+        log.play(1, 1, 11, 9, 'E', runners=1)
+        log.play(1, 1, 12, 9, 'HR', scored=1 | 2, rbi=2, unearned=1)
+        lines = log.reduce()['lines']
+
+        self.assertEqual((lines[(11, HOME)]['ab'], lines[(11, HOME)]['h'], lines[(11, HOME)]['r']), (1, 0, 1))
+        self.assertEqual((lines[(9, AWAY)]['ra'], lines[(9, AWAY)]['er']), (2, 1))
+
+    def test_walk_off(self):
+        log = PlayLog()
+        log.play(1, 0, 1, 19, 'HR', scored=1, rbi=1)
+        log.three_up(1, 0, 2, 19)
+        for inning in range(1, 9):
+            if inning > 1:
+                log.three_up(inning, 0, 2, 19 if inning < 7 else 18)
+            if inning == 5:
+                log.play(5, 1, 11, 9, 'HR', scored=1, rbi=1)
+            log.three_up(inning, 1, 12, 9)
+        log.three_up(9, 0, 2, 18)
+        log.play(9, 1, 11, 8, 'BB', runners=1)
+        log.play(9, 1, 12, 8, '2B', runners=2, scored=2, rbi=1)
+        result = log.reduce()
+        lines = result['lines']
+
+        self.assertEqual((result['away_score'], result['home_score']), (1, 2))
+        self.assertEqual(result['innings'][(HOME, 9)], 1)
+        self.assertEqual(lines[(18, HOME)]['decision'], 'W')   # pitcher of record when home took the lead
+        self.assertEqual(lines[(8, AWAY)]['decision'], 'L')
+        self.assertEqual(lines[(19, HOME)]['decision'], '')
+        self.assertEqual(lines[(11, HOME)]['r'], 2)
+
+    def test_tie_has_no_decisions(self):
+        log = PlayLog()
+        log.play(1, 0, 1, 19, 'HR', scored=1, rbi=1)
+        log.three_up(1, 0, 2, 19)
+        log.play(1, 1, 11, 9, 'HR', scored=1, rbi=1)
+        log.three_up(1, 1, 12, 9)
+        result = log.reduce()
+
+        self.assertEqual((result['away_score'], result['home_score']), (1, 1))
+        self.assertFalse(any(line['decision'] for line in result['lines'].values()))
+
+    def test_short_starter_gives_the_win_to_a_reliever(self):
+        log = PlayLog()
+        log.play(1, 0, 1, 19, 'HR', scored=1, rbi=1)
+        for inning in range(1, 10):
+            log.three_up(inning, 0, 2, 19)
+            if inning < 9:
+                # 9 goes four innings, 8 the last four
+                log.three_up(inning, 1, 11, 9 if inning <= 4 else 8)
+        lines = log.reduce()['lines']
+
+        self.assertEqual(lines[(9, AWAY)]['ip_outs'], 12)
+        self.assertEqual(lines[(9, AWAY)]['decision'], '')
+        self.assertEqual(lines[(8, AWAY)]['decision'], 'W')
+        self.assertEqual(lines[(19, HOME)]['decision'], 'L')
+
+
+class PitchingDecisionTests(SimpleTestCase):
+
+    def decide(self, closer_margin, closer_outs):
+        """Away wins 5-2 behind starter 9; 8 and then closer 7 finish it."""
+        outs = {9: 18, 8: 3, 7: closer_outs, 19: 27}
+        return pitching_decisions(
+            {AWAY: 5, HOME: 2},
+            {AWAY: [9, 8, 7], HOME: [19]},
+            {(9, AWAY): 0, (8, AWAY): 3, (7, AWAY): closer_margin, (19, HOME): 0},
+            [(AWAY, 9, 19)],
+            lambda pitcher, team_id: outs[pitcher],
+        )
+
+    def test_win_and_loss(self):
+        decisions = self.decide(3, 3)
+        self.assertEqual(decisions[(9, AWAY)], 'W')
+        self.assertEqual(decisions[(19, HOME)], 'L')
+
+    def test_save_with_a_lead_of_three_or_less(self):
+        self.assertEqual(self.decide(3, 3).get((7, AWAY)), 'S')
+        self.assertEqual(self.decide(1, 1).get((7, AWAY)), 'S')
+
+    def test_no_save_with_a_bigger_lead_unless_three_innings(self):
+        self.assertIsNone(self.decide(4, 3).get((7, AWAY)))
+        self.assertEqual(self.decide(4, 9).get((7, AWAY)), 'S')
+
+    def test_no_save_entering_tied_or_behind(self):
+        self.assertIsNone(self.decide(0, 3).get((7, AWAY)))
+        self.assertIsNone(self.decide(-1, 3).get((7, AWAY)))
+
+    def test_tie_has_no_decisions(self):
+        self.assertEqual(
+            pitching_decisions({AWAY: 2, HOME: 2}, {AWAY: [9], HOME: [19]}, {}, [], lambda p, t: 27),
+            {},
+        )
+
+
+class PlayoffTeamsTests(SimpleTestCase):
+    # one league (1) of two divisions: 10 holds teams 1 and 2, 20 holds 3 and 4
+    RECORDS = {1: (100, 62, 0, 50), 2: (95, 67, 0, 40), 3: (90, 72, 0, 30), 4: (60, 102, 0, -80)}
+
+    def test_one_placement_per_team(self):
+        entries = [(1, 1, 10), (2, 1, 10), (3, 1, 20), (4, 1, 20)]
+        # entered in the league as well as in a division
+        entries += [(team_id, 1, None) for team_id in range(1, 5)]
+        placements = team_placements(entries)
+
+        self.assertEqual(placements, {1: (1, 10), 2: (1, 10), 3: (1, 20), 4: (1, 20)})
+        winners, playoffs = playoff_teams(self.RECORDS, placements, 3)
+        self.assertEqual(winners, {1, 3})
+        self.assertEqual(playoffs, {1, 2, 3})
+
+    def test_division_winners_get_in_past_spots(self):
+        placements = {1: (1, 10), 2: (1, 10), 3: (1, 20), 4: (1, 20)}
+        self.assertEqual(playoff_teams(self.RECORDS, placements, 1), ({1, 3}, {1, 3}))
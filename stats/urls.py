@@ -40,6 +40,7 @@ urlpatterns = [
         views.stats_overview,
         name='enter-stats'
         ),
+    path('games/<int:game_id>/statlines/grid/', views.enter_game_stats, name='enter-game-stats'),
     path(
         'games/<int:game_id>/statlines/<int:player_id>/',
         views.enter_player_stats,
@@ -55,6 +56,7 @@ urlpatterns = [
     path('competitions/leaders/', views.competition_leaders_view, name='competition-leaders'),
     path('competitions/standings/', views.competition_standings_view, name='competition-standings'),
     path('competitions/<int:competition_id>/games/', views.competition_games_view, name='competition-games'),
+    path('competitions/<int:pk>/export/', views.competition_export_view, name='competition-export'),
     path('competitions/<int:pk>/teams/json/', views.competition_teams_json, name='competition-teams-json'),
     path('competitions/<int:pk>/standings/',
      views.StandingsView.as_view(),
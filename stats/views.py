@@ -5,26 +5,52 @@ from django.views.generic import ListView, CreateView, FormView, DetailView
 from django.views import View
 from django.urls import reverse_lazy, reverse
 from django.forms import formset_factory
+from django.conf import settings
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.db.models import (
-    Q, Sum, F, Count, Value, FloatField, ExpressionWrapper,
-    Case, When, IntegerField, When
+    Q, Sum, F, Value, FloatField, ExpressionWrapper, Case, When
     )
+from django.db import transaction
 from django.db.models.functions import Concat
 from urllib.parse import urlencode
 from .models import (
     Competition, Game, LineupEntry, PlayerStatLine, InningScore,
-    Substitution, League, Division, TeamEntry, TeamStanding
+    Substitution, League, Division, TeamEntry,
+    PlayerSeasonAggregate, TeamSeasonAggregate
     )
 from players.models import Players
 from teams.models import Teams
+from greenfield.utils.season_aggregates import add_final_game
+from greenfield.utils.standings import get_competition_standings
+from greenfield.utils.leaders import competition_leaders
+from greenfield.utils.boxscore import get_boxscore
+from greenfield.utils.game_setup import starting_lineup, create_lineups, seed_statlines
+from greenfield.utils.league_export import (
+    competition_team_serials, iter_league_zip, safe_filename
+    )
 from .forms import (
     CompetitionForm, GameForm, LineupEntryForm, SubstitutionForm,
     InningScoreForm, OffenseForm, DefenseForm, PitchingForm,
     InningScoreFormSet, CompetitionSelectForm, LeagueCountForm,
-    LeagueForm, DivisionForm, DivisionCountForm, TeamEntryForm
+    LeagueForm, DivisionForm, DivisionCountForm, TeamEntryForm,
+    StatLineGridFormSet, GRID_FIELDS
+    )
+
+
+def competition_export_view(request, pk):
+    """
+    Every team's card PDF and CSVs in one streamed ZIP, rendered in this
+    process (the PDFs mostly come from the card cache). The process pool
+    is only for the export_league_cards command.
+    """
+    comp = get_object_or_404(Competition, pk=pk)
+    response = StreamingHttpResponse(
+        iter_league_zip(competition_team_serials(comp), workers=1),
+        content_type='application/zip'
     )
+    response['Content-Disposition'] = f'attachment; filename="{safe_filename(comp.name)}_cards.zip"'
+    return response
 
 
 def competition_teams_json(request, pk):
@@ -230,14 +256,17 @@ def delete_game_view(request, game_id):
 
 
 def finalize_game_view(request, game_id):
-    game = get_object_or_404(Game, pk=game_id)
+    with transaction.atomic():
+        # lock the row so a double submit can't count the game twice
+        game = get_object_or_404(Game.objects.select_for_update(), pk=game_id)
 
-    if game.status == 'final':
-        messages.info(request, "This game is already finalized.")
-    else:
-        game.status = 'final'
-        game.save()
-        messages.success(request, "Game finalized and locked.")
+        if game.status == 'final':
+            messages.info(request, "This game is already finalized.")
+        else:
+            game.status = 'final'
+            game.save()
+            add_final_game(game)
+            messages.success(request, "Game finalized and locked.")
 
     return redirect('stats:game-select')
 
@@ -266,43 +295,10 @@ def enter_lineups_view(request, game_id):
         away_form = LineupEntryForm(request.POST, team=game.away_team, prefix='away')
 
         if home_form.is_valid() and away_form.is_valid():
-            # Create batting order entries (1–9)
-            for i in range(1, 10):
-                LineupEntry.objects.create(
-                    game=game,
-                    team=game.home_team,
-                    player=home_form.cleaned_data[f'player_{i}'],
-                    batting_order=i,
-                    fielding_position=home_form.cleaned_data[f'position_{i}'],
-                    is_starting=True
-                )
-                LineupEntry.objects.create(
-                    game=game,
-                    team=game.away_team,
-                    player=away_form.cleaned_data[f'player_{i}'],
-                    batting_order=i,
-                    fielding_position=away_form.cleaned_data[f'position_{i}'],
-                    is_starting=True
-                )
-
-            # Create starting pitcher entries (batting_order can be None or 0)
-            LineupEntry.objects.create(
-                game=game,
-                team=game.home_team,
-                player=home_form.cleaned_data['starting_pitcher'],
-                batting_order=None,
-                fielding_position='P',
-                is_starting=True
-            )
-            LineupEntry.objects.create(
-                game=game,
-                team=game.away_team,
-                player=away_form.cleaned_data['starting_pitcher'],
-                batting_order=None,
-                fielding_position='P',
-                is_starting=True
-            )
-
+            create_lineups(game, (
+                starting_lineup(game, game.home_team, home_form.cleaned_data) +
+                starting_lineup(game, game.away_team, away_form.cleaned_data)
+            ))
             return redirect('stats:game-select')
     else:
         home_form = LineupEntryForm(team=game.home_team, prefix='home')
@@ -329,6 +325,10 @@ def enter_lineups_view(request, game_id):
 
 def enter_player_stats(request, game_id, player_id):
     game = get_object_or_404(Game, pk=game_id)
+    if game.status == 'final':
+        # its lines are already counted in the season aggregates
+        messages.error(request, "This game is finalized and cannot be edited.")
+        return redirect('stats:game-select')
 
     statline, created = PlayerStatLine.objects.get_or_create(
         game=game,
@@ -347,6 +347,14 @@ def enter_player_stats(request, game_id, player_id):
         }
     )
 
+    # everyone's ids, in page order, for the "next" button
+    all_ids = list(
+        PlayerStatLine.objects
+          .filter(game=game)
+          .values_list('player_id', flat=True)
+    )
+    idx = all_ids.index(player_id)
+
     # build the “initial” dicts from whatever’s in the DB now
     off_init = { f: getattr(statline, f) for f in OffenseForm.base_fields }
     def_init = { f: getattr(statline, f) for f in DefenseForm.base_fields }
@@ -387,13 +395,6 @@ def enter_player_stats(request, game_id, player_id):
             statline.save()
 
             # decide where to go next
-            all_ids = list(
-                PlayerStatLine.objects
-                  .filter(game=game)
-                  .values_list('player_id', flat=True)
-            )
-            idx = all_ids.index(player_id)
-
             if 'next' in request.POST and idx < len(all_ids) - 1:
                 # go to the next player's page
                 return redirect(
@@ -413,13 +414,6 @@ def enter_player_stats(request, game_id, player_id):
            if (statline.threw or statline.position.upper()=='P') else None
         )
 
-    # compute whether there *is* a “next” player
-    all_ids = list(
-        PlayerStatLine.objects
-          .filter(game=game)
-          .values_list('player_id', flat=True)
-    )
-    idx = all_ids.index(player_id)
     next_exists = (idx < len(all_ids) - 1)
 
     return render(request, 'stats/enter_player.html', {
@@ -432,8 +426,55 @@ def enter_player_stats(request, game_id, player_id):
     })
 
 
+def enter_game_stats(request, game_id):
+    """
+    Every stat line of the game (or one side, with ?team=home/away) in a
+    single grid, saved with one bulk_update.
+    """
+    game = get_object_or_404(Game.objects.select_related('home_team', 'away_team'), pk=game_id)
+    if game.status == 'final':
+        messages.error(request, "This game is finalized and cannot be edited.")
+        return redirect('stats:game-select')
+
+    lines = (
+        PlayerStatLine.objects.filter(game=game)
+        .select_related('player', 'team')
+        .order_by(Case(When(team_id=game.away_team_id, then=0), default=1), 'id')
+    )
+    side = request.GET.get('team')
+    if side in ('home', 'away'):
+        lines = lines.filter(team_id=getattr(game, f'{side}_team_id'))
+
+    if request.method == 'POST':
+        inning_runs = dict(
+            InningScore.objects.filter(game=game)
+            .values('team_id').annotate(runs=Sum('runs'))
+            .values_list('team_id', 'runs')
+        )
+        formset = StatLineGridFormSet(request.POST, queryset=lines, game=game, inning_runs=inning_runs)
+        if formset.is_valid():
+            changed = formset.save(commit=False)
+            for line in changed:
+                line.threw = line.ip_outs > 0
+            with transaction.atomic():
+                PlayerStatLine.objects.bulk_update(changed, GRID_FIELDS + ['threw'])
+            messages.success(request, f"Saved {len(changed)} stat lines.")
+            return redirect('stats:enter-stats', game.pk)
+    else:
+        formset = StatLineGridFormSet(queryset=lines, game=game)
+
+    return render(request, 'stats/enter_game_stats.html', {
+        'game': game,
+        'formset': formset,
+        'side': side,
+    })
+
+
 def enter_substitutions(request, game_id):
     game = get_object_or_404(Game, id=game_id)
+    if game.status == 'final':
+        messages.error(request, "This game is finalized and cannot be edited.")
+        return redirect('stats:game-select')
 
     # Determine which team we’re subbing for — can pass in via query param
     team_side = request.GET.get('team')  # 'home' or 'away'
@@ -451,7 +492,9 @@ def enter_substitutions(request, game_id):
             substitution = form.save(commit=False)
             substitution.game = game
             substitution.team = team
-            substitution.save()
+            with transaction.atomic():
+                substitution.save()
+                seed_statlines(game.pk)
             return redirect('stats:enter-substitutions', game_id=game.id)
     else:
         form = SubstitutionForm(team=team)
@@ -568,11 +611,8 @@ def competition_player_stats_view(request):
     # optional team filter
     team_serial = request.GET.get('team')
 
-    # base queryset of stat lines, optionally filtered by team
-    base_qs = PlayerStatLine.objects.filter(
-        game__competition__in=competitions,
-        team__in=played_teams
-    )
+    # season totals per player and team, optionally filtered by team
+    base_qs = PlayerSeasonAggregate.objects.filter(competition__in=competitions)
     if team_serial:
         base_qs = base_qs.filter(team__serial=team_serial)
 
@@ -583,7 +623,7 @@ def competition_player_stats_view(request):
         .annotate(
             player_id=F('player__serial'),
             name=Concat(F('player__first_name'), Value(' '), F('player__last_name')),
-            games=Count('game', distinct=True),
+            games=Sum('games'),
             ab=Sum('ab'),
             bb=Sum('bb'),
             h=Sum('h'),
@@ -648,15 +688,15 @@ def competition_player_stats_view(request):
     # ——— Pitchers ———
     pitching_stats = (
         base_qs
-        .filter(ip_outs__gt=0)
+        .filter(pitching_games__gt=0)
         .values('player__serial', 'player__first_name', 'player__last_name')
         .annotate(
             player_id=F('player__serial'),
             name=Concat(F('player__first_name'), Value(' '), F('player__last_name')),
-            games=Count('game', distinct=True),
-            wins=Sum(Case(When(decision='W', then=1), default=0)),
-            losses=Sum(Case(When(decision='L', then=1), default=0)),
-            saves=Sum(Case(When(decision='S', then=1), default=0)),
+            games=Sum('pitching_games'),
+            wins=Sum('wins'),
+            losses=Sum('losses'),
+            saves=Sum('saves'),
             ip_outs=Sum('ip_outs'),
             er=Sum('er'),
             h_allowed=Sum('h_allowed'),
@@ -713,8 +753,8 @@ def competition_team_stats_view(request):
 
     # ——— Offense ———
     base_qs = (
-        PlayerStatLine.objects
-        .filter(game__competition__in=competitions)
+        TeamSeasonAggregate.objects
+        .filter(competition__in=competitions)
         .values('team__serial','team__first_name','team__team_name')
         .annotate(
             team_serial=F('team__serial'),
@@ -739,8 +779,8 @@ def competition_team_stats_view(request):
 
     # ——— Pitching ———
     pitching_stats = (
-        PlayerStatLine.objects
-        .filter(game__competition__in=competitions)
+        TeamSeasonAggregate.objects
+        .filter(competition__in=competitions)
         .values('team__serial', 'team__first_name', 'team__team_name')
         .annotate(
             team_serial=F('team__serial'),
@@ -777,8 +817,8 @@ def competition_team_stats_view(request):
 
     # ——— Defense ———
     defense_stats = (
-        PlayerStatLine.objects
-        .filter(game__competition__in=competitions)
+        TeamSeasonAggregate.objects
+        .filter(competition__in=competitions)
         .values('team__serial','team__first_name','team__team_name')
         .annotate(
             team_serial=F('team__serial'),
@@ -815,21 +855,10 @@ def competition_leaders_view(request):
     comp_ids = request.GET.getlist('competitions')
     competitions = get_list_or_404(Competition, pk__in=comp_ids)
 
-    qs = PlayerStatLine.objects.filter(game__competition__in=competitions)
-    # Leading batting average (min 10 AB)
-    leaders = (
-        qs.values('player__first_name', 'player__last_name')
-          .annotate(
-              ab=Sum('ab'),
-              h=Sum('h'),
-              avg=F('h') * 1.0 / F('ab')
-          )
-          .filter(ab__gte=10)
-          .order_by('-avg')[:20]
-    )
-
-    return render(request, 'stats/competition_leaders.html', {
-        'leaders': leaders,
+    return render(request, 'competitions/competition_leaders.html', {
+        'categories': competition_leaders(competitions),
+        'pa_per_game': settings.LEADERS_PA_PER_TEAM_GAME,
+        'ip_per_game': settings.LEADERS_IP_PER_TEAM_GAME,
         'qs': request.GET.urlencode(),
         'competitions': competitions,
     })
@@ -839,88 +868,10 @@ def competition_standings_view(request):
     comp_id     = request.GET.get('competitions')
     competition = get_object_or_404(Competition, pk=comp_id)
 
-    # Build structured or unstructured standings
-    if competition.has_structure:
-        structured = []
-        for league in competition.leagues.all():
-            if league.has_divisions:
-                divs = []
-                for division in league.divisions.all():
-                    qs = Teams.objects.filter(
-                        team_entries__competition=competition,
-                        team_entries__division=division
-                    )
-                    divs.append({
-                        'name': division.name,
-                        'rows': _annotate_standings(qs, competition)
-                    })
-                structured.append({'name': league.name, 'divisions': divs})
-            else:
-                qs = Teams.objects.filter(
-                    team_entries__competition=competition,
-                    team_entries__league=league
-                )
-                structured.append({
-                    'name': league.name,
-                    'rows': _annotate_standings(qs, competition)
-                })
-        context = {'competition': competition, 'structured': structured}
-    else:
-        qs = Teams.objects.filter(team_entries__competition=competition)
-        rows = _annotate_standings(qs, competition)
-        context = {'competition': competition, 'unstructured': rows}
-
+    context = {'competition': competition, **get_competition_standings(competition)}
     return render(request, 'stats/competition_standings.html', context)
 
 
-def _annotate_standings(qs, competition):
-    """
-    Annotate a Teams queryset with wins, losses, GB, and pct.
-    Returns a list of dicts: {'display_name','wins','losses','gb','win_pct'}.
-    """
-    annotated = (
-        qs.annotate(
-            display_name=Concat(F('first_name'), Value(' '), F('team_name')),
-            played=Count('home_games', filter=Q(home_games__competition=competition)) +
-                   Count('away_games', filter=Q(away_games__competition=competition)),
-            wins=Count('home_games', filter=Q(
-                        home_games__competition=competition,
-                        home_games__home_score__gt=F('home_games__away_score')
-                    )) +
-                 Count('away_games', filter=Q(
-                        away_games__competition=competition,
-                        away_games__away_score__gt=F('away_games__home_score')
-                    )),
-            losses=Count('home_games', filter=Q(
-                        home_games__competition=competition,
-                        home_games__home_score__lt=F('home_games__away_score')
-                    )) +
-                   Count('away_games', filter=Q(
-                        away_games__competition=competition,
-                        away_games__away_score__lt=F('away_games__home_score')
-                    )),
-        )
-        .annotate(
-            win_pct=ExpressionWrapper(
-                F('wins') * 1.0 / Case(
-                    When(played=0, then=Value(1)),   # avoid zero-divide
-                    default=F('played'),
-                    output_field=FloatField()
-                ),
-                output_field=FloatField()
-            )
-        )
-        .order_by('-wins', '-win_pct')
-    )
-
-    rows = list(annotated.values('display_name', 'wins', 'losses', 'win_pct'))
-    if rows:
-        leader_wins = rows[0]['wins']
-        for row in rows:
-            row['gb'] = leader_wins - row['wins']
-    return rows
-
-
 def competition_games_view(request, competition_id):
     competition = get_object_or_404(Competition, pk=competition_id)
     games       = Game.objects.filter(competition=competition) \
@@ -932,159 +883,10 @@ def competition_games_view(request, competition_id):
 
 
 def game_boxscore_view(request, game_id):
-    game = get_object_or_404(Game, pk=game_id)
-
-    # — seed and fetch inning scores as before…
-    for team in (game.away_team, game.home_team):
-        for inn in range(1, 10):
-            InningScore.objects.get_or_create(
-                game=game, team=team, inning=inn, defaults={'runs': 0}
-            )
-    away_scores = list(InningScore.objects.filter(
-        game=game, team=game.away_team).order_by('inning'))
-    home_scores = list(InningScore.objects.filter(
-        game=game, team=game.home_team).order_by('inning'))
-    away_total_runs = sum(s.runs for s in away_scores)
-    home_total_runs = sum(s.runs for s in home_scores)
-    away_total_hits = sum(sl.h for sl in PlayerStatLine.objects.filter(
-        game=game, team=game.away_team))
-    home_total_hits = sum(sl.h for sl in PlayerStatLine.objects.filter(
-        game=game, team=game.home_team))
-    away_total_errs = sum(sl.e for sl in PlayerStatLine.objects.filter(
-        game=game, team=game.away_team))
-    home_total_errs = sum(sl.e for sl in PlayerStatLine.objects.filter(
-        game=game, team=game.home_team))
-
-    # — fetch all statlines once —
-    statlines = list(PlayerStatLine.objects.filter(game=game)
-                     .select_related('player','team'))
-
-    # — build away/home batters in batting order —
-    lineup_away = LineupEntry.objects.filter(
-        game=game, team=game.away_team
-    ).order_by('batting_order').select_related('player')
-    lineup_home = LineupEntry.objects.filter(
-        game=game, team=game.home_team
-    ).order_by('batting_order').select_related('player')
-
-    # only batters (had AB or BB)
-    batters = {sl.player.serial: sl for sl in statlines if sl.ab + sl.bb > 0}
-    away_batters = [batters[le.player.serial] for le in lineup_away if le.player.serial in batters]
-    home_batters = [batters[le.player.serial] for le in lineup_home if le.player.serial in batters]
-
-    # compute AVG/OBP/SLG on each batter
-    for sl in batters.values():
-        sl.avg = sl.h/sl.ab if sl.ab else 0
-        denom = sl.ab + sl.bb + sl.hbp + sl.sf
-        sl.obp = (sl.h+sl.bb+sl.hbp)/denom if denom else 0
-        singles = sl.h - sl.doubles - sl.triples - sl.hr
-        sl.slg = (singles + 2*sl.doubles + 3*sl.triples + 4*sl.hr)/sl.ab if sl.ab else 0
-        away_doubles = [
-            f"{sl.player.last_name}{f'({sl.doubles})' if sl.doubles>1 else ''}"
-            for sl in away_batters if sl.doubles>0
-        ]
-        home_doubles = [
-            f"{sl.player.last_name}{f'({sl.doubles})' if sl.doubles>1 else ''}"
-            for sl in home_batters if sl.doubles>0
-        ]
-        away_triples = [
-            f"{sl.player.last_name}{f'({sl.triples})' if sl.triples>1 else ''}"
-            for sl in away_batters if sl.triples>0
-        ]
-        home_triples = [
-            f"{sl.player.last_name}{f'({sl.triples})' if sl.triples>1 else ''}"
-            for sl in home_batters if sl.triples>0
-        ]
-        away_hr = [
-            f"{sl.player.last_name}{f'({sl.hr})' if sl.hr>1 else ''}"
-            for sl in away_batters if sl.hr>0
-        ]
-        home_hr = [
-            f"{sl.player.last_name}{f'({sl.hr})' if sl.hr>1 else ''}"
-            for sl in home_batters if sl.hr>0
-        ]
-        away_sb = [
-            f"{sl.player.last_name}{f'({sl.sb})' if sl.sb>1 else ''}"
-            for sl in away_batters if sl.sb>0
-        ]
-        home_sb = [
-            f"{sl.player.last_name}{f'({sl.sb})' if sl.sb>1 else ''}"
-            for sl in home_batters if sl.sb>0
-        ]
-        away_cs = [
-            f"{sl.player.last_name}{f'({sl.cs})' if sl.cs>1 else ''}"
-            for sl in away_batters if sl.cs>0
-        ]
-        home_cs = [
-            f"{sl.player.last_name}{f'({sl.cs})' if sl.cs>1 else ''}"
-            for sl in home_batters if sl.cs>0
-        ]
-
-    # — fetch all pitcher statlines & compute IP/ERA/WHIP —
-    all_pitchers = [sl for sl in statlines if sl.ip_outs > 0]
-    for sl in all_pitchers:
-        sl.innings_pitched = sl.ip_outs / 3.0
-        sl.era = (sl.er * 9.0 / sl.innings_pitched) if sl.innings_pitched else 0
-        sl.whip = ((sl.h_allowed + sl.bb_allowed) / sl.innings_pitched) if sl.innings_pitched else 0
-
-    # — fetch pitcher‐substitutions & position‐player substitutions —
-    subs = Substitution.objects.filter(game=game).select_related(
-        'team','player_in','player_out'
-    ).order_by('inning')
-
-    # group by player_out for position subs
-    subs_by_out = {}
-    for sub in subs:
-        if sub.position != 'P':  # position player sub
-            subs_by_out.setdefault(sub.player_out.serial, []).append(sub)
-
-    # pitcher subs in order
-    away_p_subs = [s for s in subs if s.team == game.away_team and s.position == 'P']
-    home_p_subs = [s for s in subs if s.team == game.home_team and s.position == 'P']
-
-    def order_pitchers(team, p_subs):
-        roster = [sl for sl in all_pitchers if sl.team == team]
-        ordered = []
-        # starting pitcher = one not in any p_subs.player_in
-        starters = [sl for sl in roster if sl.player not in [s.player_in for s in p_subs]]
-        if starters:
-            ordered.append(starters[0])
-        # then each relief in sub order
-        for s in p_subs:
-            rel = next((sl for sl in roster if sl.player == s.player_in), None)
-            if rel:
-                ordered.append(rel)
-        return ordered
-
-    away_pitchers = order_pitchers(game.away_team, away_p_subs)
-    home_pitchers = order_pitchers(game.home_team, home_p_subs)
-
-    return render(request, 'stats/game_boxscore.html', {
-        'game':             game,
-        'away_scores':      away_scores,
-        'home_scores':      home_scores,
-        'away_total_runs':  away_total_runs,
-        'home_total_runs':  home_total_runs,
-        'away_total_hits':  away_total_hits,
-        'home_total_hits':  home_total_hits,
-        'away_total_errs':  away_total_errs,
-        'home_total_errs':  home_total_errs,
-        'away_batters':     away_batters,
-        'home_batters':     home_batters,
-        'away_pitchers':    away_pitchers,
-        'home_pitchers':    home_pitchers,
-        'subs_by_out':      subs_by_out,
-        'away_doubles':     away_doubles,
-        'home_doubles':     home_doubles,
-        'away_triples':     away_triples,
-        'home_triples':     home_triples,
-        'home_hr':          home_hr,
-        'away_hr':          away_hr,
-        'home_sb':          home_sb,
-        'away_sb':          away_sb,
-        'home_cs':          home_cs,
-        'away_cs':          away_cs
-    })
+    game = get_object_or_404(
+        Game.objects.select_related('away_team', 'home_team'), pk=game_id
+    )
+    return render(request, 'stats/game_boxscore.html', get_boxscore(game))
 
 
 class CompetitionTeamAssignView(CreateView):
@@ -1147,88 +949,21 @@ class DivisionTeamAssignView(CreateView):
         return reverse('stats:competition-detail', args=[self.comp.pk])
 
 
-class StandingsView(ListView):
-    template_name = 'competitions/standings.html'
-    context_object_name = 'standings'
-
-    def get_queryset(self):
-        comp = Competition.objects.get(pk=self.kwargs['pk'])
-        # gather all teams in this comp
-        teams = comp.teams.all()
-        # annotate each with totals
-        return teams.annotate(
-            played=Count('team_entries__game', filter=Q(team_entries__game__competition=comp)),
-            wins=Count('team_entries__game', filter=Q(
-                team_entries__game__competition=comp,
-                team_entries__game__home_team=F('pk'),
-                team_entries__game__home_score__gt=F('team_entries__game__away_score')
-            )) + Count('team_entries__game', filter=Q(
-                team_entries__game__competition=comp,
-                team_entries__game__away_team=F('pk'),
-                team_entries__game__away_score__gt=F('team_entries__game__home_score')
-            )),
-            losses=Count('team_entries__game', filter=Q(
-                team_entries__game__competition=comp,
-                team_entries__game__home_team=F('pk'),
-                team_entries__game__home_score__lt=F('team_entries__game__away_score')
-            )) + Count('team_entries__game', filter=Q(
-                team_entries__game__competition=comp,
-                team_entries__game__away_team=F('pk'),
-                team_entries__game__away_score__lt=F('team_entries__game__home_score')
-            )),
-        ).annotate(
-            win_pct=ExpressionWrapper(
-                F('wins') * 1.0 / F('played'),
-                output_field=IntegerField()
-            )
-        ).order_by('-wins', '-win_pct')
+class StandingsView(DetailView):
+    model = Competition
+    template_name = 'stats/competition_standings.html'
+    context_object_name = 'competition'
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx.update(get_competition_standings(self.object))
+        return ctx
 
 
 def stats_overview(request, game_id):
     game = get_object_or_404(Game, pk=game_id)
 
-    # ─── SEED STATLINES ────────────────────────────────────────────────────────
-    # for each starter…
-    for entry in LineupEntry.objects.filter(game=game).select_related('player','team'):
-        PlayerStatLine.objects.get_or_create(
-            game=game,
-            player=entry.player,
-            team=entry.team,
-            defaults={
-                'position': entry.fielding_position,
-                # all your existing defaults:
-                'ab':0, 'r':0, 'h':0, 'doubles':0, 'triples':0,
-                'hr':0, 'rbi':0, 'bb':0, 'so':0, 'sf':0,
-                'hbp':0, 'sb':0, 'cs':0, 'dp':0,
-                'ip_outs':0, 'ra':0, 'er':0, 'h_allowed':0,
-                'bb_allowed':0, 'k_thrown':0, 'decision':'',
-                'hb':0, 'balk':0, 'wp':0, 'ibb':0,
-                'po':0, 'a':0, 'e':0, 'pb':0,
-                'threw': False,
-            }
-        )
-
-    # for any substitutions…
-    for sub in Substitution.objects.filter(game=game).select_related('player_in','team'):
-        PlayerStatLine.objects.get_or_create(
-            game=game,
-            player=sub.player_in,
-            team=sub.team,
-            defaults={
-                'position': sub.position,
-                # same defaults as above…
-                'ab':0, 'r':0, 'h':0, 'doubles':0, 'triples':0,
-                'hr':0, 'rbi':0, 'bb':0, 'so':0, 'sf':0,
-                'hbp':0, 'sb':0, 'cs':0, 'dp':0,
-                'ip_outs':0, 'ra':0, 'er':0, 'h_allowed':0,
-                'bb_allowed':0, 'k_thrown':0, 'decision':'',
-                'hb':0, 'balk':0, 'wp':0, 'ibb':0,
-                'po':0, 'a':0, 'e':0, 'pb':0,
-                'threw': False,
-            }
-        )
-    # ─────────────────────────────────────────────────────────────────────────
-
+    # stat lines were seeded when the lineups and substitutions went in
     participants = (
         PlayerStatLine.objects
           .filter(game=game)